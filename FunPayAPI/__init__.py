@@ -1,5 +1,50 @@
-from .account import Account
-from .updater.runner import Runner
-from .updater import events
-from .common import exceptions, utils, enums
-from . import types
+"""
+Классы и модули пакета импортируются при первом обращении к ним (``FunPayAPI.Account``,
+``from FunPayAPI import Runner`` и т.д.), поэтому ``import FunPayAPI`` не загружает requests, bs4, asyncio и т.д.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .account import Account
+    from .async_account import AsyncAccount
+    from .updater.runner import Runner
+    from .updater.async_runner import AsyncRunner
+    from .updater.scheduler import AdaptiveScheduler
+    from .updater import events
+    from .common import exceptions, utils, enums, ratelimit, storage
+    from . import types
+
+_LAZY_ATTRIBUTES = {
+    "Account": (".account", "Account"),
+    "AsyncAccount": (".async_account", "AsyncAccount"),
+    "Runner": (".updater.runner", "Runner"),
+    "AsyncRunner": (".updater.async_runner", "AsyncRunner"),
+    "AdaptiveScheduler": (".updater.scheduler", "AdaptiveScheduler"),
+    "events": (".updater.events", None),
+    "exceptions": (".common.exceptions", None),
+    "utils": (".common.utils", None),
+    "enums": (".common.enums", None),
+    "ratelimit": (".common.ratelimit", None),
+    "storage": (".common.storage", None),
+    "types": (".types", None)
+}
+"""{имя: (модуль, атрибут модуля или None, если имя - сам модуль)}"""
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    module = importlib.import_module(module_name, __name__)
+    value = getattr(module, attribute) if attribute else module
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Literal, Any, Optional, IO
+from typing import TYPE_CHECKING, Callable, Literal, Any, Optional, IO
 
 import FunPayAPI.common.enums
 from FunPayAPI.common.utils import parse_currency, RegularExpressions
@@ -8,23 +8,35 @@ from .types import PaymentMethod, CalcResult
 if TYPE_CHECKING:
     from .updater.runner import Runner
 
-from requests_toolbelt import MultipartEncoder
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
+import http.cookiejar
 import requests
+import requests.adapters
 import logging
 import random
+import hashlib
 import string
 import json
+import threading
 import time
 import re
 
-from . import types
-from .common import exceptions, utils, enums
+from . import types, parsers
+from .common import exceptions, utils, enums, ratelimit, storage
 
 logger = logging.getLogger("FunPayAPI.account")
+FUNPAY_URL = "https://funpay.com"
+"""Адрес FunPay по умолчанию (см. параметр base_url :class:`FunPayAPI.account.Account`)."""
 PRIVATE_CHAT_ID_RE = re.compile(r"users-\d+-\d+$")
 
+_categories_cache: dict[tuple[str, str | None], tuple[float, list[types.Category]]] = {}
+"""Категории, загруженные из кэша на диске, общие для всех аккаунтов процесса ({(путь, язык): (время парсинга,
+категории)})."""
+_categories_cache_lock = threading.Lock()
+_categories_refreshing: set[tuple[str, str | None]] = set()
+"""Кэши категорий, которые сейчас обновляются в фоне."""
+
 
 class Account:
     """
@@ -44,11 +56,72 @@ class Account:
 
     :param locale: текущий язык аккаунта, опционально.
     :type locale: :obj:`Literal["ru", "en", "uk"]` or :obj:`None`
+
+    :param pool_connections: кол-во пулов соединений (хостов), которые хранит сессия.
+    :type pool_connections: :obj:`int`, опционально
+
+    :param pool_maxsize: макс. кол-во соединений, хранимых в пуле одного хоста.
+    :type pool_maxsize: :obj:`int`, опционально
+
+    :param pool_block: ждать ли освобождения соединения, если пул хоста заполнен (вместо открытия нового)?
+    :type pool_block: :obj:`bool`, опционально
+
+    :param keep_alive: держать ли соединения открытыми между запросами?
+    :type keep_alive: :obj:`bool`, опционально
+
+    :param sales_parser: бэкенд парсинга списка продаж (:meth:`FunPayAPI.account.Account.get_sales`):
+        "bs4" (BeautifulSoup), "lxml" (скомпилированные XPath-выражения, быстрее) или свой экземпляр
+        :class:`FunPayAPI.parsers.SalesParser`.
+    :type sales_parser: :obj:`str` or :class:`FunPayAPI.parsers.SalesParser`, опционально
+
+    :param rate_limiter: ограничитель частоты запросов. Если не указан, создается
+        :class:`FunPayAPI.common.ratelimit.RateLimiter` с лимитами по умолчанию.
+    :type rate_limiter: :class:`FunPayAPI.common.ratelimit.RateLimiter` or :obj:`None`, опционально
+
+    :param html_retention: хранить ли HTML-код виджетов заказов, чатов и лотов в атрибуте html получаемых объектов
+        (см. :class:`FunPayAPI.common.enums.HTMLRetentionModes`).
+    :type html_retention: :class:`FunPayAPI.common.enums.HTMLRetentionModes`, опционально
+
+    :param max_saved_chats: макс. кол-во сохраненных чатов (:meth:`FunPayAPI.account.Account.get_chats`) и
+        ID собеседников (:attr:`FunPayAPI.account.Account.interlocutor_ids`). Записи, к которым дольше всего
+        не обращались, вытесняются (:obj:`None` - без ограничения).
+    :type max_saved_chats: :obj:`int` or :obj:`None`, опционально
+
+    :param categories_cache: путь до файла кэша категорий и подкатегорий. Если кэш есть,
+        :meth:`FunPayAPI.account.Account.get` не парсит каталог игр с основной страницы, а аккаунты процесса
+        с одинаковым путем используют одни и те же объекты категорий (:obj:`None` - без кэша).
+    :type categories_cache: :obj:`str` or :obj:`None`, опционально
+
+    :param categories_cache_ttl: через сколько секунд кэш категорий устаревает. Устаревший кэш используется,
+        а категории обновляются в фоновом потоке (:meth:`FunPayAPI.account.Account.refresh_categories`).
+    :type categories_cache_ttl: :obj:`int` or :obj:`float`, опционально
+
+    :param max_cached_orders: макс. кол-во заказов в кэше :meth:`FunPayAPI.account.Account.get_order`.
+        Кэш используется, только пока к аккаунту привязан :class:`FunPayAPI.updater.runner.Runner`, который
+        сбрасывает записи при изменении заказов. Записи, к которым дольше всего не обращались, вытесняются
+        (0 - не кэшировать, :obj:`None` - без ограничения).
+    :type max_cached_orders: :obj:`int` or :obj:`None`, опционально
+
+    :param base_url: адрес FunPay, на который отправляются запросы (например, адрес локального
+        тестового сервера). Ссылки вида https://funpay.com/... в запросах и редиректах заменяются на него.
+    :type base_url: :obj:`str`, опционально
     """
 
+    STATE_VERSION = 1
+    """Версия формата состояния (:meth:`FunPayAPI.account.Account.export_state`)."""
+    CATEGORIES_CACHE_VERSION = 1
+    """Версия формата кэша категорий."""
+
     def __init__(self, golden_key: str, user_agent: str | None = None,
                  requests_timeout: int | float = 10, proxy: Optional[dict] = None,
-                 locale: Literal["ru", "en", "uk"] | None = None):
+                 locale: Literal["ru", "en", "uk"] | None = None,
+                 pool_connections: int = 4, pool_maxsize: int = 10, pool_block: bool = False,
+                 keep_alive: bool = True, sales_parser: Literal["bs4", "lxml"] | parsers.SalesParser = "bs4",
+                 rate_limiter: ratelimit.RateLimiter | None = None,
+                 html_retention: enums.HTMLRetentionModes = enums.HTMLRetentionModes.EAGER,
+                 max_saved_chats: int | None = None, categories_cache: str | None = None,
+                 categories_cache_ttl: int | float = 24 * 60 * 60, max_cached_orders: int | None = 0,
+                 base_url: str = FUNPAY_URL):
         self.golden_key: str = golden_key
         """Токен (golden_key) аккаунта."""
         self.user_agent: str | None = user_agent
@@ -57,6 +130,23 @@ class Account:
         """Тайм-аут ожидания ответа на запросы."""
         self.proxy = proxy
         """Прокси"""
+        self.keep_alive: bool = keep_alive
+        """Держать ли соединения открытыми между запросами?"""
+        self.base_url: str = base_url.rstrip("/")
+        """Адрес FunPay, на который отправляются запросы."""
+        self.session: requests.Session = self.__create_session(pool_connections, pool_maxsize, pool_block)
+        """HTTP-сессия с пулом соединений, через которую выполняются все запросы к FunPay."""
+        self.sales_parser: parsers.SalesParser = parsers.get_sales_parser(sales_parser) \
+            if isinstance(sales_parser, str) else sales_parser
+        """Бэкенд парсинга списка продаж."""
+        self.rate_limiter: ratelimit.RateLimiter = rate_limiter or ratelimit.RateLimiter()
+        """Ограничитель частоты запросов к FunPay."""
+        self.html_retention: enums.HTMLRetentionModes = html_retention
+        """Режим хранения HTML-кода виджетов заказов, чатов и лотов."""
+        self.categories_cache: str | None = categories_cache
+        """Путь до файла кэша категорий и подкатегорий."""
+        self.categories_cache_ttl: int | float = categories_cache_ttl
+        """Время (в секундах), через которое кэш категорий устаревает."""
         self.html: str | None = None
         """HTML основной страницы FunPay."""
         self.app_data: dict | None = None
@@ -101,20 +191,30 @@ class Account:
         """CSRF токен."""
         self.phpsessid: str | None = None
         """PHPSESSID сессии."""
+        self.__phpsessid_restored: bool = False
+        """Восстановлен ли PHPSESSID из состояния и еще не отправлялся в Account.get()?"""
         self.last_update: int | None = None
         """Последнее время обновления аккаунта."""
 
-        self.interlocutor_ids: dict[int, int] = {}
+        self.interlocutor_ids: storage.BoundedDict[int, int] = storage.BoundedDict(max_saved_chats)
         """{id чата: id собеседника}"""
 
         self.__initiated: bool = False
 
-        self.__saved_chats: dict[int, types.ChatShortcut] = {}
+        self.__saved_chats: storage.BoundedDict[int, types.ChatShortcut] = storage.BoundedDict(max_saved_chats)
+
+        self.__orders_cache: storage.BoundedDict[str, types.Order] = storage.BoundedDict(max_cached_orders)
+        """Кэш :meth:`FunPayAPI.account.Account.get_order` ({ID заказа: экземпляр types.Order})."""
+        self.__orders_cache_stats: dict[str, int] = {"order_hits": 0, "order_misses": 0, "shortcut_hits": 0,
+                                                     "shortcut_misses": 0, "invalidations": 0}
+        self.__orders_cache_lock = threading.Lock()
         self.runner: Runner | None = None
         """Объект Runner'а."""
         self._logout_link: str | None = None
         """Ссылка для выхода с аккаунта"""
         self.__categories: list[types.Category] = []
+        self.__stale_categories_cache: tuple[str, str | None] | None = None
+        """Ключ устаревшего кэша категорий, который нужно обновить после инициализации аккаунта."""
         self.__sorted_categories: dict[int, types.Category] = {}
 
         self.__subcategories: list[types.SubCategory] = []
@@ -130,9 +230,11 @@ class Account:
 
     def method(self, request_method: Literal["post", "get"], api_method: str, headers: dict, payload: Any,
                exclude_phpsessid: bool = False, raise_not_200: bool = False,
-               locale: Literal["ru", "en", "uk"] | None = None) -> requests.Response:
+               locale: Literal["ru", "en", "uk"] | None = None,
+               priority: enums.RequestPriorities | None = None) -> requests.Response:
         """
         Отправляет запрос к FunPay. Добавляет в заголовки запроса user_agent и куки.
+        Перед отправкой ждет разрешения :attr:`FunPayAPI.account.Account.rate_limiter`.
 
         :param request_method: метод запроса ("get" / "post").
         :type request_method: :obj:`str` `post` or `get`
@@ -152,34 +254,39 @@ class Account:
         :param raise_not_200: возбуждать ли исключение, если статус код ответа != 200?
         :type raise_not_200: :obj:`bool`
 
+        :param priority: приоритет запроса в очереди ограничителя частоты запросов. Если не указан -
+            определяется по эндпоинту.
+        :type priority: :class:`FunPayAPI.common.enums.RequestPriorities` or :obj:`None`, опционально
+
         :return: объект ответа.
         :rtype: :class:`requests.Response`
         """
 
+        base_url = f"{self.base_url}/"
+
         def normalize_url(api_method: str, locale: Literal["ru", "en", "uk"] | None = None) -> str:
-            api_method = "https://funpay.com/" if api_method == "https://funpay.com" else api_method
-            url = api_method if api_method.startswith("https://funpay.com/") else "https://funpay.com/" + api_method
+            if api_method.startswith(FUNPAY_URL):
+                api_method = self.base_url + api_method.removeprefix(FUNPAY_URL)
+            api_method = base_url if api_method == self.base_url else api_method
+            url = api_method if api_method.startswith(base_url) else base_url + api_method
             locales = ("en", "uk")
             for loc in locales:
-                url = url.replace(f"https://funpay.com/{loc}/", "https://funpay.com/", 1)
+                url = url.replace(f"{base_url}{loc}/", base_url, 1)
             if not locale:
                 locale = self.locale
             if locale in locales:
-                return url.replace(f"https://funpay.com/", f"https://funpay.com/{locale}/", 1)
+                return url.replace(base_url, f"{base_url}{locale}/", 1)
             return url
 
         def update_locale(redirect_url: str):
             for locale in ("en", "uk"):
-                if redirect_url.startswith(f"https://funpay.com/{locale}/"):
+                if redirect_url.startswith(f"{base_url}{locale}/"):
                     self.__locale = locale
                     return
-            if redirect_url.startswith(f"https://funpay.com"):
+            if redirect_url.startswith(self.base_url):
                 self.__locale = "ru"
 
-        headers["cookie"] = f"golden_key={self.golden_key}; cookie_prefs=1"
-        headers["cookie"] += f"; PHPSESSID={self.phpsessid}" if self.phpsessid and not exclude_phpsessid else ""
-        if self.user_agent:
-            headers["user-agent"] = self.user_agent
+        self.__add_request_headers(headers, exclude_phpsessid)
         if request_method == "post" and locale:
             link = normalize_url(api_method, locale)
         else:
@@ -187,18 +294,24 @@ class Account:
         locale = locale or self.__set_locale
         if request_method == "get" and locale and locale != self.locale:
             link += f'{"&" if "?" in link else "?"}setlocale={locale}'
+        path = normalize_url(link, "ru").removeprefix(base_url)
+        bucket = self.rate_limiter.classify(request_method, path, payload)
+        self.rate_limiter.acquire(bucket, priority)
         for i in range(10):
-            response = getattr(requests, request_method)(link, headers=headers, data=payload,
-                                                         timeout=self.requests_timeout,
-                                                         proxies=self.proxy or {}, allow_redirects=False)
+            response = self.session.request(request_method, link, headers=headers, data=payload,
+                                            timeout=self.requests_timeout,
+                                            proxies=self.proxy or {}, allow_redirects=False)
             if not (300 <= response.status_code < 400) or 'Location' not in response.headers:
                 break
             link = response.headers['Location']
+            if link.startswith(FUNPAY_URL):
+                link = self.base_url + link.removeprefix(FUNPAY_URL)
             update_locale(link)
         else:
-            response = getattr(requests, request_method)(link, headers=headers, data=payload,
-                                                         timeout=self.requests_timeout,
-                                                         proxies=self.proxy or {})
+            response = self.session.request(request_method, link, headers=headers, data=payload,
+                                            timeout=self.requests_timeout,
+                                            proxies=self.proxy or {})
+        self.rate_limiter.on_response(bucket, response.status_code)
         if response.status_code == 429:
             self.last_429_err_time = time.time()
 
@@ -208,21 +321,126 @@ class Account:
             raise exceptions.RequestFailedError(response)
         return response
 
+    def __add_request_headers(self, headers: dict, exclude_phpsessid: bool = False):
+        """
+        Добавляет в заголовки запроса куки, user_agent и, если нужно, connection: close.
+        """
+        headers["cookie"] = f"golden_key={self.golden_key}; cookie_prefs=1"
+        if not self.keep_alive:
+            headers["connection"] = "close"
+        headers["cookie"] += f"; PHPSESSID={self.phpsessid}" if self.phpsessid and not exclude_phpsessid else ""
+        if self.user_agent:
+            headers["user-agent"] = self.user_agent
+
+    def retain_html(self, element: Any, serialize: Callable[[Any], str] = str) -> str | None:
+        """
+        Возвращает значение атрибута html для объекта, полученного из элемента страницы,
+        в соответствии с :attr:`FunPayAPI.account.Account.html_retention`.
+
+        :param element: элемент страницы (тег BeautifulSoup, элемент lxml и т.д.).
+        :param serialize: функция, возвращающая HTML-код элемента.
+
+        :return: HTML-код или :obj:`None`.
+        """
+        if self.html_retention is enums.HTMLRetentionModes.NEVER:
+            return None
+        return serialize(element)
+
+    def get_pool_stats(self) -> dict[str, int | float]:
+        """
+        Возвращает статистику пула соединений сессии.
+
+        :return: словарь со статистикой: кол-во запросов (`requests`), кол-во открытых новых соединений
+            (`new_connections`), доля запросов, выполненных по уже открытому соединению (`reuse_ratio`),
+            кол-во открытых сокетов (`open_sockets`) и из них простаивающих в пуле (`idle_sockets`).
+        :rtype: :obj:`dict` {:obj:`str`: :obj:`int` or :obj:`float`}
+        """
+        adapters = {id(adapter): adapter for adapter in self.session.adapters.values()}.values()
+        managers = [adapter.poolmanager for adapter in adapters]
+        managers.extend(manager for adapter in adapters for manager in adapter.proxy_manager.values())
+        requests_count, new_connections, open_sockets, idle_sockets = 0, 0, 0, 0
+        for manager in managers:
+            for key in manager.pools.keys():
+                pool = manager.pools.get(key)
+                if pool is None or pool.pool is None:
+                    continue
+                requests_count += pool.num_requests
+                new_connections += pool.num_connections
+                idle = [conn for conn in list(pool.pool.queue) if conn is not None and conn.sock is not None]
+                idle_sockets += len(idle)
+                open_sockets += len(idle) + max(pool.pool.maxsize - pool.pool.qsize(), 0)
+        reuse_ratio = 1 - new_connections / requests_count if requests_count else 0.0
+        return {"requests": requests_count, "new_connections": new_connections, "reuse_ratio": max(reuse_ratio, 0.0),
+                "open_sockets": open_sockets, "idle_sockets": idle_sockets}
+
+    def export_state(self) -> dict:
+        """
+        Возвращает состояние аккаунта, которое можно сохранить на диск
+        (:func:`FunPayAPI.common.storage.save_state`) и восстановить после перезапуска
+        (:meth:`FunPayAPI.account.Account.import_state`): PHPSESSID, CSRF токен, ID собеседников и категории.
+
+        :return: JSON-совместимый словарь с состоянием аккаунта.
+        :rtype: :obj:`dict`
+        """
+        return {
+            "version": self.STATE_VERSION,
+            "key": self.__state_key(),
+            "id": self.id,
+            "phpsessid": self.phpsessid,
+            "csrf_token": self.csrf_token,
+            "interlocutor_ids": self.interlocutor_ids.items(),
+            "categories": self.__dump_categories(self.__categories)
+        }
+
+    def import_state(self, state: dict) -> bool:
+        """
+        Восстанавливает состояние, полученное :meth:`FunPayAPI.account.Account.export_state`.
+        Вызывается до :meth:`FunPayAPI.account.Account.get`: если категории восстановлены, они не парсятся заново,
+        а сохраненный PHPSESSID используется, пока FunPay не выдаст новый.
+
+        :param state: состояние аккаунта.
+        :type state: :obj:`dict`
+
+        :return: :obj:`True`, если состояние восстановлено, :obj:`False`, если оно принадлежит другому аккаунту
+            или сохранено в другом формате.
+        :rtype: :obj:`bool`
+        """
+        if not state or state.get("version") != self.STATE_VERSION or state.get("key") != self.__state_key():
+            return False
+        if state.get("phpsessid"):
+            self.phpsessid = state["phpsessid"]
+            self.__phpsessid_restored = True
+        self.csrf_token = state.get("csrf_token") or self.csrf_token
+        for chat_id, interlocutor_id in state.get("interlocutor_ids", []):
+            self.interlocutor_ids[chat_id] = interlocutor_id
+        if not self.__categories and state.get("categories"):
+            self.__set_categories(self.__load_categories(state["categories"]))
+        return True
+
+    def __state_key(self) -> str:
+        """Отпечаток golden_key, по которому состояние привязывается к аккаунту (сам токен не сохраняется)."""
+        return hashlib.sha256(self.golden_key.encode()).hexdigest()[:16]
+
     def get(self, update_phpsessid: bool = True) -> Account:
         """
         Получает / обновляет данные об аккаунте. Необходимо вызывать каждые 40-60 минут, дабы обновить
         :py:obj:`.Account.phpsessid`.
 
-        :param update_phpsessid: обновить :py:obj:`.Account.phpsessid` или использовать старый.
+        :param update_phpsessid: обновить :py:obj:`.Account.phpsessid` или использовать старый. При первом вызове
+            после :meth:`FunPayAPI.account.Account.import_state` восстановленный PHPSESSID отправляется в любом
+            случае и заменяется, только если FunPay выдаст новый.
         :type update_phpsessid: :obj:`bool`, опционально
 
         :return: объект аккаунта с обновленными данными.
         :rtype: :class:`FunPayAPI.account.Account`
         """
-        if not self.is_initiated:
+        exclude_phpsessid = update_phpsessid and not self.__phpsessid_restored
+        self.__phpsessid_restored = False
+        setup_categories = not self.is_initiated and not self.__categories and not self.__load_categories_cache()
+        if setup_categories:
             self.locale = self.__subcategories_parse_locale
-        response = self.method("get", "https://funpay.com/", {}, {}, update_phpsessid, raise_not_200=True)
-        if not self.is_initiated:
+        response = self.method("get", "https://funpay.com/", {}, {}, exclude_phpsessid, raise_not_200=True)
+        if setup_categories:
             self.locale = self.__default_locale
         html_response = response.content.decode()
         parser = BeautifulSoup(html_response, "lxml")
@@ -250,12 +468,17 @@ class Account:
         cookies = response.cookies.get_dict()
         if update_phpsessid or not self.phpsessid:
             self.phpsessid = cookies.get("PHPSESSID", self.phpsessid)
-        if not self.is_initiated:
+        if setup_categories:
             self.__setup_categories(html_response)
+            self.__save_categories_cache(self.__categories)
 
         self.last_update = int(time.time())
         self.html = html_response
         self.__initiated = True
+        if key := self.__stale_categories_cache:
+            self.__stale_categories_cache = None
+            threading.Thread(target=self.__refresh_categories_cache, args=(key,), daemon=True,
+                             name="funpay-categories-refresh").start()
         return self
 
     def get_subcategory_public_lots(self, subcategory_type: enums.SubCategoryTypes, subcategory_id: int,
@@ -345,7 +568,7 @@ class Account:
                     del attributes[i]
 
             lot_obj = types.LotShortcut(offer_id, server, description, amount, price, currency, subcategory_obj, seller,
-                                        auto, promo, attributes, str(offer))
+                                        auto, promo, attributes, self.retain_html(offer))
             result.append(lot_obj)
         return result
 
@@ -399,7 +622,7 @@ class Account:
             amount = int(amount) if amount and amount.isdigit() else None
             active = "warning" not in offer.get("class", [])
             lot_obj = types.MyLotShortcut(offer_id, server, description, amount, price, currency, subcategory_obj,
-                                          auto, active, str(offer))
+                                          auto, active, self.retain_html(offer))
             result.append(lot_obj)
         return result
 
@@ -620,6 +843,8 @@ class Account:
             'file': ("Отправлено_с_помощью_бота_FunPay_Cardinal.png", img, "image/png"),
             'file_id': "0"
         }
+        from requests_toolbelt import MultipartEncoder  # нужен только для загрузки изображений
+
         boundary = '----WebKitFormBoundary' + ''.join(random.sample(string.ascii_letters + string.digits, 16))
         m = MultipartEncoder(fields=fields, boundary=boundary)
 
@@ -722,10 +947,12 @@ class Account:
                               "You cannot send messages too frequently.",
                               "Не можна надсилати повідомлення занадто часто."):
                 self.last_flood_err_time = time.time()
+                self.rate_limiter.penalize("chat_send")
             elif error_text in ("Нельзя слишком часто отправлять сообщения разным пользователям.",
                                 "Не можна надто часто надсилати повідомлення різним користувачам.",
                                 "You cannot message multiple users too frequently."):
                 self.last_multiuser_flood_err_time = time.time()
+                self.rate_limiter.penalize("chat_send")
             raise exceptions.MessageNotDeliveredError(response, error_text, chat_id)
         if leave_as_unread:
             message_text = text
@@ -910,6 +1137,7 @@ class Account:
         }
 
         response = self.method("post", "orders/refund", headers, payload, raise_not_200=True)
+        self.invalidate_order(order_id)
 
         if response.json().get("error"):
             raise exceptions.RefundError(response, response.json().get("msg"), order_id)
@@ -1128,7 +1356,7 @@ class Account:
                         self.currency = currency
                 lot_obj = types.LotShortcut(offer_id, server, description, amount, price, currency, subcategory_obj,
                                             None, auto,
-                                            None, None, str(j))
+                                            None, None, self.retain_html(j))
                 user_obj.add_lot(lot_obj)
         return user_obj
 
@@ -1173,31 +1401,88 @@ class Account:
             history = []
         return types.Chat(chat_id, name, link, text, html_response, history)
 
-    def get_order_shortcut(self, order_id: str) -> types.OrderShortcut:
+    def get_order_shortcut(self, order_id: str, make_request: bool = True) -> types.OrderShortcut | None:
         """
         Получает краткую информацию о заказе. РАБОТАЕТ ТОЛЬКО ДЛЯ ПРОДАЖ.
 
+        Заказ берется из сохраненных заказов Runner'а (:attr:`FunPayAPI.updater.runner.Runner.saved_orders`),
+        список продаж запрашивается, только если заказа там нет.
+
         :param order_id: ID заказа.
         :type order_id: :obj:`str`
 
-        :return: объекст заказа.
-        :rtype: :class:`FunPayAPI.types.OrderShortcut`
+        :param make_request: запросить ли заказ из списка продаж, если он не сохранен?
+        :type make_request: :obj:`bool`, опционально
+
+        :return: объекст заказа или :obj:`None`, если заказ не был найден.
+        :rtype: :class:`FunPayAPI.types.OrderShortcut` or :obj:`None`
         """
         # todo взаимодействие с покупками
-        return self.runner.saved_orders.get(order_id, self.get_sales(id=order_id)[1][0])
+        if self.runner and (order := self.runner.saved_orders.get(order_id)) is not None:
+            self.__count_orders_cache("shortcut_hits")
+            return order
+        self.__count_orders_cache("shortcut_misses")
+        if not make_request:
+            return None
+        orders = self.get_sales(id=order_id)[1]
+        return orders[0] if orders else None
+
+    def invalidate_order(self, order_id: str):
+        """
+        Удаляет заказ из кэша :meth:`FunPayAPI.account.Account.get_order`. Вызывается :class:`Runner`'ом при
+        изменении статуса заказа и системных сообщениях о нем (отзывы, возвраты и т.д.).
 
-    def get_order(self, order_id: str, locale: Literal["ru", "en", "uk"] | None = None) -> types.Order:
+        :param order_id: ID заказа.
+        :type order_id: :obj:`str`
+        """
+        if self.__orders_cache.pop(order_id, None) is not None:
+            self.__count_orders_cache("invalidations")
+
+    def get_orders_cache_stats(self) -> dict[str, int | None]:
+        """
+        :return: статистика кэша заказов: кол-во попаданий / промахов :meth:`FunPayAPI.account.Account.get_order`
+            и :meth:`FunPayAPI.account.Account.get_order_shortcut`, кол-во сброшенных записей и
+            :meth:`FunPayAPI.common.storage.BoundedDict.stats`.
+        """
+        with self.__orders_cache_lock:
+            stats = dict(self.__orders_cache_stats)
+        return {**stats, **self.__orders_cache.stats()}
+
+    def __count_orders_cache(self, name: str):
+        with self.__orders_cache_lock:
+            self.__orders_cache_stats[name] += 1
+
+    def get_order(self, order_id: str, locale: Literal["ru", "en", "uk"] | None = None,
+                  use_cache: bool = True) -> types.Order:
         """
         Получает полную информацию о заказе.
 
+        Если включен кэш (параметр max_cached_orders аккаунта) и к аккаунту привязан Runner, заказы кэшируются
+        до изменения статуса заказа или системного сообщения о нем в Runner'е
+        (:meth:`FunPayAPI.account.Account.invalidate_order`). Заказ берется из кэша, только если он есть в
+        :attr:`FunPayAPI.updater.runner.Runner.saved_orders` с тем же статусом, иначе загружается заново.
+        Заказы, запрошенные на другом языке (locale), не кэшируются.
+
         :param order_id: ID заказа.
         :type order_id: :obj:`str`
 
+        :param use_cache: использовать ли кэш? При :obj:`False` заказ всегда загружается заново (и обновляется
+            в кэше).
+        :type use_cache: :obj:`bool`, опционально
+
         :return: объекст заказа.
         :rtype: :class:`FunPayAPI.types.Order`
         """
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
+        cacheable = not locale and self.runner is not None and self.__orders_cache.maxsize != 0
+        if use_cache and cacheable and (order := self.__orders_cache.get(order_id)) is not None:
+            saved = self.runner.saved_orders.get(order_id)
+            if saved is not None and saved.status == order.status:
+                self.__count_orders_cache("order_hits")
+                return order
+            self.invalidate_order(order_id)
+        self.__count_orders_cache("order_misses")
         headers = {
             "accept": "*/*"
         }
@@ -1319,6 +1604,8 @@ class Account:
                             short_description, full_description, amount,
                             sum_, currency, buyer_id, buyer_username, seller_id, seller_username, chat_id,
                             html_response, review, order_secrets)
+        if cacheable:
+            self.__orders_cache[order_id] = order
         return order
 
     def get_sales(self, start_from: str | None = None, include_paid: bool = True, include_closed: bool = True,
@@ -1327,7 +1614,8 @@ class Account:
                   state: Optional[Literal["closed", "paid", "refunded"]] = None, game: Optional[int] = None,
                   section: Optional[str] = None, server: Optional[int] = None,
                   side: Optional[int] = None, locale: Literal["ru", "en", "uk"] | None = None,
-                  subcategories: dict[str, tuple[types.SubCategoryTypes, int]] | None = None, **more_filters) -> \
+                  subcategories: dict[str, tuple[types.SubCategoryTypes, int]] | None = None,
+                  known_orders: dict[str, types.OrderStatuses] | None = None, **more_filters) -> \
             tuple[str | None, list[types.OrderShortcut], Literal["ru", "en", "uk"],
             dict[str, types.SubCategory]]:
         """
@@ -1372,6 +1660,12 @@ class Account:
         :param side: ID стороны (платформы).
         :type side: :obj:`int`, опционально.
 
+        :param known_orders: уже известные статусы заказов ({ID заказа: статус}).\n
+            Если передано, заказы с известным ID и неизменившимся статусом не парсятся и не попадают в список, а
+            разбор страницы прекращается на первом таком заказе, как только среди известных не осталось
+            неувиденных заказов со статусом "Оплачен" (изменения статусов более старых заказов не отслеживаются).
+        :type known_orders: :obj:`dict` {:obj:`str`: :class:`FunPayAPI.common.enums.OrderStatuses`}, опционально
+
         :param more_filters: доп. фильтры.
 
         :return: (ID след. заказа (для start_from), список заказов)
@@ -1402,28 +1696,18 @@ class Account:
             self.locale = self.__default_locale
         html_response = response.content.decode()
 
-        parser = BeautifulSoup(html_response, "lxml")
-
-        if not start_from:
-            username = parser.find("div", {"class": "user-link-name"})
-            if not username:
-                raise exceptions.UnauthorizedError(response)
-
-        next_order_id = parser.find("input", {"type": "hidden", "name": "continue"})
-        next_order_id = next_order_id.get("value") if next_order_id else None
+        page = self.sales_parser.parse_page(html_response, full=not start_from)
+        if not page.authorized:
+            raise exceptions.UnauthorizedError(response)
 
-        order_divs = parser.find_all("a", {"class": "tc-item"})
+        next_order_id = page.next_order_id
         if not start_from:
             subcategories = dict()
-            app_data = json.loads(parser.find("body").get("data-app-data"))
-            locale = app_data.get("locale")
-            self.csrf_token = app_data.get("csrf-token") or self.csrf_token
-            games_options = parser.find("select", attrs={"name": "game"})
-            if games_options:
-                games_options = games_options.find_all(lambda x: x.name == "option" and x.get("value"))
-                for game_option in games_options:
-                    game_name = game_option.text
-                    sections_list = json.loads(game_option.get("data-data"))
+            locale = page.app_data.get("locale")
+            self.csrf_token = page.app_data.get("csrf-token") or self.csrf_token
+            if page.games is not None:
+                for game_name, sections in page.games:
+                    sections_list = json.loads(sections)
                     for key, section_name in sections_list:
                         section_type, section_id = key.split("-")
                         section_type = types.SubCategoryTypes.COMMON if section_type == "lot" else types.SubCategoryTypes.CURRENCY
@@ -1431,12 +1715,14 @@ class Account:
                         subcategories[f"{game_name}, {section_name}"] = self.get_subcategory(section_type, section_id)
             else:
                 subcategories = None
-        if not order_divs:
+        if not page.rows:
             return None, [], locale, subcategories
 
         sales = []
-        for div in order_divs:
-            classname = div.get("class")
+        pending_paid = {i for i, status in known_orders.items()
+                        if status == types.OrderStatuses.PAID} if known_orders else set()
+        for div in page.rows:
+            classname = self.sales_parser.row_classes(div)
             if "warning" in classname:
                 if not include_refunded:
                     continue
@@ -1450,26 +1736,32 @@ class Account:
                     continue
                 order_status = types.OrderStatuses.CLOSED
 
-            order_id = div.find("div", {"class": "tc-order"}).text[1:]
+            order_id = self.sales_parser.row_order_id(div)[1:]
             if order_id in exclude_ids:
                 continue
+            if known_orders is not None:
+                unchanged = known_orders.get(order_id) == order_status
+                pending_paid.discard(order_id)
+                if unchanged and not pending_paid:
+                    break
+                elif unchanged:
+                    continue
 
-            description = div.find("div", {"class": "order-desc"}).find("div").text
-            tc_price = div.find("div", {"class": "tc-price"}).text
-            price, currency = tc_price.rsplit(maxsplit=1)
+            row = self.sales_parser.row_fields(div)
+            description = row.description
+            price, currency = row.price.rsplit(maxsplit=1)
             price = float(price.replace(" ", ""))
             currency = parse_currency(currency)
 
-            buyer_div = div.find("div", {"class": "media-user-name"}).find("span")
-            buyer_username = buyer_div.text
-            buyer_id = int(buyer_div.get("data-href")[:-1].split("/users/")[1])
-            subcategory_name = div.find("div", {"class": "text-muted"}).text
+            buyer_username = row.buyer_username
+            buyer_id = int(row.buyer_link[:-1].split("/users/")[1])
+            subcategory_name = row.subcategory_name
             subcategory = None
             if subcategories:
                 subcategory = subcategories.get(subcategory_name)
 
             now = datetime.now()
-            order_date_text = div.find("div", {"class": "tc-date-time"}).text
+            order_date_text = row.date
             if any(today in order_date_text for today in ("сегодня", "сьогодні", "today")):  # сегодня, ЧЧ:ММ
                 h, m = order_date_text.split(", ")[1].split(":")
                 order_date = datetime(now.year, now.month, now.day, int(h), int(m))
@@ -1492,7 +1784,8 @@ class Account:
             id1, id2 = sorted([buyer_id, self.id])
             chat_id = f"users-{id1}-{id2}"
             order_obj = types.OrderShortcut(order_id, description, price, currency, buyer_username, buyer_id, chat_id,
-                                            order_status, order_date, subcategory_name, subcategory, str(div))
+                                            order_status, order_date, subcategory_name, subcategory,
+                                            self.retain_html(div, self.sales_parser.row_html))
             sales.append(order_obj)
 
         return next_order_id, sales, locale, subcategories
@@ -1573,7 +1866,8 @@ class Account:
             elif last_msg_text.startswith(self.old_bot_character):
                 last_msg_text = last_msg_text[1:]
                 by_vertex = True
-            chat_obj = types.ChatShortcut(chat_id, chat_with, last_msg_text, node_msg_id, user_msg_id, unread, str(msg))
+            chat_obj = types.ChatShortcut(chat_id, chat_with, last_msg_text, node_msg_id, user_msg_id, unread,
+                                          self.retain_html(msg))
             if not is_image:
                 chat_obj.last_by_bot = by_bot
                 chat_obj.last_by_vertex = by_vertex
@@ -1614,9 +1908,9 @@ class Account:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
-        for i in self.__saved_chats:
-            if self.__saved_chats[i].name == name:
-                return self.__saved_chats[i]
+        for i in self.__saved_chats.values():
+            if i.name == name:
+                return i
 
         if make_request:
             self.add_chats(self.request_chats())
@@ -1898,6 +2192,37 @@ class Account:
         """
         return self.__sorted_subcategories
 
+    def refresh_categories(self) -> list[types.Category]:
+        """
+        Заново парсит категории и подкатегории с основной страницы FunPay и обновляет кэш категорий
+        (:attr:`FunPayAPI.account.Account.categories_cache`), если он задан.
+
+        Может выполняться в фоновом потоке, поэтому страница запрашивается по ссылке с нужным языком
+        без setlocale и без изменения :attr:`FunPayAPI.account.Account.locale`.
+
+        :return: список категорий (игр) FunPay.
+        :rtype: :obj:`list` of :class:`FunPayAPI.types.Category`
+        """
+        if not self.is_initiated:
+            raise exceptions.AccountNotInitiatedError()
+        locale = self.__subcategories_parse_locale
+        link = f"{self.base_url}/{locale}/" if locale in ("en", "uk") else f"{self.base_url}/"
+        headers = {}
+        self.__add_request_headers(headers)
+        bucket = self.rate_limiter.classify("get", "")
+        self.rate_limiter.acquire(bucket, enums.RequestPriorities.LOW)
+        response = self.session.get(link, headers=headers, timeout=self.requests_timeout, proxies=self.proxy or {})
+        self.rate_limiter.on_response(bucket, response.status_code)
+        if response.status_code == 403:
+            raise exceptions.UnauthorizedError(response)
+        elif response.status_code != 200:
+            raise exceptions.RequestFailedError(response)
+        categories = self.__parse_categories(response.content.decode())
+        if categories:
+            self.__set_categories(categories)
+            self.__save_categories_cache(categories)
+        return self.__categories
+
     def logout(self) -> None:
         """
         Выходит с аккаунта FunPay (сбрасывает golden_key).
@@ -1922,15 +2247,26 @@ class Account:
 
         :param html: HTML страница.
         """
+        self.__set_categories(self.__parse_categories(html))
+
+    def __parse_categories(self, html: str) -> list[types.Category]:
+        """
+        Парсит категории и подкатегории с основной страницы.
+
+        :param html: HTML страница.
+
+        :return: список категорий (подкатегории добавлены в категории).
+        """
+        categories = []
         parser = BeautifulSoup(html, "lxml")
         games_table = parser.find_all("div", {"class": "promo-game-list"})
         if not games_table:
-            return
+            return categories
 
         games_table = games_table[1] if len(games_table) > 1 else games_table[0]
         games_divs = games_table.find_all("div", {"class": "promo-game-item"})
         if not games_divs:
-            return
+            return categories
         game_position = 0
         subcategory_position = 0
         for i in games_divs:
@@ -1959,17 +2295,117 @@ class Account:
                     sobj = types.SubCategory(sid, name, stype, regional_games[j_game_id], subcategory_position)
                     subcategory_position += 1
                     regional_games[j_game_id].add_subcategory(sobj)
-                    self.__subcategories.append(sobj)
-                    self.__sorted_subcategories[stype][sid] = sobj
 
-            for gid in regional_games:
-                self.__categories.append(regional_games[gid])
-                self.__sorted_categories[gid] = regional_games[gid]
+            categories.extend(regional_games.values())
+        return categories
+
+    def __set_categories(self, categories: list[types.Category]):
+        """
+        Заменяет категории и подкатегории аккаунта (все свойства заменяются новыми объектами, поэтому замена
+        безопасна для потоков, которые в это время читают категории).
+
+        :param categories: список категорий (подкатегории добавлены в категории).
+        """
+        subcategories = sorted((j for i in categories for j in i.get_subcategories()), key=lambda x: x.position)
+        sorted_subcategories = {types.SubCategoryTypes.COMMON: {}, types.SubCategoryTypes.CURRENCY: {}}
+        for i in subcategories:
+            sorted_subcategories[i.type][i.id] = i
+        self.__sorted_categories = {i.id: i for i in categories}
+        self.__sorted_subcategories = sorted_subcategories
+        self.__subcategories = subcategories
+        self.__categories = categories
+
+    @staticmethod
+    def __dump_categories(categories: list[types.Category]) -> list[dict]:
+        """
+        :return: JSON-совместимый список категорий и их подкатегорий (для состояния аккаунта и кэша категорий).
+        """
+        return [{"id": c.id, "name": c.name, "position": c.position,
+                 "subcategories": [[s.id, s.name, s.type.name, s.position] for s in c.get_subcategories()]}
+                for c in categories]
+
+    @staticmethod
+    def __load_categories(data: list[dict]) -> list[types.Category]:
+        """
+        :return: список категорий, восстановленный из списка, полученного Account.__dump_categories.
+        """
+        categories = []
+        for i in data:
+            category = types.Category(i["id"], i["name"], position=i["position"])
+            for sid, name, stype, position in i["subcategories"]:
+                category.add_subcategory(types.SubCategory(sid, name, types.SubCategoryTypes[stype], category,
+                                                           position))
+            categories.append(category)
+        return categories
+
+    def __load_categories_cache(self) -> bool:
+        """
+        Загружает категории из кэша (из памяти процесса, если их уже загрузил другой аккаунт, иначе - с диска).
+        Если кэш устарел, после инициализации аккаунта он обновляется в фоновом потоке.
+
+        :return: :obj:`True`, если категории загружены, иначе :obj:`False`.
+        """
+        if not self.categories_cache:
+            return False
+        key = (self.categories_cache, self.__subcategories_parse_locale)
+        with _categories_cache_lock:
+            cached = _categories_cache.get(key)
+            if cached is None:
+                cache = storage.load_state(self.categories_cache)
+                if cache.get("version") != self.CATEGORIES_CACHE_VERSION or cache.get("locale") != key[1] \
+                        or not cache.get("categories"):
+                    return False
+                try:
+                    cached = (cache["saved_at"], self.__load_categories(cache["categories"]))
+                except (KeyError, TypeError, ValueError):
+                    logger.warning(f"Кэш категорий {self.categories_cache} поврежден.")
+                    logger.debug("TRACEBACK", exc_info=True)
+                    return False
+                _categories_cache[key] = cached
+            refresh = time.time() - cached[0] > self.categories_cache_ttl and key not in _categories_refreshing
+            if refresh:
+                _categories_refreshing.add(key)
+        self.__set_categories(cached[1])
+        self.__stale_categories_cache = key if refresh else None
+        return True
+
+    def __refresh_categories_cache(self, key: tuple[str, str | None]):
+        """
+        Обновляет устаревший кэш категорий (выполняется в фоновом потоке после инициализации аккаунта).
+        """
+        try:
+            self.refresh_categories()
+        except:
+            logger.warning(f"Не удалось обновить кэш категорий {key[0]}.")
+            logger.debug("TRACEBACK", exc_info=True)
+        finally:
+            with _categories_cache_lock:
+                _categories_refreshing.discard(key)
+
+    def __save_categories_cache(self, categories: list[types.Category]):
+        """
+        Сохраняет категории в кэш (на диск и в память процесса).
+
+        :param categories: список категорий.
+        """
+        if not self.categories_cache or not categories:
+            return
+        key = (self.categories_cache, self.__subcategories_parse_locale)
+        with _categories_cache_lock:
+            _categories_cache[key] = (time.time(), categories)
+        try:
+            storage.save_state(self.categories_cache, {"version": self.CATEGORIES_CACHE_VERSION, "locale": key[1],
+                                                       "categories": self.__dump_categories(categories)})
+        except OSError:
+            logger.warning(f"Не удалось сохранить кэш категорий {self.categories_cache}.")
+            logger.debug("TRACEBACK", exc_info=True)
 
     def __parse_messages(self, json_messages: dict, chat_id: int | str,
                          interlocutor_id: Optional[int] = None, interlocutor_username: Optional[str] = None,
                          from_id: int = 0) -> list[types.Message]:
         messages = []
+        # (текст серой метки автора, ссылки на пользователей в системном сообщении) для каждого сообщения
+        extras = []
         ids = {self.id: self.username, 0: "FunPay"}
         badges = {}
         if interlocutor_id is not None:
@@ -1981,9 +2417,10 @@ class Account:
             author_id = i["author"]
             parser = BeautifulSoup(i["html"].replace("<br>", "\n"), "lxml")
 
+            author_div = parser.find("div", {"class": "media-user-name"})
+
             # Если ник или бейдж написавшего неизвестен, но есть блок с данными об авторе сообщения
-            if None in [ids.get(author_id), badges.get(author_id)] and (
-                    author_div := parser.find("div", {"class": "media-user-name"})):
+            if None in [ids.get(author_id), badges.get(author_id)] and author_div:
                 if badges.get(author_id) is None:
                     badge = author_div.find("span", {"class": "chat-msg-author-label label label-success"})
                     badges[author_id] = badge.text if badge else 0
@@ -2028,13 +2465,17 @@ class Account:
             message_obj.by_vertex = by_vertex
             message_obj.type = types.MessageTypes.NON_SYSTEM if author_id != 0 else message_obj.get_message_type()
 
+            default_label = author_div.find("span", {
+                "class": "chat-msg-author-label label label-default"}) if author_div else None
+            users = parser.find_all('a', href=lambda href: href and '/users/' in href) \
+                if message_obj.type != types.MessageTypes.NON_SYSTEM else None
             messages.append(message_obj)
+            extras.append((default_label.text if default_label else None, users))
 
-        for i in messages:
+        for i, (default_label, users) in zip(messages, extras):
             i.author = ids.get(i.author_id)
             i.chat_name = interlocutor_username
             i.badge = badges.get(i.author_id) if badges.get(i.author_id) != 0 else None
-            parser = BeautifulSoup(i.html, "lxml")
             if i.badge:
                 i.is_employee = True
                 if i.badge in ("поддержка", "підтримка", "support"):
@@ -2043,15 +2484,11 @@ class Account:
                     i.is_moderation = True
                 elif i.badge in ("арбитраж", "арбітраж", "arbitration"):
                     i.is_arbitration = True
-            default_label = parser.find("div", {"class": "media-user-name"})
-            default_label = default_label.find("span", {
-                "class": "chat-msg-author-label label label-default"}) if default_label else None
             if default_label:
-                if default_label.text in ("автовідповідь", "автоответ", "auto-reply"):
+                if default_label in ("автовідповідь", "автоответ", "auto-reply"):
                     i.is_autoreply = True
-            i.badge = default_label.text if (i.badge is None and default_label is not None) else i.badge
+            i.badge = default_label if (i.badge is None and default_label is not None) else i.badge
             if i.type != types.MessageTypes.NON_SYSTEM:
-                users = parser.find_all('a', href=lambda href: href and '/users/' in href)
                 if users:
                     i.initiator_username = users[0].text
                     i.initiator_id = int(users[0]["href"].split("/")[-2])
@@ -2092,6 +2529,21 @@ class Account:
 
         return messages
 
+    def __create_session(self, pool_connections: int, pool_maxsize: int, pool_block: bool) -> requests.Session:
+        """
+        Создает HTTP-сессию с пулом соединений.
+        Куки сессии не сохраняются: они передаются в каждом запросе явно (см. :meth:`FunPayAPI.account.Account.method`).
+        """
+        session = requests.Session()
+        session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                                pool_block=pool_block)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if self.proxy:
+            session.proxies.update(self.proxy)
+        return session
+
     def __update_csrf_token(self, parser: BeautifulSoup):
         try:
             app_data = json.loads(parser.find("body").get("data-app-data"))
@@ -0,0 +1,145 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Literal, Any, Callable, Optional, IO, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import asyncio
+
+from .account import Account
+
+if TYPE_CHECKING:
+    from . import types
+    from .common import enums
+
+T = TypeVar("T")
+
+
+class AsyncAccount:
+    """
+    Асинхронная обертка над :class:`FunPayAPI.account.Account`.
+
+    Запросы и парсинг выполняются тем же кодом, что и у синхронного аккаунта, но в общем пуле потоков,
+    поэтому в одном event loop'е можно одновременно опрашивать FunPay, обращаться к сторонним API и
+    отправлять уведомления, не заводя отдельный поток под каждую задачу.
+
+    Это сознательно промежуточный шаг: сетевой код остается синхронным (requests), а асинхронным является только
+    интерфейс, поэтому одновременность ограничена размером пула потоков (max_workers) и общим
+    :attr:`FunPayAPI.account.Account.rate_limiter`. bot.py пока использует синхронные
+    :class:`FunPayAPI.account.Account` и :class:`FunPayAPI.updater.runner.Runner`; интерфейс обертки рассчитан на то,
+    чтобы позже заменить пул потоков асинхронным HTTP-клиентом без изменения вызывающего кода.
+
+    Принимает те же аргументы, что и :class:`FunPayAPI.account.Account`.
+
+    :param max_workers: макс. кол-во одновременно выполняемых запросов к FunPay.
+    :type max_workers: :obj:`int`, опционально
+    """
+
+    def __init__(self, *args, max_workers: int = 8, **kwargs):
+        self.account: Account = Account(*args, **kwargs)
+        """Синхронный экземпляр аккаунта, через который выполняются все запросы."""
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_workers,
+                                                               thread_name_prefix="FunPayAPI")
+        """Пул потоков, в котором выполняются блокирующие запросы."""
+
+    @classmethod
+    def from_account(cls, account: Account, max_workers: int = 8) -> AsyncAccount:
+        """
+        Создает асинхронную обертку над уже существующим экземпляром аккаунта.
+
+        :param account: экземпляр аккаунта.
+        :type account: :class:`FunPayAPI.account.Account`
+
+        :param max_workers: макс. кол-во одновременно выполняемых запросов к FunPay.
+        :type max_workers: :obj:`int`, опционально
+
+        :return: асинхронный экземпляр аккаунта.
+        :rtype: :class:`FunPayAPI.async_account.AsyncAccount`
+        """
+        obj = cls.__new__(cls)
+        obj.account = account
+        obj.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="FunPayAPI")
+        return obj
+
+    def __getattr__(self, item: str) -> Any:
+        # Свойства аккаунта (id, username, csrf_token, runner и т.д.) берутся у синхронного экземпляра.
+        if item in ("account", "executor"):
+            raise AttributeError(item)
+        return getattr(self.account, item)
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Выполняет блокирующую функцию в пуле потоков аккаунта.
+
+        :param func: функция (как правило, метод :class:`FunPayAPI.account.Account`).
+
+        :return: результат выполнения функции.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def get(self, update_phpsessid: bool = True) -> AsyncAccount:
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.get`."""
+        await self.run(self.account.get, update_phpsessid)
+        return self
+
+    async def get_sales(self, *args, **kwargs) -> tuple[str | None, list[types.OrderShortcut],
+                                                        Literal["ru", "en", "uk"], dict[str, types.SubCategory]]:
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.get_sales`."""
+        return await self.run(self.account.get_sales, *args, **kwargs)
+
+    async def get_order(self, order_id: str, locale: Literal["ru", "en", "uk"] | None = None,
+                        use_cache: bool = True) -> types.Order:
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.get_order`."""
+        return await self.run(self.account.get_order, order_id, locale, use_cache)
+
+    async def get_chat_history(self, chat_id: int | str, *args, **kwargs) -> list[types.Message]:
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.get_chat_history`."""
+        return await self.run(self.account.get_chat_history, chat_id, *args, **kwargs)
+
+    async def get_chats_histories(self, chats_data: dict[int | str, str | None],
+                                  interlocutor_ids: list[int] | None = None) -> dict[int, list[types.Message]]:
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.get_chats_histories`."""
+        return await self.run(self.account.get_chats_histories, chats_data, interlocutor_ids)
+
+    async def send_message(self, chat_id: int | str, text: Optional[str] = None, *args, **kwargs) -> types.Message:
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.send_message`."""
+        return await self.run(self.account.send_message, chat_id, text, *args, **kwargs)
+
+    async def send_image(self, chat_id: int, image: int | str | IO[bytes], *args, **kwargs) -> types.Message:
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.send_image`."""
+        return await self.run(self.account.send_image, chat_id, image, *args, **kwargs)
+
+    async def get_lot_fields(self, lot_id: int) -> types.LotFields:
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.get_lot_fields`."""
+        return await self.run(self.account.get_lot_fields, lot_id)
+
+    async def save_lot(self, lot_fields: types.LotFields):
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.save_lot`."""
+        return await self.run(self.account.save_lot, lot_fields)
+
+    async def refund(self, order_id: str):
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.refund`."""
+        return await self.run(self.account.refund, order_id)
+
+    async def get_balance(self, lot_id: int) -> types.Balance:
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.get_balance`."""
+        return await self.run(self.account.get_balance, lot_id)
+
+    async def get_user(self, user_id: int, locale: Literal["ru", "en", "uk"] | None = None) -> types.UserProfile:
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.get_user`."""
+        return await self.run(self.account.get_user, user_id, locale)
+
+    async def raise_lots(self, category_id: int, *args, **kwargs) -> bool:
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.raise_lots`."""
+        return await self.run(self.account.raise_lots, category_id, *args, **kwargs)
+
+    async def withdraw(self, currency: enums.Currency, wallet: enums.Wallet, amount: int | float,
+                       address: str) -> float:
+        """Асинхронная версия :meth:`FunPayAPI.account.Account.withdraw`."""
+        return await self.run(self.account.withdraw, currency, wallet, amount, address)
+
+    def close(self):
+        """
+        Останавливает пул потоков и закрывает HTTP-сессию аккаунта.
+        """
+        self.executor.shutdown(wait=False)
+        self.account.session.close()
@@ -160,3 +160,27 @@ class Wallet(Enum):
     """WebMoney WMZ."""
     YOUMONEY = 7
     """ЮMoney."""
+
+
+class RequestPriorities(Enum):
+    """
+    В данном классе перечислены приоритеты запросов к FunPay (см. :class:`FunPayAPI.common.ratelimit.RateLimiter`).
+    Чем меньше значение, тем раньше запрос получает разрешение на отправку.
+    """
+    HIGH = 0
+    """Запросы, от которых зависит выполнение заказа (получение заказа, отправка сообщения покупателю и т.д.)."""
+    NORMAL = 1
+    """Обычные запросы (получение событий Runner'ом и т.д.)."""
+    LOW = 2
+    """Фоновые запросы (поднятие лотов, получение профилей и т.д.)."""
+
+
+class HTMLRetentionModes(Enum):
+    """
+    В данном классе перечислены режимы хранения HTML-кода в объектах, получаемых при парсинге страниц
+    (см. :class:`FunPayAPI.account.Account`).
+    """
+    NEVER = 0
+    """HTML-код не сохраняется (атрибут html равен None)."""
+    EAGER = 2
+    """HTML-код получается сразу при парсинге (поведение по умолчанию)."""
@@ -1,8 +1,12 @@
 """
 В данном модуле описаны все кастомные исключения, используемые в пакете FunPayAPI.
 """
-import requests
-from .. import types
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import requests
+    from .. import types
 
 
 class AccountNotInitiatedError(Exception):
@@ -0,0 +1,272 @@
+"""
+В данном модуле описан ограничитель частоты запросов к FunPay (token bucket), общий для всех запросов
+:class:`FunPayAPI.account.Account`.
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+
+from .enums import RequestPriorities
+
+
+class TokenBucket:
+    """
+    Корзина токенов одного эндпоинта.
+
+    Токены пополняются со скоростью `rate` в секунду, но не более `capacity`. После 429 ошибки / ошибки флуда
+    скорость уменьшается (но не ниже `rate * min_rate_ratio`), а корзина блокируется на время штрафа,
+    который удваивается при повторных ошибках. Каждый успешный запрос понемногу возвращает скорость к исходной.
+
+    :param rate: кол-во запросов в секунду.
+    :type rate: :obj:`int` or :obj:`float`
+
+    :param capacity: макс. кол-во запросов, которые можно отправить подряд без ожидания.
+    :type capacity: :obj:`int`
+
+    :param min_rate_ratio: минимальная доля от исходной скорости, до которой она может снизиться.
+    :type min_rate_ratio: :obj:`float`, опционально
+
+    :param penalty: начальный штраф после ошибки (в секундах).
+    :type penalty: :obj:`int` or :obj:`float`, опционально
+
+    :param max_penalty: максимальный штраф (в секундах).
+    :type max_penalty: :obj:`int` or :obj:`float`, опционально
+    """
+
+    def __init__(self, rate: int | float, capacity: int, min_rate_ratio: float = 0.125,
+                 penalty: int | float = 2.0, max_penalty: int | float = 60.0):
+        self.base_rate: float = rate
+        """Исходная скорость (запросов в секунду)."""
+        self.rate: float = rate
+        """Текущая скорость (запросов в секунду)."""
+        self.capacity: int = capacity
+        """Макс. кол-во токенов."""
+        self.min_rate: float = rate * min_rate_ratio
+        """Минимальная скорость (запросов в секунду)."""
+        self.penalty: float = penalty
+        """Начальный штраф после ошибки (в секундах)."""
+        self.max_penalty: float = max_penalty
+        """Максимальный штраф (в секундах)."""
+
+        self.tokens: float = capacity
+        """Текущее кол-во токенов."""
+        self.blocked_until: float = 0
+        """Время, до которого корзина заблокирована после ошибки."""
+        self.requests: int = 0
+        """Кол-во запросов, получивших токен."""
+        self.penalties: int = 0
+        """Кол-во полученных штрафов (429 ошибок / ошибок флуда)."""
+        self.waited: float = 0
+        """Суммарное время ожидания токенов (в секундах)."""
+
+        self.__current_penalty: float = penalty
+        self.__updated: float = time.monotonic()
+
+    def refill(self, now: float):
+        """Пополняет корзину токенами за прошедшее время."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.__updated) * self.rate)
+        self.__updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Возвращает время (в секундах), через которое в корзине появится токен."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self):
+        """Забирает токен из корзины."""
+        self.tokens -= 1
+        self.requests += 1
+
+    def on_success(self):
+        """Постепенно восстанавливает скорость и штраф после успешного запроса."""
+        self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+        self.__current_penalty = max(self.penalty, self.__current_penalty * 0.9)
+
+    def on_penalty(self, now: float, duration: float | None = None):
+        """
+        Штрафует корзину: снижает скорость вдвое, обнуляет токены и блокирует корзину.
+
+        :param now: текущее время (time.monotonic()).
+        :param duration: длительность блокировки (в секундах). Если не указана - используется текущий штраф,
+            который удваивается с каждой ошибкой.
+        """
+        self.penalties += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0
+        if duration is None:
+            duration = self.__current_penalty
+            self.__current_penalty = min(self.max_penalty, self.__current_penalty * 2)
+        self.blocked_until = max(self.blocked_until, now + duration)
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов к FunPay.
+
+    Каждый запрос забирает токен из корзины своего эндпоинта и из общей корзины (`total`). Если токенов нет,
+    запрос ждет; ожидающие запросы пропускаются в порядке приоритета
+    (:class:`FunPayAPI.common.enums.RequestPriorities`), а при равном приоритете - в порядке поступления.
+    Запрос с низким приоритетом проходит раньше более приоритетного, только если тот ждет токены своего эндпоинта.
+
+    FunPay не публикует свои лимиты, поэтому лимиты по умолчанию намеренно нестрогие: они лишь сглаживают
+    всплески запросов, а реальную скорость подбирают штрафы - после 429 ошибки / ошибки флуда скорость корзины
+    снижается вдвое (до 1/8 исходной), а успешные запросы постепенно возвращают ее к исходной.
+
+    :param limits: лимиты эндпоинтов {название корзины: (запросов в секунду, макс. кол-во запросов подряд)}.
+        Переданные значения дополняют / заменяют :attr:`FunPayAPI.common.ratelimit.RateLimiter.DEFAULT_LIMITS`.
+    :type limits: :obj:`dict` {:obj:`str`: :obj:`tuple` (:obj:`float`, :obj:`int`)}, опционально
+
+    :param enabled: включен ли ограничитель? Если `False`, запросы не задерживаются, но статистика собирается.
+    :type enabled: :obj:`bool`, опционально
+    """
+
+    DEFAULT_LIMITS: dict[str, tuple[float, int]] = {
+        "total": (10.0, 10),
+        "runner": (4.0, 4),
+        "chat_send": (5.0, 5),
+        "orders": (5.0, 5),
+        "offer_save": (1.0, 2),
+        "default": (5.0, 5)
+    }
+    """Лимиты по умолчанию {название корзины: (запросов в секунду, макс. кол-во запросов подряд)}."""
+
+    DEFAULT_PRIORITIES: dict[str, RequestPriorities] = {
+        "orders": RequestPriorities.HIGH,
+        "chat_send": RequestPriorities.HIGH,
+        "runner": RequestPriorities.NORMAL,
+        "offer_save": RequestPriorities.LOW,
+        "default": RequestPriorities.LOW
+    }
+    """Приоритеты запросов по умолчанию {название корзины: приоритет}."""
+
+    def __init__(self, limits: dict[str, tuple[float, int]] | None = None, enabled: bool = True):
+        limits = {**self.DEFAULT_LIMITS, **(limits or {})}
+        self.buckets: dict[str, TokenBucket] = {name: TokenBucket(rate, capacity)
+                                                for name, (rate, capacity) in limits.items()}
+        """Корзины токенов {название: корзина}."""
+        self.enabled: bool = enabled
+        """Включен ли ограничитель?"""
+
+        self.__cond = threading.Condition()
+        self.__waiters: list[tuple[int, int, str]] = []
+        self.__counter = itertools.count()
+
+    @staticmethod
+    def classify(request_method: str, path: str, payload: object = None) -> str:
+        """
+        Определяет корзину запроса.
+
+        :param request_method: метод запроса ("get" / "post").
+        :param path: путь запроса без домена и языка (например, "runner/" или "orders/ABCD1234/").
+        :param payload: полезная нагрузка запроса.
+
+        :return: название корзины.
+        """
+        if path.startswith("runner/"):
+            if isinstance(payload, dict) and '"chat_message"' in (payload.get("request") or ""):
+                return "chat_send"
+            return "runner"
+        if path.startswith("orders/"):
+            return "orders"
+        if path.startswith("lots/offerSave"):
+            return "offer_save"
+        return "default"
+
+    def acquire(self, bucket: str, priority: RequestPriorities | None = None) -> float:
+        """
+        Ждет разрешения на отправку запроса.
+
+        :param bucket: название корзины (см. :meth:`FunPayAPI.common.ratelimit.RateLimiter.classify`).
+        :param priority: приоритет запроса. Если не указан - берется из
+            :attr:`FunPayAPI.common.ratelimit.RateLimiter.DEFAULT_PRIORITIES`.
+
+        :return: время ожидания (в секундах).
+        """
+        bucket = bucket if bucket in self.buckets else "default"
+        priority = priority or self.DEFAULT_PRIORITIES.get(bucket, RequestPriorities.NORMAL)
+        start = time.monotonic()
+        with self.__cond:
+            if not self.enabled:
+                self.buckets[bucket].requests += 1
+                self.buckets["total"].requests += 1
+                return 0.0
+            waiter = (priority.value, next(self.__counter), bucket)
+            self.__waiters.append(waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    for i in self.buckets.values():
+                        i.refill(now)
+                    wait = self.__wait_time(waiter, now)
+                    if wait == 0:
+                        break
+                    self.__cond.wait(wait)
+            finally:
+                self.__waiters.remove(waiter)
+            self.buckets[bucket].consume()
+            self.buckets["total"].consume()
+            waited = time.monotonic() - start
+            self.buckets[bucket].waited += waited
+            self.__cond.notify_all()
+            return waited
+
+    def __wait_time(self, waiter: tuple[int, int, str], now: float) -> float:
+        """
+        Возвращает, сколько ждать ожидающему запросу до следующей проверки (0 - можно отправлять).
+        """
+        total_wait = self.buckets["total"].wait_time(now)
+        for other in sorted(self.__waiters):
+            wait = max(self.buckets[other[2]].wait_time(now), total_wait)
+            if other is waiter:
+                return wait
+            if wait == 0:
+                # Более приоритетный запрос может быть отправлен прямо сейчас - ждем, пока он заберет токен.
+                return max(self.buckets[waiter[2]].wait_time(now), 0.01)
+        return 0.0
+
+    def on_response(self, bucket: str, status_code: int):
+        """
+        Обрабатывает ответ FunPay: при 429 ошибке штрафует корзину запроса и общую корзину.
+
+        :param bucket: название корзины запроса.
+        :param status_code: статус код ответа.
+        """
+        bucket = bucket if bucket in self.buckets else "default"
+        with self.__cond:
+            if status_code == 429:
+                now = time.monotonic()
+                self.buckets[bucket].on_penalty(now)
+                self.buckets["total"].on_penalty(now)
+            elif status_code < 400:
+                self.buckets[bucket].on_success()
+                self.buckets["total"].on_success()
+            self.__cond.notify_all()
+
+    def penalize(self, bucket: str, duration: float | None = None):
+        """
+        Штрафует корзину (например, после ошибки "Нельзя отправлять сообщения слишком часто.").
+
+        :param bucket: название корзины.
+        :param duration: длительность блокировки корзины (в секундах). Если не указана - используется
+            текущий (удваивающийся) штраф корзины.
+        """
+        bucket = bucket if bucket in self.buckets else "default"
+        with self.__cond:
+            self.buckets[bucket].on_penalty(time.monotonic(), duration)
+            self.__cond.notify_all()
+
+    def stats(self) -> dict[str, dict[str, int | float]]:
+        """
+        Возвращает статистику корзин.
+
+        :return: {название корзины: {"requests", "penalties", "waited", "rate", "tokens", "blocked_for"}}.
+        """
+        with self.__cond:
+            now = time.monotonic()
+            return {name: {"requests": i.requests, "penalties": i.penalties, "waited": round(i.waited, 3),
+                           "rate": i.rate, "tokens": round(i.tokens, 2),
+                           "blocked_for": round(max(i.blocked_until - now, 0), 3)}
+                    for name, i in self.buckets.items()}
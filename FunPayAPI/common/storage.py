@@ -0,0 +1,175 @@
+"""
+В данном модуле описаны хранилища состояния :class:`FunPayAPI.updater.runner.Runner` и
+:class:`FunPayAPI.account.Account` с ограничением размера и времени жизни записей, а также сохранение их
+состояния на диск между перезапусками.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Iterator
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("FunPayAPI.storage")
+
+
+class BoundedDict(MutableMapping):
+    """
+    Потокобезопасный словарь, вытесняющий записи, к которым дольше всего не обращались (LRU),
+    и / или записи, к которым не обращались дольше `ttl` секунд.
+
+    Обращением считается запись значения, а также чтение через `d[key]` / `d.get(key)`.
+    Проверка `key in d` и перебор словаря порядок вытеснения не меняют.
+
+    :param maxsize: макс. кол-во записей (:obj:`None` - без ограничения).
+    :type maxsize: :obj:`int` or :obj:`None`, опционально
+
+    :param ttl: время жизни записи с последнего обращения (в секундах, :obj:`None` - без ограничения).
+    :type ttl: :obj:`int` or :obj:`float` or :obj:`None`, опционально
+
+    :param on_evict: функция, вызываемая с ключом и значением каждой вытесненной записи (но не удаленной через
+        `del d[key]` / `d.pop(key)`).
+    :type on_evict: :obj:`Callable` or :obj:`None`, опционально
+    """
+
+    def __init__(self, maxsize: int | None = None, ttl: int | float | None = None,
+                 on_evict: Callable[[Any, Any], None] | None = None):
+        self.maxsize: int | None = maxsize
+        """Макс. кол-во записей."""
+        self.ttl: int | float | None = ttl
+        """Время жизни записи с последнего обращения (в секундах)."""
+        self.on_evict: Callable[[Any, Any], None] | None = on_evict
+        """Функция, вызываемая для каждой вытесненной записи."""
+        self.evictions: int = 0
+        """Кол-во записей, вытесненных из-за ограничения размера."""
+        self.expirations: int = 0
+        """Кол-во записей, удаленных по истечении времени жизни."""
+
+        self.__data: OrderedDict[Any, tuple[Any, float]] = OrderedDict()
+        self.__lock = threading.RLock()
+
+    def __getitem__(self, key):
+        with self.__lock:
+            self.__expire()
+            value = self.__data[key][0]
+            self.__data[key] = (value, time.monotonic())
+            self.__data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self.__lock:
+            self.__expire()
+            self.__data[key] = (value, time.monotonic())
+            self.__data.move_to_end(key)
+            while self.maxsize is not None and len(self.__data) > self.maxsize:
+                self.evictions += 1
+                self.__evict()
+
+    def __delitem__(self, key):
+        with self.__lock:
+            del self.__data[key]
+
+    def __contains__(self, key) -> bool:
+        with self.__lock:
+            self.__expire()
+            return key in self.__data
+
+    def __iter__(self) -> Iterator:
+        with self.__lock:
+            self.__expire()
+            return iter(list(self.__data))
+
+    def __len__(self) -> int:
+        with self.__lock:
+            self.__expire()
+            return len(self.__data)
+
+    def values(self) -> list:
+        """:return: список значений (снимок, не меняющий порядок вытеснения)."""
+        with self.__lock:
+            self.__expire()
+            return [i[0] for i in self.__data.values()]
+
+    def items(self) -> list[tuple]:
+        """:return: список пар (ключ, значение) (снимок, не меняющий порядок вытеснения)."""
+        with self.__lock:
+            self.__expire()
+            return [(k, v[0]) for k, v in self.__data.items()]
+
+    def clear(self):
+        with self.__lock:
+            self.__data.clear()
+
+    def __expire(self):
+        if self.ttl is None:
+            return
+        deadline = time.monotonic() - self.ttl
+        while self.__data and next(iter(self.__data.values()))[1] < deadline:
+            self.expirations += 1
+            self.__evict()
+
+    def __evict(self):
+        key, (value, _) = self.__data.popitem(last=False)
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def stats(self) -> dict[str, int | None]:
+        """
+        :return: {"size": кол-во записей, "maxsize": макс. кол-во записей, "evictions": кол-во вытесненных записей,
+            "expirations": кол-во записей, удаленных по истечении времени жизни}.
+        """
+        with self.__lock:
+            self.__expire()
+            return {"size": len(self.__data), "maxsize": self.maxsize, "evictions": self.evictions,
+                    "expirations": self.expirations}
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self.items())!r}, maxsize={self.maxsize}, ttl={self.ttl})"
+
+
+def save_state(path: str, state: dict):
+    """
+    Атомарно сохраняет состояние в JSON-файл: файл либо полностью перезаписывается, либо остается прежним
+    (в т.ч. если в него одновременно пишут несколько потоков / процессов). Состояние содержит PHPSESSID и
+    CSRF-токен, поэтому файл доступен только владельцу (0o600).
+
+    :param path: путь до файла.
+    :param state: состояние (например, {"account": account.export_state(), "runner": runner.export_state()}).
+    """
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({**state, "saved_at": time.time()}, f, ensure_ascii=False, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_state(path: str, max_age: int | float | None = None) -> dict:
+    """
+    Загружает состояние, сохраненное :func:`FunPayAPI.common.storage.save_state`.
+
+    :param path: путь до файла.
+    :param max_age: макс. возраст состояния (в секундах). Более старое состояние не загружается.
+
+    :return: состояние или пустой словарь, если файла нет, он поврежден или состояние устарело.
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        logger.warning(f"Не удалось загрузить состояние из {path}.")
+        logger.debug("TRACEBACK", exc_info=True)
+        return {}
+    if not isinstance(state, dict):
+        return {}
+    if max_age is not None and time.time() - state.get("saved_at", 0) > max_age:
+        logger.info(f"Состояние из {path} устарело и не будет загружено.")
+        return {}
+    return state
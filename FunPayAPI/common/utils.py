@@ -1,11 +1,12 @@
 """
 В данном модуле написаны вспомогательные функции.
 """
+from __future__ import annotations
 
 import string
 import random
 import re
-from .enums import Currency
+from .enums import Currency, MessageTypes
 
 MONTHS = {
     "января": 1,
@@ -82,10 +83,31 @@ def parse_currency(s: str) -> Currency:
             "¤": Currency.RUB}.get(s, Currency.UNKNOWN)
 
 
+class LazyPattern(object):
+    """
+    Регулярное выражение, которое компилируется при первом обращении к нему, а не при импорте модуля или создании
+    :class:`FunPayAPI.common.utils.RegularExpressions`.
+
+    :param pattern: регулярное выражение.
+    :param flags: флаги :func:`re.compile`.
+    """
+
+    def __init__(self, pattern: str, flags: int = 0):
+        self.pattern: str = pattern
+        self.flags: int = flags
+        self.__compiled: re.Pattern | None = None
+
+    def __get__(self, instance, owner) -> re.Pattern:
+        if self.__compiled is None:
+            self.__compiled = re.compile(self.pattern, self.flags)
+        return self.__compiled
+
+
 class RegularExpressions(object):
     """
     В данном классе хранятся скомпилированные регулярные выражения, описывающие системные сообщения FunPay и прочие
-    элементы текстов.
+    элементы текстов. Каждое выражение компилируется при первом обращении к нему
+    (:class:`FunPayAPI.common.utils.LazyPattern`).
     Класс является singleton'ом.
     """
 
@@ -94,135 +116,257 @@ class RegularExpressions(object):
             setattr(cls, "instance", super(RegularExpressions, cls).__new__(cls))
         return getattr(cls, "instance")
 
-    def __init__(self):
-        self.ORDER_PURCHASED = \
-            re.compile(r"(Покупатель|The buyer) [a-zA-Z0-9]+ (оплатил заказ|has paid for order) #[A-Z0-9]{8}\.")
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение об оплате заказа.
-        Лучше всего использовать вместе с MessageTypesRes.ORDER_PURCHASED2
-        """
+    ORDER_PURCHASED = \
+        LazyPattern(r"(Покупатель|The buyer) [a-zA-Z0-9]+ (оплатил заказ|has paid for order) #[A-Z0-9]{8}\.")
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение об оплате заказа.
+    Лучше всего использовать вместе с MessageTypesRes.ORDER_PURCHASED2
+    """
 
-        self.ORDER_PURCHASED2 = re.compile(
-            r"[a-zA-Z0-9]+, (не забудьте потом нажать кнопку («Подтвердить выполнение заказа»|«Подтвердить получение валюты»)\.|do not forget to press the («Confirm order fulfilment»|«Confirm currency receipt») button once you finish\.)")
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение об оплате заказа (2).
-        Лучше всего использовать вместе с MessageTypesRes.ORDER_PURCHASED
-        """
+    ORDER_PURCHASED2 = LazyPattern(
+        r"[a-zA-Z0-9]+, (не забудьте потом нажать кнопку («Подтвердить выполнение заказа»|«Подтвердить получение валюты»)\.|do not forget to press the («Confirm order fulfilment»|«Confirm currency receipt») button once you finish\.)")
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение об оплате заказа (2).
+    Лучше всего использовать вместе с MessageTypesRes.ORDER_PURCHASED
+    """
 
-        self.ORDER_CONFIRMED = re.compile(
-            r"(Покупатель|The buyer) [a-zA-Z0-9]+ (подтвердил успешное выполнение заказа|has confirmed that order) #[A-Z0-9]{8} (и отправил деньги продавцу|has been fulfilled successfully and that the seller) [a-zA-Z0-9]+( has been paid)?\.")
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение о подтверждении выполнения заказа.
-        """
+    ORDER_CONFIRMED = LazyPattern(
+        r"(Покупатель|The buyer) [a-zA-Z0-9]+ (подтвердил успешное выполнение заказа|has confirmed that order) #[A-Z0-9]{8} (и отправил деньги продавцу|has been fulfilled successfully and that the seller) [a-zA-Z0-9]+( has been paid)?\.")
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение о подтверждении выполнения заказа.
+    """
 
-        self.NEW_FEEDBACK = re.compile(
-            r"(Покупатель|The buyer) [a-zA-Z0-9]+ (написал отзыв к заказу|has given feedback to the order) #[A-Z0-9]{8}\."
-        )
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение о новом отзыве.
-        """
+    NEW_FEEDBACK = LazyPattern(
+        r"(Покупатель|The buyer) [a-zA-Z0-9]+ (написал отзыв к заказу|has given feedback to the order) #[A-Z0-9]{8}\."
+    )
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение о новом отзыве.
+    """
 
-        self.FEEDBACK_CHANGED = re.compile(
-            r"(Покупатель|The buyer) [a-zA-Z0-9]+ (изменил отзыв к заказу|has edited their feedback to the order) #[A-Z0-9]{8}\."
-        )
+    FEEDBACK_CHANGED = LazyPattern(
+        r"(Покупатель|The buyer) [a-zA-Z0-9]+ (изменил отзыв к заказу|has edited their feedback to the order) #[A-Z0-9]{8}\."
+    )
 
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение об изменении отзыва.
-        """
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение об изменении отзыва.
+    """
 
-        self.FEEDBACK_DELETED = re.compile(
-            r"(Покупатель|The buyer) [a-zA-Z0-9]+ (удалил отзыв к заказу|has deleted their feedback to the order) #[A-Z0-9]{8}\.")
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение об удалении отзыва.
-        """
+    FEEDBACK_DELETED = LazyPattern(
+        r"(Покупатель|The buyer) [a-zA-Z0-9]+ (удалил отзыв к заказу|has deleted their feedback to the order) #[A-Z0-9]{8}\.")
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение об удалении отзыва.
+    """
 
-        self.NEW_FEEDBACK_ANSWER = re.compile(
-            r"(Продавец|The seller) [a-zA-Z0-9]+ (ответил на отзыв к заказу|has replied to their feedback to the order) #[A-Z0-9]{8}\."
-        )
+    NEW_FEEDBACK_ANSWER = LazyPattern(
+        r"(Продавец|The seller) [a-zA-Z0-9]+ (ответил на отзыв к заказу|has replied to their feedback to the order) #[A-Z0-9]{8}\."
+    )
 
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение о новом ответе на отзыв.
-        """
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение о новом ответе на отзыв.
+    """
 
-        self.FEEDBACK_ANSWER_CHANGED = re.compile(
-            r"(Продавец|The seller) [a-zA-Z0-9]+ (изменил ответ на отзыв к заказу|has edited a reply to their feedback to the order) #[A-Z0-9]{8}\."
-        )
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение об изменении ответа на отзыв.
-        """
+    FEEDBACK_ANSWER_CHANGED = LazyPattern(
+        r"(Продавец|The seller) [a-zA-Z0-9]+ (изменил ответ на отзыв к заказу|has edited a reply to their feedback to the order) #[A-Z0-9]{8}\."
+    )
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение об изменении ответа на отзыв.
+    """
 
-        self.FEEDBACK_ANSWER_DELETED = re.compile(
-            r"(Продавец|The seller) [a-zA-Z0-9]+ (удалил ответ на отзыв к заказу|has deleted a reply to their feedback to the order) #[A-Z0-9]{8}\."
-        )
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение об удалении ответа на отзыв.
-        """
+    FEEDBACK_ANSWER_DELETED = LazyPattern(
+        r"(Продавец|The seller) [a-zA-Z0-9]+ (удалил ответ на отзыв к заказу|has deleted a reply to their feedback to the order) #[A-Z0-9]{8}\."
+    )
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение об удалении ответа на отзыв.
+    """
 
-        self.ORDER_REOPENED = re.compile(
-            r"(Заказ|Order) #[A-Z0-9]{8} (открыт повторно|has been reopened)\."
-        )
+    ORDER_REOPENED = LazyPattern(
+        r"(Заказ|Order) #[A-Z0-9]{8} (открыт повторно|has been reopened)\."
+    )
 
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение о повтором открытии заказа.
-        """
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение о повтором открытии заказа.
+    """
 
-        self.REFUND = re.compile(
-            r"(Продавец|The seller) [a-zA-Z0-9]+ (вернул деньги покупателю|has refunded the buyer) [a-zA-Z0-9]+ (по заказу|on order) #[A-Z0-9]{8}\."
-        )
+    REFUND = LazyPattern(
+        r"(Продавец|The seller) [a-zA-Z0-9]+ (вернул деньги покупателю|has refunded the buyer) [a-zA-Z0-9]+ (по заказу|on order) #[A-Z0-9]{8}\."
+    )
 
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение о возврате денежных средств.
-        """
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение о возврате денежных средств.
+    """
 
-        self.REFUND_BY_ADMIN = re.compile(
-            r"(Администратор|The administrator) [a-zA-Z0-9]+ (вернул деньги покупателю|has refunded the buyer) [a-zA-Z0-9]+ (по заказу|on order) #[A-Z0-9]{8}\."
-        )
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение о возврате денежных средств администратором.
-        """
+    REFUND_BY_ADMIN = LazyPattern(
+        r"(Администратор|The administrator) [a-zA-Z0-9]+ (вернул деньги покупателю|has refunded the buyer) [a-zA-Z0-9]+ (по заказу|on order) #[A-Z0-9]{8}\."
+    )
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение о возврате денежных средств администратором.
+    """
 
-        self.PARTIAL_REFUND = re.compile(
-            r"(Часть средств по заказу|A part of the funds pertaining to the order) #[A-Z0-9]{8} (возвращена покупателю|has been refunded)\."
-        )
+    PARTIAL_REFUND = LazyPattern(
+        r"(Часть средств по заказу|A part of the funds pertaining to the order) #[A-Z0-9]{8} (возвращена покупателю|has been refunded)\."
+    )
 
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение частичном о возврате денежных средств.
-        """
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение частичном о возврате денежных средств.
+    """
 
-        self.ORDER_CONFIRMED_BY_ADMIN = re.compile(
-            r"(Администратор|The administrator) [a-zA-Z0-9]+ (подтвердил успешное выполнение заказа|has confirmed that order) #[A-Z0-9]{8} (и отправил деньги продавцу|has been fulfilled successfully and that the seller) [a-zA-Z0-9]+( has been paid)?\.")
-        """
-        Скомпилированное регулярное выражение, описывающее сообщение о подтверждении выполнения заказа администратором.
-        """
+    ORDER_CONFIRMED_BY_ADMIN = LazyPattern(
+        r"(Администратор|The administrator) [a-zA-Z0-9]+ (подтвердил успешное выполнение заказа|has confirmed that order) #[A-Z0-9]{8} (и отправил деньги продавцу|has been fulfilled successfully and that the seller) [a-zA-Z0-9]+( has been paid)?\.")
+    """
+    Скомпилированное регулярное выражение, описывающее сообщение о подтверждении выполнения заказа администратором.
+    """
 
-        self.ORDER_ID = re.compile(r"#[A-Z0-9]{8}")
-        """
-        Скомпилированное регулярное выражение, описывающее ID заказа.
-        """
+    ORDER_ID = LazyPattern(r"#[A-Z0-9]{8}")
+    """
+    Скомпилированное регулярное выражение, описывающее ID заказа.
+    """
 
-        self.DISCORD = re.compile(
-            r"(You can switch to|Вы можете перейти в) Discord\. (However, note that friending someone is considered a violation rules|Внимание: общение за пределами сервера FunPay считается нарушением правил)\.")
-        """
-        Скомпилированное регулярное выражение о предложении перехода в Discord.
-        """
-        self.DEAR_VENDORS = re.compile(
-            r"(Уважаемые продавцы|Dear vendors), (не доверяйте сообщениям в чате|do not rely on chat messages)! (Перед выполнением заказа всегда проверяйте наличие оплаты в разделе «Мои продажи»|Before you process an order, you should always check whether you've been paid in «My sales» section)\.")
-        """
-        Скомпилированное регулярное выражение первого сообщения FunPay.
-        """
+    DISCORD = LazyPattern(
+        r"(You can switch to|Вы можете перейти в) Discord\. (However, note that friending someone is considered a violation rules|Внимание: общение за пределами сервера FunPay считается нарушением правил)\.")
+    """
+    Скомпилированное регулярное выражение о предложении перехода в Discord.
+    """
+    DEAR_VENDORS = LazyPattern(
+        r"(Уважаемые продавцы|Dear vendors), (не доверяйте сообщениям в чате|do not rely on chat messages)! (Перед выполнением заказа всегда проверяйте наличие оплаты в разделе «Мои продажи»|Before you process an order, you should always check whether you've been paid in «My sales» section)\.")
+    """
+    Скомпилированное регулярное выражение первого сообщения FunPay.
+    """
 
-        self.PRODUCTS_AMOUNT = re.compile(r",\s(\d{1,3}(?:\s?\d{3})*)\s(шт|pcs)\.")
-        """
-        Скомпилированное регулярное выражение, описывающее запись кол-ва товаров в заказе со страницы заказОВ.
-        """
+    PRODUCTS_AMOUNT = LazyPattern(r",\s(\d{1,3}(?:\s?\d{3})*)\s(шт|pcs)\.")
+    """
+    Скомпилированное регулярное выражение, описывающее запись кол-ва товаров в заказе со страницы заказОВ.
+    """
+
+    PRODUCTS_AMOUNT_ORDER = LazyPattern(r"(\d{1,3}(?:\s?\d{3})*)\s(шт|pcs)\.")
+    """
+    Скомпилированное регулярное выражение, описывающее запись кол-ва товаров со страницы заказА.
+    """
+
+    EXCHANGE_RATE = LazyPattern(
+        r"(You will receive payment in|Вы начнёте получать оплату в|Ви почнете одержувати оплату в)\s*(USD|RUB|EUR)\.\s*(Your offers prices will be calculated based on the exchange rate:|Цены ваших предложений будут пересчитаны по курсу|Ціни ваших пропозицій будуть перераховані за курсом)\s*([\d.,]+)\s*(₽|€|\$)\s*(за|for)\s*([\d.,]+)\s*(₽|€|\$)\.")
+    """
+    Скомпилированное регулярное выражение, описывающее фразу о смене валюты.
+    """
 
-        self.PRODUCTS_AMOUNT_ORDER = re.compile(r"(\d{1,3}(?:\s?\d{3})*)\s(шт|pcs)\.")
-        """
-        Скомпилированное регулярное выражение, описывающее запись кол-ва товаров со страницы заказА.
-        """
 
-        self.EXCHANGE_RATE = re.compile(
-            r"(You will receive payment in|Вы начнёте получать оплату в|Ви почнете одержувати оплату в)\s*(USD|RUB|EUR)\.\s*(Your offers prices will be calculated based on the exchange rate:|Цены ваших предложений будут пересчитаны по курсу|Ціни ваших пропозицій будуть перераховані за курсом)\s*([\d.,]+)\s*(₽|€|\$)\s*(за|for)\s*([\d.,]+)\s*(₽|€|\$)\.")
+class MessageTypesClassifier(object):
+    """
+    Определяет тип системного сообщения (:class:`FunPayAPI.common.enums.MessageTypes`) по его тексту.
+
+    Вместо последовательной проверки текста всеми регулярными выражениями из
+    :class:`FunPayAPI.common.utils.RegularExpressions` текст один раз просматривается общим выражением,
+    которое ищет ключевые фразы системных сообщений. Полные выражения затем проверяются только для найденных
+    фраз и в том же порядке, что и раньше, поэтому результат совпадает с последовательной проверкой,
+    а обычные (несистемные) сообщения отсеиваются за один проход.
+    Класс является singleton'ом.
+    """
+
+    KEY_PHRASES: dict[str, tuple[str, ...]] = {
+        "DISCORD": ("Discord.",),
+        "DEAR_VENDORS": ("Уважаемые продавцы", "Dear vendors"),
+        "ORDER_PURCHASED": ("оплатил заказ", "has paid for order"),
+        "ORDER_PURCHASED2": ("не забудьте потом нажать кнопку", "do not forget to press the"),
+        "ORDER_CONFIRMED": ("подтвердил успешное выполнение заказа", "has confirmed that order"),
+        "ORDER_CONFIRMED_BY_ADMIN": ("подтвердил успешное выполнение заказа", "has confirmed that order"),
+        "NEW_FEEDBACK": ("написал отзыв к заказу", "has given feedback to the order"),
+        "FEEDBACK_CHANGED": ("изменил отзыв к заказу", "has edited their feedback to the order"),
+        "FEEDBACK_DELETED": ("удалил отзыв к заказу", "has deleted their feedback to the order"),
+        "NEW_FEEDBACK_ANSWER": ("ответил на отзыв к заказу", "has replied to their feedback to the order"),
+        "FEEDBACK_ANSWER_CHANGED": ("изменил ответ на отзыв к заказу",
+                                    "has edited a reply to their feedback to the order"),
+        "FEEDBACK_ANSWER_DELETED": ("удалил ответ на отзыв к заказу",
+                                    "has deleted a reply to their feedback to the order"),
+        "REFUND": ("вернул деньги покупателю", "has refunded the buyer"),
+        "REFUND_BY_ADMIN": ("вернул деньги покупателю", "has refunded the buyer"),
+        "PARTIAL_REFUND": ("Часть средств по заказу", "A part of the funds pertaining to the order"),
+        "ORDER_REOPENED": ("открыт повторно", "has been reopened")
+    }
+    """
+    Фразы, без которых соответствующее регулярное выражение из
+    :class:`FunPayAPI.common.utils.RegularExpressions` не может совпасть {название выражения: фразы}.
+    """
+
+    ORDER_TYPES: tuple[MessageTypes, ...] = (
+        MessageTypes.ORDER_CONFIRMED,
+        MessageTypes.NEW_FEEDBACK,
+        MessageTypes.NEW_FEEDBACK_ANSWER,
+        MessageTypes.FEEDBACK_CHANGED,
+        MessageTypes.FEEDBACK_DELETED,
+        MessageTypes.REFUND,
+        MessageTypes.FEEDBACK_ANSWER_CHANGED,
+        MessageTypes.FEEDBACK_ANSWER_DELETED,
+        MessageTypes.ORDER_CONFIRMED_BY_ADMIN,
+        MessageTypes.PARTIAL_REFUND,
+        MessageTypes.ORDER_REOPENED,
+        MessageTypes.REFUND_BY_ADMIN
+    )
+    """
+    Типы сообщений с ID заказа в порядке проверки (от самых часто-используемых к самым редко-используемым).
+    Названия типов совпадают с названиями регулярных выражений.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        if not hasattr(cls, "instance"):
+            instance = super(MessageTypesClassifier, cls).__new__(cls)
+            instance.__build()
+            setattr(cls, "instance", instance)
+        return getattr(cls, "instance")
+
+    def __build(self):
+        self.__res = RegularExpressions()
+        self.__phrases: dict[str, set[str]] = {}
+        for name, phrases in self.KEY_PHRASES.items():
+            for phrase in phrases:
+                self.__phrases.setdefault(phrase, set()).add(name)
+        alternatives = "|".join(re.escape(i) for i in sorted(self.__phrases, key=len, reverse=True))
+        self.__scanner = re.compile(alternatives)
+
+    def classify(self, text: str | None) -> MessageTypes:
         """
-        Скомпилированное регулярное выражение, описывающее фразу о смене валюты.
+        Определяет тип сообщения по тексту.
+
+        :param text: текст сообщения.
+        :type text: :obj:`str` or :obj:`None`
+
+        :return: тип сообщения.
+        :rtype: :class:`FunPayAPI.common.enums.MessageTypes`
         """
+        if not text:
+            return MessageTypes.NON_SYSTEM
+
+        candidates = set()
+        match = self.__scanner.search(text)
+        while match:
+            candidates.update(self.__phrases[match.group()])
+            # Следующую фразу ищем со следующего символа, а не с конца найденной: фразы могут пересекаться.
+            match = self.__scanner.search(text, match.start() + 1)
+        if not candidates:
+            return MessageTypes.NON_SYSTEM
+
+        res = self.__res
+        if "DISCORD" in candidates and res.DISCORD.search(text):
+            return MessageTypes.DISCORD
+        if "DEAR_VENDORS" in candidates and res.DEAR_VENDORS.search(text):
+            return MessageTypes.DEAR_VENDORS
+        if "ORDER_PURCHASED" in candidates and "ORDER_PURCHASED2" in candidates \
+                and res.ORDER_PURCHASED.search(text) and res.ORDER_PURCHASED2.search(text):
+            return MessageTypes.ORDER_PURCHASED
+
+        if res.ORDER_ID.search(text) is None:
+            return MessageTypes.NON_SYSTEM
+
+        for i in self.ORDER_TYPES:
+            if i.name in candidates and getattr(res, i.name).search(text):
+                return i
+        return MessageTypes.NON_SYSTEM
+
+
+def get_message_type(text: str | None) -> MessageTypes:
+    """
+    Определяет тип сообщения по тексту (см. :class:`FunPayAPI.common.utils.MessageTypesClassifier`).
+
+    :param text: текст сообщения.
+
+    :return: тип сообщения.
+    """
+    return MessageTypesClassifier().classify(text)
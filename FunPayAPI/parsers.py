@@ -0,0 +1,212 @@
+"""
+В данном модуле описаны бэкенды парсинга HTML-страниц FunPay.
+
+Бэкенд определяет только то, как из страницы достаются "сырые" значения. Объекты
+(:class:`FunPayAPI.types.OrderShortcut` и т.д.) создаются в :class:`FunPayAPI.account.Account` одинаково для всех
+бэкендов.
+"""
+from __future__ import annotations
+
+from typing import Any, Literal
+from abc import ABC, abstractmethod
+import functools
+import json
+
+
+class SalesRow:
+    """
+    Данный класс представляет "сырые" значения строки (виджета заказа) со страницы https://funpay.com/orders/trade
+
+    :param description: описание заказа.
+    :param price: текст цены заказа вместе с валютой (например, "100.50 ₽").
+    :param buyer_username: никнейм покупателя.
+    :param buyer_link: ссылка на профиль покупателя.
+    :param subcategory_name: название подкатегории ("Игра, Раздел").
+    :param date: текст даты заказа (например, "сегодня, 12:34").
+    """
+
+    def __init__(self, description: str, price: str, buyer_username: str, buyer_link: str,
+                 subcategory_name: str, date: str):
+        self.description: str = description
+        self.price: str = price
+        self.buyer_username: str = buyer_username
+        self.buyer_link: str = buyer_link
+        self.subcategory_name: str = subcategory_name
+        self.date: str = date
+
+
+class SalesPage:
+    """
+    Данный класс представляет результат разбора страницы https://funpay.com/orders/trade
+
+    :param authorized: найден ли на странице блок с никнеймом пользователя.
+    :param next_order_id: ID заказа, с которого начинается следующая страница (или :obj:`None`).
+    :param app_data: данные из атрибута data-app-data тега body (или :obj:`None`, если они не парсились).
+    :param games: список фильтров игр [(название игры, JSON со списком разделов), ...] (или :obj:`None`).
+    :param rows: строки (виджеты заказов) в формате, который понимает создавший страницу бэкенд.
+    """
+
+    def __init__(self, authorized: bool, next_order_id: str | None, app_data: dict | None,
+                 games: list[tuple[str, str]] | None, rows: list[Any]):
+        self.authorized: bool = authorized
+        self.next_order_id: str | None = next_order_id
+        self.app_data: dict | None = app_data
+        self.games: list[tuple[str, str]] | None = games
+        self.rows: list[Any] = rows
+
+
+class SalesParser(ABC):
+    """
+    Базовый (абстрактный) класс бэкенда парсинга страницы продаж.
+    Строки разбираются по частям, чтобы :meth:`FunPayAPI.account.Account.get_sales` мог отбросить строку
+    по статусу / ID заказа, не разбирая ее целиком.
+    """
+    name: str = ""
+
+    @abstractmethod
+    def parse_page(self, html: str, full: bool = True) -> SalesPage:
+        """
+        Разбирает страницу продаж.
+
+        :param html: HTML страницы.
+        :param full: парсить ли шапку страницы (никнейм пользователя, app-data, фильтры игр)?
+
+        :return: результат разбора страницы.
+        """
+        pass
+
+    @abstractmethod
+    def row_classes(self, row: Any) -> list[str]:
+        """Возвращает CSS-классы строки."""
+        pass
+
+    @abstractmethod
+    def row_order_id(self, row: Any) -> str:
+        """Возвращает текст ID заказа (вместе с '#')."""
+        pass
+
+    @abstractmethod
+    def row_fields(self, row: Any) -> SalesRow:
+        """Возвращает остальные значения строки."""
+        pass
+
+    @abstractmethod
+    def row_html(self, row: Any) -> str:
+        """Возвращает HTML-код строки."""
+        pass
+
+
+class BeautifulSoupSalesParser(SalesParser):
+    """
+    Бэкенд на основе BeautifulSoup (поведение по умолчанию).
+    """
+    name = "bs4"
+
+    def parse_page(self, html: str, full: bool = True) -> SalesPage:
+        from bs4 import BeautifulSoup
+
+        parser = BeautifulSoup(html, "lxml")
+        authorized, app_data, games = True, None, None
+        if full:
+            authorized = parser.find("div", {"class": "user-link-name"}) is not None
+            if authorized:
+                app_data = json.loads(parser.find("body").get("data-app-data"))
+                games_options = parser.find("select", attrs={"name": "game"})
+                if games_options:
+                    games = [(i.text, i.get("data-data"))
+                             for i in games_options.find_all(lambda x: x.name == "option" and x.get("value"))]
+
+        next_order_id = parser.find("input", {"type": "hidden", "name": "continue"})
+        next_order_id = next_order_id.get("value") if next_order_id else None
+        return SalesPage(authorized, next_order_id, app_data, games, parser.find_all("a", {"class": "tc-item"}))
+
+    def row_classes(self, row) -> list[str]:
+        return row.get("class")
+
+    def row_order_id(self, row) -> str:
+        return row.find("div", {"class": "tc-order"}).text
+
+    def row_fields(self, row) -> SalesRow:
+        buyer_div = row.find("div", {"class": "media-user-name"}).find("span")
+        return SalesRow(row.find("div", {"class": "order-desc"}).find("div").text,
+                        row.find("div", {"class": "tc-price"}).text,
+                        buyer_div.text, buyer_div.get("data-href"),
+                        row.find("div", {"class": "text-muted"}).text,
+                        row.find("div", {"class": "tc-date-time"}).text)
+
+    def row_html(self, row) -> str:
+        return str(row)
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlSalesParser(SalesParser):
+    """
+    Бэкенд на основе lxml и заранее скомпилированных XPath-выражений.
+    Не строит дерево BeautifulSoup, поэтому в разы быстрее на больших страницах.
+    """
+    name = "lxml"
+
+    def __init__(self):
+        from lxml import etree
+
+        self._etree = etree
+        self._user_link = etree.XPath(f"//div[{_has_class('user-link-name')}]")
+        self._app_data = etree.XPath("//body/@data-app-data")
+        self._games_select = etree.XPath("(//select[@name='game'])[1]")
+        self._games = etree.XPath(".//option[@value and @value!='']")
+        self._next_order = etree.XPath("(//input[@type='hidden' and @name='continue'])[1]/@value")
+        self._rows = etree.XPath(f"//a[{_has_class('tc-item')}]")
+        self._order_id = etree.XPath(f"(.//div[{_has_class('tc-order')}])[1]")
+        self._description = etree.XPath(f"(.//div[{_has_class('order-desc')}])[1]/descendant::div[1]")
+        self._price = etree.XPath(f"(.//div[{_has_class('tc-price')}])[1]")
+        self._buyer = etree.XPath(f"(.//div[{_has_class('media-user-name')}])[1]/descendant::span[1]")
+        self._subcategory = etree.XPath(f"(.//div[{_has_class('text-muted')}])[1]")
+        self._date = etree.XPath(f"(.//div[{_has_class('tc-date-time')}])[1]")
+
+    def parse_page(self, html: str, full: bool = True) -> SalesPage:
+        from lxml import html as lxml_html
+
+        tree = lxml_html.document_fromstring(html)
+        authorized, app_data, games = True, None, None
+        if full:
+            authorized = bool(self._user_link(tree))
+            if authorized:
+                app_data = json.loads(self._app_data(tree)[0])
+                if games_select := self._games_select(tree):
+                    games = [(i.text_content(), i.get("data-data")) for i in self._games(games_select[0])]
+
+        next_order_id = self._next_order(tree)
+        return SalesPage(authorized, next_order_id[0] if next_order_id else None, app_data, games, self._rows(tree))
+
+    def row_classes(self, row) -> list[str]:
+        return row.get("class", "").split()
+
+    def row_order_id(self, row) -> str:
+        return self._order_id(row)[0].text_content()
+
+    def row_fields(self, row) -> SalesRow:
+        buyer = self._buyer(row)[0]
+        return SalesRow(self._description(row)[0].text_content(), self._price(row)[0].text_content(),
+                        buyer.text_content(), buyer.get("data-href"), self._subcategory(row)[0].text_content(),
+                        self._date(row)[0].text_content())
+
+    def row_html(self, row) -> str:
+        return self._etree.tostring(row, encoding="unicode", method="html", with_tail=False)
+
+
+@functools.cache
+def get_sales_parser(name: Literal["bs4", "lxml"]) -> SalesParser:
+    """
+    Возвращает бэкенд парсинга страницы продаж по его названию.
+
+    :param name: название бэкенда ("bs4" / "lxml").
+
+    :return: экземпляр бэкенда.
+    """
+    parsers = {i.name: i for i in (BeautifulSoupSalesParser, LxmlSalesParser)}
+    if name not in parsers:
+        raise ValueError(f"Неизвестный бэкенд парсинга: {name}. Доступные: {', '.join(parsers)}.")
+    return parsers[name]()
@@ -7,7 +7,7 @@ import re
 from typing import Literal, overload, Optional
 
 import FunPayAPI.common.enums
-from .common.utils import RegularExpressions
+from .common.utils import RegularExpressions, get_message_type
 from .common.enums import MessageTypes, OrderStatuses, SubCategoryTypes, Currency
 import datetime
 
@@ -17,6 +17,8 @@ class BaseOrderInfo:
     Класс, представляющий информацию о заказе.
     """
 
+    __slots__ = ("_order", "_order_attempt_made", "_order_attempt_error")
+
     def __init__(self):
         self._order: Order | None = None
         """Объект заказа"""
@@ -43,12 +45,15 @@ class ChatShortcut(BaseOrderInfo):
     :type unread: :obj:`bool`
 
     :param html: HTML код виджета чата.
-    :type html: :obj:`str`
+    :type html: :obj:`str` or :obj:`None` (см. :class:`FunPayAPI.common.enums.HTMLRetentionModes`)
 
     :param determine_msg_type: определять ли тип последнего сообщения?
     :type determine_msg_type: :obj:`bool`, опционально
     """
 
+    __slots__ = ("id", "name", "last_message_text", "last_by_bot", "last_by_vertex", "unread", "node_msg_id",
+                 "user_msg_id", "last_message_type", "html")
+
     def __init__(self, id_: int, name: str, last_message_text: str, node_msg_id: int, user_msg_id: int,
                  unread: bool, html: str, determine_msg_type: bool = True):
         self.id: int = id_
@@ -85,40 +90,7 @@ class ChatShortcut(BaseOrderInfo):
         :return: тип последнего сообщения.
         :rtype: :class:`FunPayAPI.common.enums.MessageTypes`
         """
-        res = RegularExpressions()
-        if res.DISCORD.search(self.last_message_text):
-            return MessageTypes.DISCORD
-
-        if res.DEAR_VENDORS.search(self.last_message_text):
-            return MessageTypes.DEAR_VENDORS
-
-        if res.ORDER_PURCHASED.findall(self.last_message_text) and res.ORDER_PURCHASED2.findall(self.last_message_text):
-            return MessageTypes.ORDER_PURCHASED
-
-        if res.ORDER_ID.search(self.last_message_text) is None:
-            return MessageTypes.NON_SYSTEM
-
-        # Регулярные выражения выставлены в порядке от самых часто-используемых к самым редко-используемым
-        sys_msg_types = {
-            MessageTypes.ORDER_CONFIRMED: res.ORDER_CONFIRMED,
-            MessageTypes.NEW_FEEDBACK: res.NEW_FEEDBACK,
-            MessageTypes.NEW_FEEDBACK_ANSWER: res.NEW_FEEDBACK_ANSWER,
-            MessageTypes.FEEDBACK_CHANGED: res.FEEDBACK_CHANGED,
-            MessageTypes.FEEDBACK_DELETED: res.FEEDBACK_DELETED,
-            MessageTypes.REFUND: res.REFUND,
-            MessageTypes.FEEDBACK_ANSWER_CHANGED: res.FEEDBACK_ANSWER_CHANGED,
-            MessageTypes.FEEDBACK_ANSWER_DELETED: res.FEEDBACK_ANSWER_DELETED,
-            MessageTypes.ORDER_CONFIRMED_BY_ADMIN: res.ORDER_CONFIRMED_BY_ADMIN,
-            MessageTypes.PARTIAL_REFUND: res.PARTIAL_REFUND,
-            MessageTypes.ORDER_REOPENED: res.ORDER_REOPENED,
-            MessageTypes.REFUND_BY_ADMIN: res.REFUND_BY_ADMIN
-        }
-
-        for i in sys_msg_types:
-            if sys_msg_types[i].search(self.last_message_text):
-                return i
-        else:
-            return MessageTypes.NON_SYSTEM
+        return get_message_type(self.last_message_text)
 
     def __str__(self):
         return self.last_message_text
@@ -129,6 +101,8 @@ class BuyerViewing:
     Данный класс представляет поле "Покупатель смотрит"
     """
 
+    __slots__ = ("buyer_id", "link", "text", "tag", "html")
+
     def __init__(self, buyer_id: int, link: str | None, text: str | None, tag: str | None, html: str | None = None):
         """
         :param buyer_id: ID покупателя.
@@ -215,6 +189,11 @@ class Message(BaseOrderInfo):
     :type determine_msg_type: :obj:`bool`, опционально
     """
 
+    __slots__ = ("id", "text", "chat_id", "chat_name", "interlocutor_id", "buyer_viewing", "type", "author",
+                 "author_id", "html", "image_link", "image_name", "by_bot", "by_vertex", "badge", "is_employee",
+                 "is_support", "is_moderation", "is_arbitration", "is_autoreply", "initiator_username", "initiator_id",
+                 "i_am_seller", "i_am_buyer")
+
     def __init__(self, id_: int, text: str | None, chat_id: int | str, chat_name: str | None,
                  interlocutor_id: int | None,
                  author: str | None, author_id: int, html: str,
@@ -283,42 +262,7 @@ class Message(BaseOrderInfo):
         :return: тип последнего сообщения в чате.
         :rtype: :class:`FunPayAPI.common.enums.MessageTypes`
         """
-        if not self.text:
-            return MessageTypes.NON_SYSTEM
-
-        res = RegularExpressions()
-        if res.DISCORD.search(self.text):
-            return MessageTypes.DISCORD
-        if res.DEAR_VENDORS.search(self.text):
-            return MessageTypes.DEAR_VENDORS
-
-        if res.ORDER_PURCHASED.findall(self.text) and res.ORDER_PURCHASED2.findall(self.text):
-            return MessageTypes.ORDER_PURCHASED
-
-        if res.ORDER_ID.search(self.text) is None:
-            return MessageTypes.NON_SYSTEM
-
-        # Регулярные выражения выставлены в порядке от самых часто-используемых к самым редко-используемым
-        sys_msg_types = {
-            MessageTypes.ORDER_CONFIRMED: res.ORDER_CONFIRMED,
-            MessageTypes.NEW_FEEDBACK: res.NEW_FEEDBACK,
-            MessageTypes.NEW_FEEDBACK_ANSWER: res.NEW_FEEDBACK_ANSWER,
-            MessageTypes.FEEDBACK_CHANGED: res.FEEDBACK_CHANGED,
-            MessageTypes.FEEDBACK_DELETED: res.FEEDBACK_DELETED,
-            MessageTypes.REFUND: res.REFUND,
-            MessageTypes.FEEDBACK_ANSWER_CHANGED: res.FEEDBACK_ANSWER_CHANGED,
-            MessageTypes.FEEDBACK_ANSWER_DELETED: res.FEEDBACK_ANSWER_DELETED,
-            MessageTypes.ORDER_CONFIRMED_BY_ADMIN: res.ORDER_CONFIRMED_BY_ADMIN,
-            MessageTypes.PARTIAL_REFUND: res.PARTIAL_REFUND,
-            MessageTypes.ORDER_REOPENED: res.ORDER_REOPENED,
-            MessageTypes.REFUND_BY_ADMIN: res.REFUND_BY_ADMIN
-        }
-
-        for i in sys_msg_types:
-            if sys_msg_types[i].search(self.text):
-                return i
-        else:
-            return MessageTypes.NON_SYSTEM
+        return get_message_type(self.text)
 
     def __str__(self):
         return self.text if self.text is not None else self.image_link if self.image_link is not None else ""
@@ -362,12 +306,15 @@ class OrderShortcut(BaseOrderInfo):
     :type subcategory: :class:`FunPayAPI.types.SubCategory` or :obj:`None`
 
     :param html: HTML код виджета заказа.
-    :type html: :obj:`str`
+    :type html: :obj:`str` or :obj:`None` (см. :class:`FunPayAPI.common.enums.HTMLRetentionModes`)
 
     :param dont_search_amount: не искать кол-во товара.
     :type dont_search_amount: :obj:`bool`, опционально
     """
 
+    __slots__ = ("id", "description", "price", "currency", "amount", "buyer_username", "buyer_id", "chat_id", "status",
+                 "date", "subcategory_name", "subcategory", "html")
+
     def __init__(self, id_: str, description: str, price: float, currency: Currency,
                  buyer_username: str, buyer_id: int, chat_id: int | str, status: OrderStatuses,
                  date: datetime.datetime, subcategory_name: str, subcategory: SubCategory | None,
@@ -413,6 +360,41 @@ class OrderShortcut(BaseOrderInfo):
             return int(result[0][0].replace(" ", ""))
         return 1
 
+    def to_dict(self) -> dict:
+        """
+        Возвращает данные заказа в виде JSON-совместимого словаря (без HTML-кода виджета).
+        Используется для сохранения состояния :class:`FunPayAPI.updater.runner.Runner`.
+
+        :return: данные заказа.
+        :rtype: :obj:`dict`
+        """
+        return {"id": self.id, "description": self.description, "price": self.price, "currency": self.currency.name,
+                "amount": self.amount, "buyer_username": self.buyer_username, "buyer_id": self.buyer_id,
+                "chat_id": self.chat_id, "status": self.status.name, "date": self.date.isoformat(),
+                "subcategory_name": self.subcategory_name,
+                "subcategory": [self.subcategory.type.name, self.subcategory.id] if self.subcategory else None}
+
+    @classmethod
+    def from_dict(cls, data: dict, subcategory: SubCategory | None = None) -> OrderShortcut:
+        """
+        Создает объект заказа из словаря, полученного :meth:`FunPayAPI.types.OrderShortcut.to_dict`.
+
+        :param data: данные заказа.
+        :type data: :obj:`dict`
+
+        :param subcategory: подкатегория, к которой относится заказ.
+        :type subcategory: :class:`FunPayAPI.types.SubCategory` or :obj:`None`, опционально
+
+        :return: объект заказа.
+        :rtype: :class:`FunPayAPI.types.OrderShortcut`
+        """
+        order = cls(data["id"], data["description"], data["price"], Currency[data["currency"]],
+                    data["buyer_username"], data["buyer_id"], data["chat_id"], OrderStatuses[data["status"]],
+                    datetime.datetime.fromisoformat(data["date"]), data["subcategory_name"], subcategory, None,
+                    dont_search_amount=True)
+        order.amount = data["amount"]
+        return order
+
     def __str__(self):
         return self.description
 
@@ -923,6 +905,8 @@ class SellerShortcut:
     Класс, описывающий объект пользователя из таблицы предложений.
     """
 
+    __slots__ = ("id", "username", "online", "stars", "reviews", "html")
+
     def __init__(self, id_: int, username: str, online: bool, stars: None | int, reviews: int,
                  html: str):
         self.id: int = id_
@@ -966,9 +950,12 @@ class LotShortcut:
     :type subcategory: :class:`FunPayAPI.types.SubCategory`
 
     :param html: HTML код виджета лота.
-    :type html: :obj:`str`
+    :type html: :obj:`str` or :obj:`None` (см. :class:`FunPayAPI.common.enums.HTMLRetentionModes`)
     """
 
+    __slots__ = ("id", "server", "description", "title", "amount", "price", "currency", "seller", "auto", "promo",
+                 "attributes", "subcategory", "html", "public_link")
+
     def __init__(self, id_: int | str, server: str | None,
                  description: str | None, amount: int | None, price: float, currency: Currency,
                  subcategory: SubCategory | None,
@@ -1030,9 +1017,12 @@ class MyLotShortcut:
     :type subcategory: :class:`FunPayAPI.types.SubCategory`
 
     :param html: HTML код виджета лота.
-    :type html: :obj:`str`
+    :type html: :obj:`str` or :obj:`None` (см. :class:`FunPayAPI.common.enums.HTMLRetentionModes`)
     """
 
+    __slots__ = ("id", "server", "description", "title", "amount", "price", "currency", "auto", "subcategory", "active",
+                 "html", "public_link")
+
     def __init__(self, id_: int | str, server: str | None,
                  description: str | None, amount: int | None, price: float, currency: Currency,
                  subcategory: SubCategory | None, auto: bool, active: bool,
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, AsyncGenerator
+import asyncio
+import logging
+
+if TYPE_CHECKING:
+    from ..async_account import AsyncAccount
+
+from .runner import Runner
+from .events import *
+from .scheduler import AdaptiveScheduler
+
+logger = logging.getLogger("FunPayAPI.runner")
+
+
+class AsyncRunner:
+    """
+    Асинхронная версия :class:`FunPayAPI.updater.runner.Runner`.
+
+    Получение и парсинг событий выполняются тем же кодом, что и у синхронного Runner'а (в пуле потоков
+    :class:`FunPayAPI.async_account.AsyncAccount`), а ожидание между запросами не блокирует event loop.
+    Как и :class:`FunPayAPI.async_account.AsyncAccount`, это промежуточный шаг: события по-прежнему получаются
+    синхронным Runner'ом в потоке пула, bot.py использует синхронный Runner напрямую.
+
+    :param account: асинхронный экземпляр аккаунта (должен быть инициализирован с помощью метода
+        :meth:`FunPayAPI.async_account.AsyncAccount.get`).
+    :type account: :class:`FunPayAPI.async_account.AsyncAccount`
+
+    Остальные аргументы передаются в :class:`FunPayAPI.updater.runner.Runner`.
+    """
+
+    def __init__(self, account: AsyncAccount, *args, **kwargs):
+        self.account: AsyncAccount = account
+        """Асинхронный экземпляр аккаунта, к которому привязан Runner."""
+        self.runner: Runner = Runner(account.account, *args, **kwargs)
+        """Синхронный Runner, через который получаются и парсятся события."""
+
+    def __getattr__(self, item: str):
+        # saved_orders, last_messages_ids, runner_len и т.д. берутся у синхронного Runner'а.
+        if item in ("account", "runner"):
+            raise AttributeError(item)
+        return getattr(self.runner, item)
+
+    async def listen(self, requests_delay: int | float | AdaptiveScheduler = 6.0,
+                     ignore_exceptions: bool = True) -> AsyncGenerator[InitialChatEvent | ChatsListChangedEvent |
+                                                                       LastChatMessageChangedEvent | NewMessageEvent |
+                                                                       InitialOrderEvent | OrdersListChangedEvent |
+                                                                       NewOrderEvent | OrderStatusChangedEvent, None]:
+        """
+        Бесконечно отправляет запросы для получения новых событий.
+
+        :param requests_delay: задержка между запросами (в секундах) или адаптивный планировщик задержки.
+        :type requests_delay: :obj:`int` or :obj:`float` or
+            :class:`FunPayAPI.updater.scheduler.AdaptiveScheduler`, опционально
+
+        :param ignore_exceptions: игнорировать ошибки?
+        :type ignore_exceptions: :obj:`bool`, опционально
+
+        :return: асинхронный генератор событий FunPay.
+        :rtype: :obj:`AsyncGenerator` of :class:`FunPayAPI.updater.events.InitialChatEvent`,
+            :class:`FunPayAPI.updater.events.ChatsListChangedEvent`,
+            :class:`FunPayAPI.updater.events.LastChatMessageChangedEvent`,
+            :class:`FunPayAPI.updater.events.NewMessageEvent`, :class:`FunPayAPI.updater.events.InitialOrderEvent`,
+            :class:`FunPayAPI.updater.events.OrdersListChangedEvent`,
+            :class:`FunPayAPI.updater.events.NewOrderEvent`,
+            :class:`FunPayAPI.updater.events.OrderStatusChangedEvent`
+        """
+        events = []
+        scheduler = requests_delay if isinstance(requests_delay, AdaptiveScheduler) else None
+        while True:
+            ready_events, error = [], False
+            try:
+                ready_events, events = await self.account.run(self.runner.poll, events)
+                for event in ready_events:
+                    yield event
+            except Exception as e:
+                if not ignore_exceptions:
+                    raise e
+                else:
+                    error = True
+                    logger.error("Произошла ошибка при получении событий. "
+                                 "(ничего страшного, если это сообщение появляется нечасто).")
+                    logger.debug("TRACEBACK", exc_info=True)
+            if scheduler:
+                await asyncio.sleep(scheduler.next_delay(ready_events, self.account.account.last_429_err_time, error))
+            else:
+                await asyncio.sleep(requests_delay)
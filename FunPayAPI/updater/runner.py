@@ -1,17 +1,22 @@
 from __future__ import annotations
 
 import re
-from typing import TYPE_CHECKING, Generator
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Generator
 
 if TYPE_CHECKING:
     from ..account import Account
 
+import datetime
 import json
 import logging
 from bs4 import BeautifulSoup
 
 from ..common import exceptions
+from ..common.storage import BoundedDict
 from .events import *
+from .scheduler import AdaptiveScheduler
 
 logger = logging.getLogger("FunPayAPI.runner")
 
@@ -39,11 +44,80 @@ class Runner:
         Из событий, связанных с заказами, будет возвращаться только
         :class:`FunPayAPI.updater.events.OrdersListChangedEvent`.
     :type disabled_order_requests: :obj:`bool`, опционально
+
+    :param incremental_orders: обновлять ли список заказов инкрементально?\n
+        Если `True`, при изменении счетчика заказов парсятся только новые заказы и заказы с изменившимся статусом
+        (разбор страницы прекращается на первом известном заказе с прежним статусом), а найденные изменения
+        добавляются в :attr:`FunPayAPI.updater.runner.Runner.saved_orders`, а не заменяют его.
+    :type incremental_orders: :obj:`bool`, опционально
+
+    :param max_chats: макс. кол-во чатов, состояние которых хранится в памяти (ID последних сообщений и т.д.).
+        Чаты, дольше всего не менявшиеся, вытесняются. Вытесненный чат снова отслеживается, когда в нем
+        появляется сообщение новее последнего сообщения, известного на момент вытеснения, поэтому старые сообщения
+        повторно не приходят. Значение должно с запасом превышать кол-во чатов, меняющихся между запросами
+        (:obj:`None` - без ограничения).
+    :type max_chats: :obj:`int` or :obj:`None`, опционально
+
+    :param max_orders: макс. кол-во заказов в :attr:`FunPayAPI.updater.runner.Runner.saved_orders`.
+        Заказы, дольше всего не менявшиеся, вытесняются. Вытесненный заказ, снова попавший в список продаж,
+        сохраняется без событий, если он старше последнего вытесненного заказа или создан в ту же минуту и
+        сам был вытеснен (:obj:`None` - без ограничения).
+    :type max_orders: :obj:`int` or :obj:`None`, опционально
+
+    :param state_ttl: время (в секундах), через которое вытесняется состояние чата / заказа, не менявшегося все
+        это время (:obj:`None` - без ограничения).
+    :type state_ttl: :obj:`int` or :obj:`float` or :obj:`None`, опционально
+
+    :param store_factory: функция, создающая хранилище состояния. Вызывается с аргументами maxsize, ttl и
+        on_evict (функция, которую хранилище должно вызывать с ключом и значением каждой вытесненной записи).
+    :type store_factory: :obj:`Callable`, опционально
+
+    :param history_workers: макс. кол-во одновременных запросов историй чатов. Изменившиеся чаты запрашиваются
+        пачками по :attr:`FunPayAPI.updater.runner.Runner.runner_len`; при значении больше 1 - параллельно.
+        События создаются в порядке чатов, как и при последовательных запросах.\n
+        Запросы runner/ по-прежнему проходят через :attr:`FunPayAPI.account.Account.rate_limiter` (корзина
+        "runner" - 2 запроса в секунду), поэтому с включенным ограничителем параллельные пачки почти не ускоряют
+        получение историй: выигрыш есть, только если ограничитель отключен / ослаблен или время ответа FunPay
+        больше интервала между токенами. Сократить кол-во запросов позволяет auto_runner_len.
+    :type history_workers: :obj:`int`, опционально
+
+    :param auto_runner_len: подбирать ли размер пачки (:attr:`FunPayAPI.updater.runner.Runner.runner_len`)
+        автоматически? Если `True`, размер увеличивается после каждой успешной полной пачки (но не более
+        max_runner_len), пока FunPay не вернет историю не всех чатов пачки; после этого используется
+        наибольший размер, с которым приходили все чаты, а недостающие чаты запрашиваются повторно.
+        Пачка, на которую FunPay не ответил вовсе (ошибка запроса), размер не меняет. После
+        :attr:`FunPayAPI.updater.runner.Runner.RUNNER_LEN_RECHECK` запросов без неполных ответов размер снова
+        увеличивается.
+    :type auto_runner_len: :obj:`bool`, опционально
+
+    :param max_runner_len: макс. размер пачки при auto_runner_len.
+    :type max_runner_len: :obj:`int`, опционально
+
+    :param poll_intervals: мин. интервалы (в секундах) между запросами объектов runner/ каждого типа
+        {"orders_counters" / "chat_bookmarks": интервал}. Тип, которого нет в словаре, запрашивается каждый раз,
+        тип со значением :obj:`None` - только при первом запросе. Пока список чатов (chat_bookmarks) не
+        запрашивается, его HTML не загружается и не парсится, а события чатов приходят при следующем запросе.
+        Поле "Покупатель смотрит" (c-p-u) запрашивается по-прежнему при каждом запросе, если оно нужно.
+    :type poll_intervals: :obj:`dict` {:obj:`str`: :obj:`int` or :obj:`float` or :obj:`None`}, опционально
+
+    :param chat_counter: запрашивать ли при каждом запросе счетчик чатов (chat_counter)? Это небольшой объект,
+        который меняется при новых сообщениях: если он изменился, список чатов запрашивается при следующем
+        запросе, не дожидаясь интервала chat_bookmarks из poll_intervals.
+    :type chat_counter: :obj:`bool`, опционально
     """
 
+    STATE_VERSION = 1
+    """Версия формата состояния (:meth:`FunPayAPI.updater.runner.Runner.export_state`)."""
+    RUNNER_LEN_RECHECK = 100
+    """Кол-во запросов историй без неполных ответов, после которого auto_runner_len снова пробует большие пачки."""
+
     def __init__(self, account: Account, disable_message_requests: bool = False,
                  disabled_order_requests: bool = False,
-                 disabled_buyer_viewing_requests: bool = True):
+                 disabled_buyer_viewing_requests: bool = True, incremental_orders: bool = False,
+                 max_chats: int | None = None, max_orders: int | None = None, state_ttl: int | float | None = None,
+                 store_factory: Callable[..., MutableMapping] = BoundedDict, history_workers: int = 1,
+                 auto_runner_len: bool = False, max_runner_len: int = 50,
+                 poll_intervals: dict[str, int | float | None] | None = None, chat_counter: bool = False):
         # todo добавить события и исключение событий о новых покупках (не продажах!)
         if not account.is_initiated:
             raise exceptions.AccountNotInitiatedError()
@@ -56,22 +130,41 @@ class Runner:
         """Делать ли доп запросы для получения новых / изменившихся заказов?"""
         self.make_buyer_viewing_requests: bool = False if disabled_buyer_viewing_requests else True
         """Делать ли доп запросы для получения поля "Покупатель смотрит"?"""
+        self.incremental_orders: bool = incremental_orders
+        """Обновлять ли список заказов инкрементально?"""
+
+        self.max_chats: int | None = max_chats
+        """Макс. кол-во чатов, состояние которых хранится в памяти."""
+        self.max_orders: int | None = max_orders
+        """Макс. кол-во сохраненных заказов."""
+        self.state_ttl: int | float | None = state_ttl
+        """Время жизни состояния неменяющегося чата / заказа (в секундах)."""
 
         self.__first_request = True
         self.__last_msg_event_tag = utils.random_tag()
         self.__last_order_event_tag = utils.random_tag()
-
-        self.saved_orders: dict[str, types.OrderShortcut] = {}
+        self.__store_factory = store_factory
+        self.__evicted_msg_id: int = -1
+        """Макс. ID последнего сообщения среди вытесненных чатов."""
+        self.__evicted_order_date: datetime.datetime | None = None
+        """Макс. дата создания среди вытесненных заказов."""
+        self.__evicted_order_ids: set[str] = set()
+        """ID вытесненных заказов с датой __evicted_order_date (дата заказа известна с точностью до минуты)."""
+
+        self.saved_orders: MutableMapping[str, types.OrderShortcut] = self.__create_orders_store()
         """Сохраненные состояния заказов ({ID заказа: экземпляр types.OrderShortcut})."""
 
-        self.runner_last_messages: dict[int, list[int, int, str | None]] = {}
+        self.runner_last_messages: MutableMapping[int, list[int, int, str | None]] = \
+            store_factory(maxsize=max_chats, ttl=state_ttl, on_evict=self.__on_last_message_evicted)
         """ID последний сообщений {ID чата: [ID последего сообщения чата, ID последнего прочитанного сообщения чата, 
         текст последнего сообщения или None, если это изображение]}."""
 
-        self.by_bot_ids: dict[int, list[int]] = {}
+        self.by_bot_ids: MutableMapping[int, list[int]] = store_factory(maxsize=max_chats, ttl=state_ttl,
+                                                                        on_evict=None)
         """ID сообщений, отправленных с помощью self.account.send_message ({ID чата: [ID сообщения, ...]})."""
 
-        self.last_messages_ids: dict[int, int] = {}
+        self.last_messages_ids: MutableMapping[int, int] = \
+            store_factory(maxsize=max_chats, ttl=state_ttl, on_evict=self.__on_last_message_id_evicted)
         """ID последних сообщений в чатах ({ID чата: ID последнего сообщения})."""
 
         self.buyers_viewing: dict[int, types.BuyerViewing] = {}
@@ -79,6 +172,29 @@ class Runner:
 
         self.runner_len: int = 10
         """Количество событий, на которое успешно отвечает funpay.com/runner/"""
+        self.history_workers: int = max(1, history_workers)
+        """Макс. кол-во одновременных запросов историй чатов."""
+        self.auto_runner_len: bool = auto_runner_len
+        """Подбирать ли размер пачки автоматически?"""
+        self.max_runner_len: int = max_runner_len
+        """Макс. размер пачки при автоматическом подборе."""
+        self.__runner_len_ok: int = 1
+        """Наибольший размер пачки, на который FunPay вернул истории всех чатов."""
+        self.__runner_len_bad: int | None = None
+        """Наименьший размер пачки, на который FunPay вернул истории не всех чатов."""
+        self.__runner_len_clean: int = 0
+        """Кол-во запросов историй подряд без неполных ответов."""
+        self.__history_pool: ThreadPoolExecutor | None = None
+
+        self.poll_intervals: dict[str, int | float | None] = dict(poll_intervals or {})
+        """Мин. интервалы между запросами объектов runner/ по типам ({тип: интервал в секундах})."""
+        self.chat_counter: bool = chat_counter
+        """Запрашивать ли счетчик чатов при каждом запросе?"""
+        self.__last_polled: dict[str, float] = {}
+        """Время (time.monotonic()) последнего успешного запроса объектов каждого типа."""
+        self.__chats_changed: bool = False
+        """Изменился ли счетчик чатов с последнего запроса списка чатов?"""
+        self.__last_counter_tag = utils.random_tag()
         self.__interlocutor_ids: set = set()
         """Айди собеседников, у которых будет получено поле "Покупатель смотрит\""""
 
@@ -88,13 +204,151 @@ class Runner:
 
         self.__msg_time_re = re.compile(r"\d{2}:\d{2}")
 
+    def __create_orders_store(self) -> MutableMapping[str, types.OrderShortcut]:
+        return self.__store_factory(maxsize=self.max_orders, ttl=self.state_ttl, on_evict=self.__on_order_evicted)
+
+    def __on_last_message_evicted(self, chat_id: int, value: list[int, int, str | None]):
+        self.__evicted_msg_id = max(self.__evicted_msg_id, value[0])
+
+    def __on_last_message_id_evicted(self, chat_id: int, message_id: int):
+        self.__evicted_msg_id = max(self.__evicted_msg_id, message_id)
+
+    def __on_order_evicted(self, order_id: str, order: types.OrderShortcut):
+        self.__add_evicted_orders(order.date, [order_id])
+
+    def __add_evicted_orders(self, date: datetime.datetime, order_ids: list[str]):
+        if self.__evicted_order_date is None or date > self.__evicted_order_date:
+            self.__evicted_order_date = date
+            self.__evicted_order_ids = set(order_ids)
+        elif date == self.__evicted_order_date:
+            self.__evicted_order_ids.update(order_ids)
+
+    def __is_evicted(self, order: types.OrderShortcut) -> bool:
+        """
+        Был ли заказ вытеснен из памяти? Заказы старше последнего вытесненного считаются вытесненными, а заказы
+        той же минуты - только если их ID среди вытесненных (новый заказ может быть создан в ту же минуту).
+        """
+        if self.__evicted_order_date is None or order.date > self.__evicted_order_date:
+            return False
+        return order.date < self.__evicted_order_date or order.id in self.__evicted_order_ids
+
+    def get_state_stats(self) -> dict[str, dict[str, int | None]]:
+        """
+        Возвращает статистику хранилищ состояния Runner'а и аккаунта.
+
+        :return: {название хранилища: {"size", "maxsize", "evictions", "expirations"}} (для хранилищ без метода
+            stats - только {"size"}).
+        :rtype: :obj:`dict` {:obj:`str`: :obj:`dict`}
+        """
+        stores = {"saved_orders": self.saved_orders, "runner_last_messages": self.runner_last_messages,
+                  "last_messages_ids": self.last_messages_ids, "by_bot_ids": self.by_bot_ids,
+                  "interlocutor_ids": self.account.interlocutor_ids, "saved_chats": self.account.get_chats()}
+        return {name: store.stats() if hasattr(store, "stats") else {"size": len(store)}
+                for name, store in stores.items()}
+
+    def export_state(self) -> dict:
+        """
+        Возвращает состояние Runner'а, которое можно сохранить на диск
+        (:func:`FunPayAPI.common.storage.save_state`) и восстановить после перезапуска
+        (:meth:`FunPayAPI.updater.runner.Runner.import_state`): теги событий, сохраненные заказы, ID последних
+        сообщений чатов и сообщений, отправленных ботом.
+
+        Хранилища сохраняются списками пар (ключ, значение) в порядке вытеснения.
+
+        :return: JSON-совместимый словарь с состоянием Runner'а.
+        :rtype: :obj:`dict`
+        """
+        return {
+            "version": self.STATE_VERSION,
+            "account_id": self.account.id,
+            "msg_tag": self.__last_msg_event_tag,
+            "order_tag": self.__last_order_event_tag,
+            "saved_orders": [order.to_dict() for order in self.saved_orders.values()],
+            "runner_last_messages": list(self.runner_last_messages.items()),
+            "last_messages_ids": list(self.last_messages_ids.items()),
+            "by_bot_ids": list(self.by_bot_ids.items()),
+            "evicted_msg_id": self.__evicted_msg_id,
+            "evicted_order_date": self.__evicted_order_date.isoformat() if self.__evicted_order_date else None,
+            "evicted_order_ids": sorted(self.__evicted_order_ids)
+        }
+
+    def import_state(self, state: dict) -> bool:
+        """
+        Восстанавливает состояние, полученное :meth:`FunPayAPI.updater.runner.Runner.export_state`.
+
+        После восстановления первый запрос к FunPay считается не первым: вместо
+        :class:`FunPayAPI.updater.events.InitialChatEvent` / :class:`FunPayAPI.updater.events.InitialOrderEvent`
+        для всех чатов и заказов возвращаются только изменения, произошедшие с момента сохранения состояния
+        (в т.ч. :class:`FunPayAPI.updater.events.NewMessageEvent` и :class:`FunPayAPI.updater.events.NewOrderEvent`).
+
+        :param state: состояние Runner'а.
+        :type state: :obj:`dict`
+
+        :return: :obj:`True`, если состояние восстановлено, :obj:`False`, если оно принадлежит другому аккаунту
+            или сохранено в другом формате.
+        :rtype: :obj:`bool`
+        """
+        if not state or state.get("version") != self.STATE_VERSION or state.get("account_id") != self.account.id:
+            return False
+        for data in state.get("saved_orders", []):
+            subcategory = self.account.get_subcategory(types.SubCategoryTypes[data["subcategory"][0]],
+                                                       data["subcategory"][1]) if data["subcategory"] else None
+            self.saved_orders[data["id"]] = types.OrderShortcut.from_dict(data, subcategory)
+        for store, key in ((self.runner_last_messages, "runner_last_messages"),
+                           (self.last_messages_ids, "last_messages_ids"), (self.by_bot_ids, "by_bot_ids")):
+            for chat_id, value in state.get(key, []):
+                store[chat_id] = value
+        self.__last_msg_event_tag = state.get("msg_tag") or self.__last_msg_event_tag
+        self.__last_order_event_tag = state.get("order_tag") or self.__last_order_event_tag
+        self.__evicted_msg_id = max(self.__evicted_msg_id, state.get("evicted_msg_id", -1))
+        if state.get("evicted_order_date"):
+            self.__add_evicted_orders(datetime.datetime.fromisoformat(state["evicted_order_date"]),
+                                      state.get("evicted_order_ids", []))
+        self.__first_request = False
+        return True
+
+    @classmethod
+    def orders_fast_lane(cls, account: Account, chats_interval: int | float | None = 30.0,
+                         chat_counter: bool = True, **kwargs) -> Runner:
+        """
+        Создает Runner для ботов, которым в первую очередь нужны события заказов: при каждом запросе
+        запрашиваются только счетчики заказов (orders_counters) и, если chat_counter, счетчик чатов,
+        а список чатов - раз в chats_interval секунд или после изменения счетчика чатов.
+
+        :param account: экземпляр аккаунта.
+        :type account: :class:`FunPayAPI.account.Account`
+
+        :param chats_interval: интервал (в секундах) запросов списка чатов (:obj:`None` - только при изменении
+            счетчика чатов).
+        :type chats_interval: :obj:`int` or :obj:`float` or :obj:`None`, опционально
+
+        :param chat_counter: запрашивать ли счетчик чатов при каждом запросе?
+        :type chat_counter: :obj:`bool`, опционально
+
+        Остальные аргументы передаются в :class:`FunPayAPI.updater.runner.Runner`.
+
+        :return: экземпляр Runner'а.
+        :rtype: :class:`FunPayAPI.updater.runner.Runner`
+        """
+        poll_intervals = {"chat_bookmarks": chats_interval, **kwargs.pop("poll_intervals", {})}
+        return cls(account, poll_intervals=poll_intervals, chat_counter=chat_counter, **kwargs)
+
+    def __is_due(self, object_type: str, now: float) -> bool:
+        """Пора ли запрашивать объекты runner/ данного типа?"""
+        if object_type not in self.__last_polled:
+            return True
+        interval = self.poll_intervals.get(object_type, 0)
+        return interval is not None and now - self.__last_polled[object_type] >= interval
+
     def get_updates(self) -> dict:
         """
-        Запрашивает список событий FunPay.
+        Запрашивает список событий FunPay (объекты, которые пора запрашивать согласно
+        :attr:`FunPayAPI.updater.runner.Runner.poll_intervals`).
 
         :return: ответ FunPay.
         :rtype: :obj:`dict`
         """
+        now = time.monotonic()
         orders = {
             "type": "orders_counters",
             "id": self.account.id,
@@ -107,12 +361,22 @@ class Runner:
             "tag": self.__last_msg_event_tag,
             "data": False
         }
+        counter = {
+            "type": "chat_counter",
+            "id": self.account.id,
+            "tag": self.__last_counter_tag,
+            "data": False
+        }
         buyers = [{"type": "c-p-u",
                    "id": str(buyer),
                    "tag": utils.random_tag(),
                    "data": False} for buyer in self.__interlocutor_ids or []]
+        objects = [i for i in (orders, chats) if self.__is_due(i["type"], now) or
+                   (i is chats and self.__chats_changed)]
+        if self.chat_counter:
+            objects.append(counter)
         payload = {
-            "objects": json.dumps([orders, chats, *buyers]),
+            "objects": json.dumps([*objects, *buyers]),
             "request": False,
             "csrf_token": self.account.csrf_token
         }
@@ -125,6 +389,10 @@ class Runner:
         response = self.account.method("post", "runner/", headers, payload, raise_not_200=True)
         json_response = response.json()
         logger.debug(f"Получены данные о событиях: {json_response}")
+        for i in objects:
+            self.__last_polled[i["type"]] = now
+        if chats in objects:
+            self.__chats_changed = False
         return json_response
 
     def parse_updates(self, updates: dict) -> list[InitialChatEvent | ChatsListChangedEvent |
@@ -155,6 +423,12 @@ class Runner:
             elif obj.get("type") == "c-p-u":
                 bv = self.account.parse_buyer_viewing(obj)
                 self.buyers_viewing[bv.buyer_id] = bv
+            elif obj.get("type") == "chat_counter":
+                self.__last_counter_tag = obj.get("tag")
+                # Список чатов запрашивается при следующем запросе, если он не пришел в этом
+                if not self.__first_request and \
+                        not any(i.get("type") == "chat_bookmarks" for i in updates["objects"]):
+                    self.__chats_changed = True
         if self.__first_request:
             self.__first_request = False
         return events
@@ -199,8 +473,13 @@ class Runner:
                 last_msg_text = last_msg_text[1:]
                 by_vertex = True
             # если сообщение отправлено непрочитанным и вкл старый режим, то [0, 0, None] или [0, 0, "text"]
-            prev_node_msg_id, prev_user_msg_id, prev_text = self.runner_last_messages.get(chat_id) or [-1, -1, None]
+            prev = self.runner_last_messages.get(chat_id)
             last_msg_text_or_none = None if last_msg_text in ("Изображение", "Зображення", "Image") else last_msg_text
+            if prev is None and node_msg_id <= self.__evicted_msg_id:
+                # чат был вытеснен из памяти и с тех пор не менялся - снова запоминаем его без событий
+                self.runner_last_messages[chat_id] = [node_msg_id, user_msg_id, last_msg_text_or_none]
+                continue
+            prev_node_msg_id, prev_user_msg_id, prev_text = prev or [-1, -1, None]
             if node_msg_id <= prev_node_msg_id:
                 continue
             elif not prev_node_msg_id and not prev_user_msg_id and prev_text == last_msg_text_or_none:
@@ -211,7 +490,7 @@ class Runner:
 
             chat_with = chat.find("div", {"class": "media-user-name"}).text
             chat_obj = types.ChatShortcut(chat_id, chat_with, last_msg_text, node_msg_id,
-                                          user_msg_id, unread, str(chat))
+                                          user_msg_id, unread, self.account.retain_html(chat))
             if last_msg_text_or_none is not None:
                 chat_obj.last_by_bot = by_bot
                 chat_obj.last_by_vertex = by_vertex
@@ -250,33 +529,92 @@ class Runner:
                                                                      for i in lcmc_events_with_new_mess if
                                                                      i.chat.id in self.account.interlocutor_ids])
 
-        while lcmc_events_with_new_mess or len(self.__interlocutor_ids) >= self.runner_len - 2:
-            chats_pack = lcmc_events_with_new_mess[:self.runner_len]
-            del lcmc_events_with_new_mess[:self.runner_len]
+        pending = list(lcmc_events_with_new_mess)
+        packs = []
+        while pending or len(self.__interlocutor_ids) >= self.runner_len - 2:
+            chats_pack = pending[:self.runner_len]
+            del pending[:self.runner_len]
             bv_pack = []
             while self.make_buyer_viewing_requests and \
                     len(chats_pack) + len(bv_pack) < self.runner_len and self.__interlocutor_ids:
                 interlocutor_id = self.__interlocutor_ids.pop()
                 if interlocutor_id not in self.buyers_viewing:
                     bv_pack.append(interlocutor_id)
+            packs.append(({i.chat.id: i.chat.name for i in chats_pack}, bv_pack))
+
+        new_msg_events = {}
+        for _, histories in self.__request_packs(packs):
+            new_msg_events.update(self.__create_message_events(histories))
 
-            chats_data = {i.chat.id: i.chat.name for i in chats_pack}
-            new_msg_events = self.generate_new_message_events(chats_data, bv_pack)
-
-            if self.make_buyer_viewing_requests:
-                # Если раньше айди не знали, то добавляем
-                for chat_id, msgs in new_msg_events.items():
-                    if chat_id not in self.account.interlocutor_ids and msgs and msgs[0].message.interlocutor_id:
-                        self.account.interlocutor_ids[chat_id] = msgs[0].message.interlocutor_id
-                        self.__interlocutor_ids.add(msgs[0].message.interlocutor_id)
-
-            # [LastChatMessageChanged, NewMSG, NewMSG ..., LastChatMessageChanged, NewMSG, NewMSG ...]
-            for i in chats_pack:
-                events.append(i)
-                if new_msg_events.get(i.chat.id):
-                    events.extend(new_msg_events[i.chat.id])
+        if self.make_buyer_viewing_requests:
+            # Если раньше айди не знали, то добавляем
+            for chat_id, msgs in new_msg_events.items():
+                if chat_id not in self.account.interlocutor_ids and msgs and msgs[0].message.interlocutor_id:
+                    self.account.interlocutor_ids[chat_id] = msgs[0].message.interlocutor_id
+                    self.__interlocutor_ids.add(msgs[0].message.interlocutor_id)
+
+        # [LastChatMessageChanged, NewMSG, NewMSG ..., LastChatMessageChanged, NewMSG, NewMSG ...]
+        for i in lcmc_events_with_new_mess:
+            events.append(i)
+            if new_msg_events.get(i.chat.id):
+                events.extend(new_msg_events[i.chat.id])
         return events
 
+    def __request_packs(self, packs: list[tuple[dict[int, str | None], list[int]]]) \
+            -> list[tuple[dict[int, str | None], dict]]:
+        """
+        Запрашивает истории чатов пачек (не более history_workers запросов одновременно).
+
+        :param packs: пачки [(ID чатов и никнеймы собеседников, ID собеседников для "Покупатель смотрит")].
+
+        :return: [(ID чатов и никнеймы собеседников, истории чатов)] в порядке пачек. При auto_runner_len
+            в конце добавляются повторные запросы чатов, которых не было в ответах.
+        """
+        if self.history_workers > 1 and len(packs) > 1:
+            if self.__history_pool is None:
+                self.__history_pool = ThreadPoolExecutor(max_workers=self.history_workers,
+                                                         thread_name_prefix="runner-history")
+            futures = [self.__history_pool.submit(self.__request_histories, chats_data, bv_pack)
+                       for chats_data, bv_pack in packs]
+            results = [(chats_data, future.result()) for (chats_data, _), future in zip(packs, futures)]
+        else:
+            results = [(chats_data, self.__request_histories(chats_data, bv_pack)) for chats_data, bv_pack in packs]
+        if not self.auto_runner_len:
+            return results
+
+        lost = {}
+        for (chats_data, bv_pack), (_, histories) in zip(packs, results):
+            if not histories:
+                # Запрос не удался (ошибка / FunPay недоступен) - размер пачки тут ни при чем
+                continue
+            size = len(chats_data) + len(bv_pack)
+            missing = {k: v for k, v in chats_data.items() if k not in histories}
+            if not missing:
+                self.__runner_len_clean += 1
+                if size >= self.runner_len:
+                    self.__runner_len_ok = max(self.__runner_len_ok, size)
+            elif size > self.__runner_len_ok:
+                # FunPay ответил не на все объекты пачки - пачка больше допустимой
+                self.__runner_len_clean = 0
+                self.__runner_len_bad = min(self.__runner_len_bad or size, size)
+                lost.update(missing)
+        if self.__runner_len_bad is not None and self.__runner_len_clean >= self.RUNNER_LEN_RECHECK:
+            # Ограничение FunPay могло измениться - снова пробуем увеличить пачку
+            self.__runner_len_bad, self.__runner_len_clean = None, 0
+        previous = self.runner_len
+        if self.__runner_len_bad is None:
+            if self.__runner_len_ok >= self.runner_len:
+                self.runner_len = min(self.max_runner_len, self.runner_len * 2)
+        else:
+            self.runner_len = max(self.__runner_len_ok, (self.__runner_len_ok + self.__runner_len_bad) // 2)
+        if self.runner_len != previous:
+            logger.debug(f"Размер пачки runner/ изменен: {previous} -> {self.runner_len}.")
+        if lost:
+            lost = list(lost.items())
+            results.extend(self.__request_packs([(dict(lost[i:i + self.runner_len]), [])
+                                                 for i in range(0, len(lost), self.runner_len)]))
+        return results
+
     def generate_new_message_events(self, chats_data: dict[int, str],
                                     interlocutor_ids: list[int] | None = None) -> dict[int, list[NewMessageEvent]]:
         """
@@ -290,6 +628,16 @@ class Runner:
         :return: словарь с событиями новых сообщений в формате {ID чата: [список событий]}
         :rtype: :obj:`dict` {:obj:`int`: :obj:`list` of :class:`FunPayAPI.updater.events.NewMessageEvent`}
         """
+        return self.__create_message_events(self.__request_histories(chats_data, interlocutor_ids))
+
+    def __request_histories(self, chats_data: dict[int, str | None],
+                            interlocutor_ids: list[int] | None = None) -> dict[int, list[types.Message]]:
+        """
+        Получает истории чатов (3 попытки). Не меняет состояние Runner'а, кроме "Покупатель смотрит", поэтому
+        может выполняться в нескольких потоках.
+
+        :return: {ID чата: [список сообщений]} или пустой словарь, если истории получить не удалось.
+        """
         attempts = 3
         while attempts:
             attempts -= 1
@@ -305,7 +653,10 @@ class Runner:
         else:
             logger.error(f"Не удалось получить истории чатов {list(chats_data.keys())}: превышено кол-во попыток.")
             return {}
+        return chats
 
+    def __create_message_events(self, chats: dict[int, list[types.Message]]) -> dict[int, list[NewMessageEvent]]:
+        """Создает события новых сообщений по историям чатов и обновляет ID последних сообщений."""
         result = {}
 
         for cid in chats:
@@ -331,11 +682,19 @@ class Runner:
             if not self.last_messages_ids.get(cid):
                 messages = [m for m in messages if
                             m.id > min(self.last_messages_ids.values(), default=10 ** 20)] or messages[-1:]
+                # Сообщения вытесненных из памяти чатов уже были получены
+                messages = [m for m in messages if m.id > self.__evicted_msg_id]
+                if not messages:
+                    continue
 
             self.last_messages_ids[cid] = messages[-1].id  # Перезаписываем ID последнего сообщение
             self.by_bot_ids[cid] = [i for i in self.by_bot_ids[cid] if i > self.last_messages_ids[cid]]  # чистим память
 
             for msg in messages:
+                # Системные сообщения о заказе (отзыв, возврат и т.д.) меняют страницу заказа
+                if msg.type not in (MessageTypes.NON_SYSTEM, MessageTypes.DISCORD, MessageTypes.DEAR_VENDORS) \
+                        and msg.text and (order_id := utils.RegularExpressions().ORDER_ID.search(msg.text)):
+                    self.account.invalidate_order(order_id.group(0)[1:])
                 event = NewMessageEvent(self.__last_msg_event_tag, msg, stack)
                 stack.add_events([event])
                 result[cid].append(event)
@@ -368,7 +727,9 @@ class Runner:
         while attempts:
             attempts -= 1
             try:
-                orders_list = self.account.get_sales()  # todo добавить возможность реакции на подтверждение очень старых заказов
+                known_orders = {i: order.status for i, order in self.saved_orders.items()} \
+                    if self.incremental_orders else None
+                orders_list = self.account.get_sales(known_orders=known_orders)  # todo добавить возможность реакции на подтверждение очень старых заказов
                 break
             except exceptions.RequestFailedError as e:
                 logger.error(e)
@@ -380,10 +741,11 @@ class Runner:
             logger.error("Не удалось обновить список продаж: превышено кол-во попыток.")
             return events
 
-        saved_orders = {}
+        saved_orders = self.saved_orders if self.incremental_orders else self.__create_orders_store()
         for order in orders_list[1]:
-            saved_orders[order.id] = order
-            if order.id not in self.saved_orders:
+            saved = self.saved_orders.get(order.id)
+            # Вытесненные из памяти заказы, снова попавшие в список, запоминаются без событий
+            if saved is None and not self.__is_evicted(order):
                 if self.__first_request:
                     events.append(InitialOrderEvent(self.__last_order_event_tag, order))
                 else:
@@ -391,8 +753,12 @@ class Runner:
                     if order.status == types.OrderStatuses.CLOSED:
                         events.append(OrderStatusChangedEvent(self.__last_order_event_tag, order))
 
-            elif order.status != self.saved_orders[order.id].status:
+            elif saved is not None and order.status != saved.status:
+                self.account.invalidate_order(order.id)
                 events.append(OrderStatusChangedEvent(self.__last_order_event_tag, order))
+        # Заказы сохраняются от старых к новым, чтобы при переполнении хранилища вытеснялись старые
+        for order in reversed(orders_list[1]):
+            saved_orders[order.id] = order
         self.saved_orders = saved_orders
         return events
 
@@ -426,20 +792,59 @@ class Runner:
         else:
             self.by_bot_ids[chat_id].append(message_id)
 
-    def listen(self, requests_delay: int | float = 6.0,
-               ignore_exceptions: bool = True) -> Generator[InitialChatEvent | ChatsListChangedEvent |
+    def poll(self, pending_events: list[NewMessageEvent] | None = None) -> \
+            tuple[list[InitialChatEvent | ChatsListChangedEvent | LastChatMessageChangedEvent | NewMessageEvent |
+                       InitialOrderEvent | OrdersListChangedEvent | NewOrderEvent | OrderStatusChangedEvent],
+                  list[NewMessageEvent]]:
+        """
+        Выполняет один цикл получения событий: запрашивает и парсит обновления FunPay.
+        Используется в :meth:`FunPayAPI.updater.runner.Runner.listen` и
+        :meth:`FunPayAPI.updater.async_runner.AsyncRunner.listen`.
+
+        :param pending_events: события, отложенные на предыдущем цикле (ожидают поле "Покупатель смотрит").
+        :type pending_events: :obj:`list` of :class:`FunPayAPI.updater.events.NewMessageEvent` or :obj:`None`
+
+        :return: (события, готовые к обработке; события, отложенные до следующего цикла).
+        :rtype: :obj:`tuple` (:obj:`list`, :obj:`list` of :class:`FunPayAPI.updater.events.NewMessageEvent`)
+        """
+        events = list(pending_events or [])
+        self.__interlocutor_ids = set([event.message.interlocutor_id for event in events
+                                       if event.type == EventTypes.NEW_MESSAGE])
+        updates = self.get_updates()
+        events.extend(self.parse_updates(updates))
+        ready_events, next_events = [], []
+        for event in events:
+            if self.make_msg_requests and self.make_buyer_viewing_requests \
+                    and event.type == EventTypes.NEW_MESSAGE \
+                    and event.message.interlocutor_id is not None:
+                event.message.buyer_viewing = self.buyers_viewing.get(event.message.interlocutor_id)
+                if event.message.buyer_viewing is None:
+                    next_events.append(event)
+                    continue
+            ready_events.append(event)
+        self.buyers_viewing = {}
+        return ready_events, next_events
+
+    def listen(self, requests_delay: int | float | AdaptiveScheduler = 6.0,
+               ignore_exceptions: bool = True, after_poll: Callable[[], None] | None = None) -> Generator[InitialChatEvent | ChatsListChangedEvent |
                                                             LastChatMessageChangedEvent | NewMessageEvent |
                                                             InitialOrderEvent | OrdersListChangedEvent | NewOrderEvent |
                                                             OrderStatusChangedEvent]:
         """
         Бесконечно отправляет запросы для получения новых событий.
 
-        :param requests_delay: задержка между запросами (в секундах).
-        :type requests_delay: :obj:`int` or :obj:`float`, опционально
+        :param requests_delay: задержка между запросами (в секундах) или адаптивный планировщик задержки.
+        :type requests_delay: :obj:`int` or :obj:`float` or
+            :class:`FunPayAPI.updater.scheduler.AdaptiveScheduler`, опционально
 
         :param ignore_exceptions: игнорировать ошибки?
         :type ignore_exceptions: :obj:`bool`, опционально
 
+        :param after_poll: функция, вызываемая после каждого запроса (и обработки его событий), в т.ч. если
+            новых событий нет или запрос завершился ошибкой. Вызывается в потоке, читающем генератор
+            (например, для периодического сохранения :meth:`FunPayAPI.updater.runner.Runner.export_state`).
+        :type after_poll: :obj:`Callable` or :obj:`None`, опционально
+
         :return: генератор событий FunPay.
         :rtype: :obj:`Generator` of :class:`FunPayAPI.updater.events.InitialChatEvent`,
             :class:`FunPayAPI.updater.events.ChatsListChangedEvent`,
@@ -450,30 +855,24 @@ class Runner:
             :class:`FunPayAPI.updater.events.OrderStatusChangedEvent`
         """
         events = []
+        scheduler = requests_delay if isinstance(requests_delay, AdaptiveScheduler) else None
         while True:
+            ready_events, error = [], False
             try:
-                self.__interlocutor_ids = set([event.message.interlocutor_id for event in events
-                                               if event.type == EventTypes.NEW_MESSAGE])
-                updates = self.get_updates()
-                events.extend(self.parse_updates(updates))
-                next_events = []
-                for event in events:
-                    if self.make_msg_requests and self.make_buyer_viewing_requests \
-                            and event.type == EventTypes.NEW_MESSAGE \
-                            and event.message.interlocutor_id is not None:
-                        event.message.buyer_viewing = self.buyers_viewing.get(event.message.interlocutor_id)
-                        if event.message.buyer_viewing is None:
-                            next_events.append(event)
-                            continue
-
+                ready_events, events = self.poll(events)
+                for event in ready_events:
                     yield event
-                events = next_events
-                self.buyers_viewing = {}
             except Exception as e:
                 if not ignore_exceptions:
                     raise e
                 else:
+                    error = True
                     logger.error("Произошла ошибка при получении событий. "
                                  "(ничего страшного, если это сообщение появляется нечасто).")
                     logger.debug("TRACEBACK", exc_info=True)
-            time.sleep(requests_delay)
+            if after_poll:
+                after_poll()
+            if scheduler:
+                time.sleep(scheduler.next_delay(ready_events, self.account.last_429_err_time, error))
+            else:
+                time.sleep(requests_delay)
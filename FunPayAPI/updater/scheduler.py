@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from typing import Iterable
+import threading
+
+from .events import *
+
+
+class AdaptiveScheduler:
+    """
+    Адаптивный планировщик задержки между запросами :meth:`FunPayAPI.updater.runner.Runner.listen`.
+
+    После активности (новые заказы, сообщения, изменения статусов) задержка сбрасывается до минимальной и держится
+    на ней несколько циклов; при простое она растет в `idle_factor` раз за цикл, после 429 ошибки или исключения -
+    в `error_factor` раз, но всегда остается в пределах [`min_delay`, `max_delay`].
+
+    :param min_delay: минимальная задержка (в секундах).
+    :type min_delay: :obj:`int` or :obj:`float`, опционально
+
+    :param max_delay: максимальная задержка (в секундах).
+    :type max_delay: :obj:`int` or :obj:`float`, опционально
+
+    :param idle_factor: во сколько раз увеличивать задержку после цикла без событий.
+    :type idle_factor: :obj:`float`, опционально
+
+    :param error_factor: во сколько раз увеличивать задержку после 429 ошибки / исключения.
+    :type error_factor: :obj:`float`, опционально
+
+    :param active_polls: сколько циклов держать минимальную задержку после активности.
+    :type active_polls: :obj:`int`, опционально
+    """
+
+    ACTIVITY_EVENTS = (EventTypes.NEW_ORDER, EventTypes.ORDER_STATUS_CHANGED, EventTypes.NEW_MESSAGE,
+                       EventTypes.LAST_CHAT_MESSAGE_CHANGED, EventTypes.ORDERS_LIST_CHANGED)
+    """Типы событий, которые считаются активностью."""
+
+    def __init__(self, min_delay: int | float = 1.0, max_delay: int | float = 10.0, idle_factor: float = 1.2,
+                 error_factor: float = 2.0, active_polls: int = 10):
+        if not 0 < min_delay <= max_delay:
+            raise ValueError("Должно выполняться 0 < min_delay <= max_delay.")
+        self.min_delay: float = min_delay
+        """Минимальная задержка (в секундах)."""
+        self.max_delay: float = max_delay
+        """Максимальная задержка (в секундах)."""
+        self.idle_factor: float = idle_factor
+        """Множитель задержки после цикла без событий."""
+        self.error_factor: float = error_factor
+        """Множитель задержки после 429 ошибки / исключения."""
+        self.active_polls: int = active_polls
+        """Сколько циклов держать минимальную задержку после активности."""
+
+        self.current_delay: float = min_delay
+        """Текущая задержка (в секундах)."""
+        self.polls: int = 0
+        """Кол-во циклов."""
+        self.active: int = 0
+        """Кол-во циклов с активностью."""
+        self.rate_limited: int = 0
+        """Кол-во циклов, во время которых была получена 429 ошибка."""
+        self.errors: int = 0
+        """Кол-во циклов, завершившихся исключением."""
+        self.total_delay: float = 0
+        """Суммарная задержка (в секундах)."""
+
+        self.__hold = 0
+        self.__last_429_err_time: float = 0
+        self.__lock = threading.Lock()
+
+    def next_delay(self, events: Iterable[BaseEvent] = (), last_429_err_time: float = 0,
+                   error: bool = False) -> float:
+        """
+        Пересчитывает задержку по результатам очередного цикла.
+
+        :param events: события, полученные за цикл.
+        :type events: :obj:`Iterable` of :class:`FunPayAPI.updater.events.BaseEvent`, опционально
+
+        :param last_429_err_time: значение :attr:`FunPayAPI.account.Account.last_429_err_time`.
+        :type last_429_err_time: :obj:`float`, опционально
+
+        :param error: завершился ли цикл исключением?
+        :type error: :obj:`bool`, опционально
+
+        :return: задержка до следующего цикла (в секундах).
+        :rtype: :obj:`float`
+        """
+        with self.__lock:
+            self.polls += 1
+            rate_limited = last_429_err_time > self.__last_429_err_time
+            self.__last_429_err_time = max(last_429_err_time, self.__last_429_err_time)
+            if rate_limited or error:
+                self.rate_limited += rate_limited
+                self.errors += error
+                self.__hold = 0
+                delay = max(self.current_delay, self.min_delay) * self.error_factor
+            elif any(event.type in self.ACTIVITY_EVENTS for event in events):
+                self.active += 1
+                self.__hold = self.active_polls
+                delay = self.min_delay
+            elif self.__hold:
+                self.__hold -= 1
+                delay = self.min_delay
+            else:
+                delay = self.current_delay * self.idle_factor
+            self.current_delay = min(max(delay, self.min_delay), self.max_delay)
+            self.total_delay += self.current_delay
+            return self.current_delay
+
+    def reset(self):
+        """
+        Сбрасывает задержку до минимальной (например, если активность была замечена вне Runner'а).
+        """
+        with self.__lock:
+            self.current_delay = self.min_delay
+            self.__hold = self.active_polls
+
+    def metrics(self) -> dict[str, int | float]:
+        """
+        Возвращает метрики планировщика.
+
+        :return: словарь с ключами min_delay, max_delay, current_delay, avg_delay, polls, active_polls,
+            rate_limited_polls, error_polls.
+        :rtype: :obj:`dict`
+        """
+        with self.__lock:
+            return {
+                "min_delay": self.min_delay,
+                "max_delay": self.max_delay,
+                "current_delay": self.current_delay,
+                "avg_delay": self.total_delay / self.polls if self.polls else self.current_delay,
+                "polls": self.polls,
+                "active_polls": self.active,
+                "rate_limited_polls": self.rate_limited,
+                "error_polls": self.errors
+            }
@@ -0,0 +1,103 @@
+"""
+Кэш категорий (Account(categories_cache=...)) в процессе, который запускает несколько аккаунтов.
+
+Для ACCOUNTS аккаунтов с каталогом из GAMES игр сравнивает суммарное время Account.get() и память, которую
+занимают аккаунты после инициализации:
+
+* без кэша - каждый аккаунт парсит каталог игр с основной страницы;
+* первый запуск - кэша на диске еще нет: каталог парсит первый аккаунт, остальные берут его из памяти;
+* повторный запуск - кэш загружается с диска один раз на процесс.
+
+Также проверяет, что категории из кэша совпадают с распарсенными и что устаревший кэш обновляется в фоне.
+
+Запуск: python -m benchmarks.bench_categories_cache
+"""
+from __future__ import annotations
+
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+from FunPayAPI import account as account_module
+from FunPayAPI.common import storage
+from FunPayAPI.common.ratelimit import RateLimiter
+from benchmarks.fixtures import homepage_html, offline_account
+
+GAMES = 700
+ACCOUNTS = 10
+
+
+def catalog(account) -> list:
+    return [(c.id, c.name, c.position, [(s.id, s.name, s.type, s.position) for s in c.get_subcategories()])
+            for c in account.categories] + [(s.id, s.type) for s in account.subcategories]
+
+
+def create(homepage: str, **kwargs) -> list:
+    return [offline_account({"": homepage}, rate_limiter=RateLimiter(enabled=False), **kwargs)
+            for _ in range(ACCOUNTS)]
+
+
+def run(homepage: str, reset: Callable[[], None], **kwargs) -> tuple[float, int, list]:
+    """Создает аккаунты дважды: для замера времени и для замера памяти (reset вызывается перед каждым разом)."""
+    reset()
+    start = time.perf_counter()
+    create(homepage, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    reset()
+    gc.collect()
+    tracemalloc.start()
+    accounts = create(homepage, **kwargs)
+    for i in accounts:
+        i.html = None  # HTML основной страницы хранится одинаково во всех режимах
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, size, accounts
+
+
+def main():
+    homepage = homepage_html(GAMES)
+    path = os.path.join(tempfile.mkdtemp(), "categories.json")
+
+    def new_process():
+        account_module._categories_cache.clear()
+
+    def no_cache_file():
+        new_process()
+        if os.path.exists(path):
+            os.remove(path)
+
+    results = {"без кэша": run(homepage, new_process),
+               "первый запуск": run(homepage, no_cache_file, categories_cache=path),
+               "повторный запуск": run(homepage, new_process, categories_cache=path)}
+
+    expected = catalog(results["без кэша"][2][0])
+    assert len(expected) > GAMES
+    for _, _, accounts in results.values():
+        assert all(catalog(i) == expected for i in accounts)
+    assert results["повторный запуск"][2][0].categories is results["повторный запуск"][2][-1].categories
+
+    print(f"{ACCOUNTS} аккаунтов, {GAMES} игр в каталоге, размер кэша: {os.path.getsize(path)} байт")
+    print(f"{'':<18}{'Account.get(), мс':>19}{'память, МБ':>12}")
+    for name, (elapsed, size, _) in results.items():
+        print(f"{name:<18}{elapsed / ACCOUNTS * 1000:>19.1f}{size / 2 ** 20:>12.1f}")
+
+    # Устаревший кэш используется сразу, а в фоне обновляется с основной страницы
+    account_module._categories_cache.clear()
+    saved_at = storage.load_state(path)["saved_at"]
+    account = offline_account({"": homepage_html(GAMES + 1)}, rate_limiter=RateLimiter(enabled=False),
+                              categories_cache=path, categories_cache_ttl=0)
+    assert catalog(account) == expected
+    while account_module._categories_refreshing:
+        time.sleep(0.01)
+    assert len(account.categories) == len(expected[:GAMES + 3]) + 1
+    assert storage.load_state(path)["saved_at"] > saved_at
+    print("Устаревший кэш обновлен в фоне.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Получение историй большого кол-ва изменившихся чатов (например, после простоя): новые сообщения приходят
+во все N чатов сразу, Runner запрашивает их истории пачками по runner_len.
+
+Режимы: последовательные пачки по 10 чатов (как раньше), параллельные пачки (history_workers) и
+параллельные пачки с автоматическим подбором размера (auto_runner_len). Локальный FunPay
+(benchmarks.mock_funpay) отвечает не более чем на --max-objects объектов запроса runner/.
+Для каждого режима выводит время обработки изменений, кол-во запросов runner/ и размер пачки, и проверяет,
+что события (и их порядок) совпадают с последовательным режимом.
+
+Запуск: python -m benchmarks.bench_chat_histories [--chats 200] [--ticks 4] [--latency 0.15] [--max-objects 30]
+    [--no-rate-limit]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.mock_funpay import MockFunPay
+
+MODES = [("последовательно", 1, False), ("history_workers=4", 4, False),
+         ("history_workers=4, auto_runner_len", 4, True)]
+
+
+def signature(event) -> tuple:
+    """:return: (тип события, ID чата, ID сообщения) - для сравнения событий разных режимов."""
+    if hasattr(event, "message"):
+        return type(event).__name__, event.message.chat_id, event.message.id
+    return type(event).__name__, getattr(getattr(event, "chat", None), "id", None), None
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_chat_histories",
+                                         description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--chats", type=int, default=200, help="чатов с новыми сообщениями")
+    arg_parser.add_argument("--ticks", type=int, default=4, help="кол-во пачек новых сообщений в каждом режиме")
+    arg_parser.add_argument("--latency", type=float, default=0.15, help="задержка ответа FunPay (в секундах)")
+    arg_parser.add_argument("--max-objects", type=int, default=30, help="макс. объектов в запросе runner/")
+    arg_parser.add_argument("--no-rate-limit", action="store_true", help="отключить RateLimiter аккаунта")
+    args = arg_parser.parse_args()
+
+    from FunPayAPI import Account
+    from FunPayAPI.common.ratelimit import RateLimiter
+    from FunPayAPI.updater.runner import Runner
+
+    print(f"{args.chats} чатов с новыми сообщениями, задержка FunPay {args.latency * 1000:.0f} мс, "
+          f"не более {args.max_objects} объектов в runner/, "
+          f"RateLimiter {'выключен' if args.no_rate_limit else 'включен'}")
+    print(f"{'':<36}{'изменение':>10}{'время, мс':>11}{'runner/':>9}{'runner_len':>12}{'события':>10}")
+    expected = None
+    for name, workers, auto in MODES:
+        with MockFunPay(orders_per_second=0, latency=args.latency, history=args.chats,
+                        max_runner_objects=args.max_objects) as funpay:
+            funpay.MAX_CHATS = args.chats
+            account = Account("0" * 32, base_url=funpay.url,
+                              rate_limiter=RateLimiter(enabled=False) if args.no_rate_limit else None).get()
+            runner = Runner(account, disabled_order_requests=True, history_workers=workers, auto_runner_len=auto)
+            runner.parse_updates(runner.get_updates())
+
+            signatures = []
+            for tick in range(args.ticks):
+                for n in range(args.chats):
+                    funpay.new_message(n)
+                runner_len, requests = runner.runner_len, funpay.hits["runner/"]
+                start = time.perf_counter()
+                events = runner.parse_updates(runner.get_updates())
+                elapsed = time.perf_counter() - start
+                signatures.append([signature(i) for i in events])
+                new_messages = sum(i[0] == "NewMessageEvent" for i in signatures[-1])
+                if expected is None:
+                    match = "-"
+                else:
+                    match = "совпадают" if signatures[-1] == expected[tick] else "РАЗЛИЧАЮТСЯ"
+                print(f"{name if not tick else '':<36}{tick + 1:>10}{elapsed * 1000:>11.0f}"
+                      f"{funpay.hits['runner/'] - requests:>9}{runner_len:>12}{match:>10}")
+                assert new_messages == args.chats, f"получено {new_messages} новых сообщений из {args.chats}"
+            expected = expected or signatures
+
+
+if __name__ == "__main__":
+    main()
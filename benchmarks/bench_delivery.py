@@ -0,0 +1,119 @@
+"""
+Сквозная доставка заказов bot.py: N заказов проходят через очередь, bot.order_worker и bot.process_order
+(сообщения покупателю - через локальный FunPay, отправка звезд - через локальный Fragment API).
+
+Выводит пропускную способность (доставленных заказов в секунду), перцентили времени от добавления заказа
+в очередь до отправки звезд, итоговые статусы заказов и время этапов обработки (bot.stage_timings).
+Уведомления Telegram отключены. Если баланс Fragment закончится, bot.py деактивирует лот на локальном FunPay.
+
+Запуск:
+    python -m benchmarks.bench_delivery [--orders 30] [--workers 2] [--fragment-concurrency 2]
+        [--fragment-latency 0.3] [--funpay-latency 0.05] [--balance 8000] [--username-errors 0.02]
+        [--chat-send-rate 5 | --no-rate-limit]
+
+Аккаунт FunPay использует тот же RateLimiter, что и bot.py (bot.create_rate_limiter: FUNPAY_TOTAL_RATE /
+FUNPAY_CHAT_SEND_RATE). На заказ приходится 2 сообщения FunPay, поэтому доставка не быстрее
+FUNPAY_CHAT_SEND_RATE / 2 заказов в секунду. --chat-send-rate задает другой лимит отправки сообщений.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.fixtures import ACCOUNT_ID
+from benchmarks.mock_fragment import MockFragment
+from benchmarks.mock_funpay import MockFunPay
+
+LOT_ID = 5
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_delivery",
+                                         description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--orders", type=int, default=30)
+    arg_parser.add_argument("--stars", type=int, default=50, help="звезд в заказе")
+    arg_parser.add_argument("--workers", type=int, default=2, help="ORDER_WORKERS")
+    arg_parser.add_argument("--fragment-concurrency", type=int, default=2, help="FRAGMENT_CONCURRENCY")
+    arg_parser.add_argument("--fragment-latency", type=float, default=0.3)
+    arg_parser.add_argument("--fragment-jitter", type=float, default=0.2)
+    arg_parser.add_argument("--funpay-latency", type=float, default=0.05)
+    arg_parser.add_argument("--balance", type=int, default=None, help="баланс Fragment в звездах")
+    arg_parser.add_argument("--username-errors", type=float, default=0.0)
+    arg_parser.add_argument("--quantity-errors", type=float, default=0.0)
+    arg_parser.add_argument("--funds-errors", type=float, default=0.0)
+    arg_parser.add_argument("--chat-send-rate", type=float, default=None,
+                            help="ограничение отправки сообщений FunPay (в секунду; по умолчанию - как в bot.py)")
+    arg_parser.add_argument("--no-rate-limit", action="store_true", help="отключить RateLimiter аккаунта FunPay")
+    args = arg_parser.parse_args()
+
+    errors = {"username": args.username_errors, "quantity": args.quantity_errors, "funds": args.funds_errors}
+    fragment = MockFragment(args.balance, args.fragment_latency, args.fragment_jitter, errors).start()
+    funpay = MockFunPay(orders_per_second=0, latency=args.funpay_latency).start()
+
+    # bot.py читает настройки при импорте, bot.init_order_processing() создает orders.db / auth_token.json
+    # в текущей папке
+    os.chdir(tempfile.mkdtemp())
+    os.environ.update({"ORDERS_DB": "orders.db", "FRAGMENT_API_URL": fragment.url, "FRAGMENT_API_KEY": "key",
+                       "ORDER_WORKERS": str(args.workers), "FRAGMENT_CONCURRENCY": str(args.fragment_concurrency),
+                       "LOT_ID_TO_DEACTIVATE": str(LOT_ID), "TELEGRAM_BOT_TOKEN": "", "TELEGRAM_USER_ID": ""})
+    bot = importlib.import_module("bot")
+    bot.init_order_processing()
+    bot.logger.disabled = True
+    bot.send_telegram_notification = lambda message: None
+
+    from FunPayAPI import Account
+    from FunPayAPI.common.ratelimit import RateLimiter
+    from metrics import LatencyStats
+
+    if args.no_rate_limit:
+        rate_limiter = RateLimiter(enabled=False)
+    elif args.chat_send_rate:
+        rate_limiter = RateLimiter({"chat_send": (args.chat_send_rate, RateLimiter.DEFAULT_LIMITS["chat_send"][1])})
+    else:
+        rate_limiter = bot.create_rate_limiter()
+    account = Account("0" * 32, base_url=funpay.url, rate_limiter=rate_limiter).get()
+    assert bot.authenticate_fragment()
+
+    created = {}
+    for i in range(args.orders):
+        username = f"buyer{i:05d}"
+        bot.order_queue.put(f"users-{ACCOUNT_ID}-{2000000 + i}", username, args.stars, f"BENCH{i:05d}")
+        created[username] = time.time()
+    start = time.time()
+    workers = [threading.Thread(target=bot.order_worker, args=(account,), daemon=True) for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    while bot.order_queue.qsize() or bot.order_queue.active():
+        time.sleep(0.05)
+    elapsed = time.time() - start
+    counts = bot.order_queue.counts()
+    bot.order_queue.close()
+    for worker in workers:
+        worker.join()
+
+    delivery = LatencyStats(window=10 ** 6)
+    for sent_at, username, _ in fragment.sent:
+        delivery.add("доставка", sent_at - created[username])
+    print(f"{args.orders} заказов по {args.stars} ⭐, {args.workers} обработчиков, Fragment: "
+          f"{args.fragment_concurrency} одновременных запросов, "
+          f"{args.fragment_latency * 1000:.0f}+{args.fragment_jitter * 1000:.0f} мс; "
+          f"FunPay: {args.funpay_latency * 1000:.0f} мс")
+    print(f"статусы: {counts}, время: {elapsed:.1f} с, "
+          f"доставлено в секунду: {len(fragment.sent) / elapsed:.2f}")
+    if summary := delivery.summary().get("доставка"):
+        print(f"время до отправки звезд: p50 {summary['p50']:.2f} / p95 {summary['p95']:.2f} / "
+              f"p99 {summary['p99']:.2f} / max {summary['max']:.2f} с")
+    if fragment.rejected:
+        print(f"отклонено Fragment: {len(fragment.rejected)}, лот деактивирован: "
+              f"{'да' if funpay.saved_lots.get(LOT_ID, {}).get('active', 'on') != 'on' else 'нет'}")
+    print(bot.stage_timings.format())
+    fragment.stop()
+    funpay.stop()
+
+
+if __name__ == "__main__":
+    main()
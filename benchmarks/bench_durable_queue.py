@@ -0,0 +1,76 @@
+"""
+Пропускная способность DurableOrderQueue и проверка восстановления после падения.
+
+Запуск: python -m benchmarks.bench_durable_queue
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+
+from durable_queue import DurableOrderQueue, DELIVERED, FAILED, QUEUED
+
+N = 5000
+
+
+def bench_put(path: str) -> float:
+    queue = DurableOrderQueue(path)
+    start = time.perf_counter()
+    for i in range(N):
+        queue.put(f"users-1-{i}", f"user{i}", 50, f"ORDER{i:05d}", 1)
+    elapsed = time.perf_counter() - start
+    assert queue.qsize() == N
+    # повторные события не создают дубликатов
+    assert not queue.put("users-1-0", "user0", 50, "ORDER00000", 1)
+    queue.close()
+    return N / elapsed
+
+
+def bench_workers(path: str, workers: int = 4) -> float:
+    queue = DurableOrderQueue(path)
+
+    def worker():
+        while (order := queue.get(timeout=0.1)) is not None:
+            queue.mark_sending(order.order_id)
+            queue.mark_delivered(order.order_id)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    assert queue.counts() == {DELIVERED: N}, queue.counts()
+    queue.close()
+    return N / elapsed
+
+
+def check_recovery(path: str):
+    queue = DurableOrderQueue(path)
+    queue.put("users-1-2", "a", 50, "A", 1)
+    queue.put("users-1-3", "b", 50, "B", 1)
+    order = queue.get()
+    queue.mark_sending(order.order_id)
+    queue._conn.close()  # "падение" без корректного закрытия
+
+    queue = DurableOrderQueue(path)
+    interrupted = queue.recover()
+    assert [i.order_id for i in interrupted] == ["A"]
+    assert queue.counts() == {FAILED: 1, QUEUED: 1}
+    assert queue.get(timeout=0).order_id == "B"
+    queue.close()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"put:      {bench_put(os.path.join(tmp, 'q.db')):>10.0f} orders/s")
+        print(f"process:  {bench_workers(os.path.join(tmp, 'q.db')):>10.0f} orders/s (4 workers)")
+        check_recovery(os.path.join(tmp, "r.db"))
+        print("recovery: ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Режимы хранения HTML-кода (Account.html_retention) на большой странице продаж.
+
+Для каждого бэкенда парсинга и режима в отдельном процессе вызывает get_sales() PAGES раз, сохраняя результаты
+(как Runner.saved_orders), и выводит время разбора страницы и прирост RSS процесса.
+
+Запуск: python -m benchmarks.bench_html_retention
+"""
+from __future__ import annotations
+
+import gc
+import json
+import subprocess
+import sys
+import time
+
+from FunPayAPI.common.enums import HTMLRetentionModes
+from FunPayAPI.common.ratelimit import RateLimiter
+from benchmarks.fixtures import offline_account, sales_page_html
+
+ROWS = 2000
+PAGES = 10
+
+
+def rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * 4096
+
+
+def run(backend: str, mode: str):
+    account = offline_account({"orders/trade": sales_page_html(ROWS)}, sales_parser=backend,
+                              html_retention=HTMLRetentionModes[mode], rate_limiter=RateLimiter(enabled=False))
+    account.get_sales()
+    gc.collect()
+    before = rss()
+    kept, elapsed = [], 0.0
+    for _ in range(PAGES):
+        start = time.perf_counter()
+        kept.append(account.get_sales()[1])
+        elapsed += time.perf_counter() - start
+    gc.collect()
+    html = kept[0][0].html
+    print(json.dumps({"time": elapsed / PAGES, "rss": rss() - before, "html": html is not None}))
+
+
+def main():
+    print(f"{ROWS} строк x {PAGES} страниц")
+    print(f"{'бэкенд':<8}{'режим':<8}{'мс / страница':>15}{'RSS, МБ':>10}")
+    for backend in ("bs4", "lxml"):
+        for mode in HTMLRetentionModes:
+            out = subprocess.run([sys.executable, "-m", "benchmarks.bench_html_retention", backend, mode.name],
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out)
+            assert result["html"] == (mode is not HTMLRetentionModes.NEVER)
+            print(f"{backend:<8}{mode.name.lower():<8}{result['time'] * 1000:>15.1f}{result['rss'] / 2 ** 20:>10.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run(*sys.argv[1:])
+    else:
+        main()
@@ -0,0 +1,62 @@
+"""
+Время импорта пакета FunPayAPI и bot.py (холодный старт коротких CLI-скриптов).
+
+Каждый сценарий выполняется в новом процессе с `python -X importtime`; время - сумма собственного времени
+импорта модулей, которые не загружает сам интерпретатор (медиана по REPEATS запускам). Также проверяет, что
+сценарии не загружают лишние тяжелые зависимости (например, `import FunPayAPI` - requests и bs4,
+а `import bot` - telebot).
+
+Запуск: python -m benchmarks.bench_import_time
+"""
+from __future__ import annotations
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPEATS = 5
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS: list[tuple[str, str, tuple[str, ...]]] = [
+    ("import FunPayAPI", "import FunPayAPI", ("requests", "bs4", "asyncio", "requests_toolbelt")),
+    ("enums, utils, types", "from FunPayAPI import enums, utils, types", ("requests", "bs4", "asyncio")),
+    ("Account", "from FunPayAPI import Account", ("asyncio", "requests_toolbelt")),
+    ("Runner", "from FunPayAPI import Runner", ("asyncio", "requests_toolbelt")),
+    ("весь пакет", "from FunPayAPI import *", ()),
+    ("import bot", "import bot", ("telebot",)),
+]
+"""(название, код, модули, которые не должны загружаться)"""
+
+
+def import_time(code: str, cwd: str, baseline: set[str] = frozenset()) -> tuple[float, set[str]]:
+    """:return: (время импорта в мс, загруженные модули) без модулей, загружаемых интерпретатором (baseline)."""
+    env = {**os.environ, "PYTHONPATH": ROOT, "PYTHONDONTWRITEBYTECODE": "1"}
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=cwd, env=env,
+                            capture_output=True, text=True, check=True).stderr
+    total, modules = 0, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if name.strip() not in baseline:
+            total += int(self_us)
+            modules.add(name.strip())
+    return total / 1000, modules
+
+
+def main():
+    cwd = tempfile.mkdtemp()  # bot.py при импорте создает файлы в текущей папке
+    baseline = import_time("pass", cwd)[1]
+    print(f"{'сценарий':<22}{'импорт, мс':>12}{'модулей':>10}")
+    for name, code, forbidden in SCENARIOS:
+        runs = [import_time(code, cwd, baseline) for _ in range(REPEATS)]
+        modules = runs[0][1]
+        loaded = [i for i in forbidden if i in modules]
+        assert not loaded, f"{name}: загружены {loaded}"
+        print(f"{name:<22}{statistics.median(i[0] for i in runs):>12.1f}{len(modules):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Сравнение полного и инкрементального обновления списка заказов в Runner.parse_order_updates.
+
+Запуск: python -m benchmarks.bench_incremental_orders
+"""
+from __future__ import annotations
+
+import time
+
+from FunPayAPI.common.ratelimit import RateLimiter
+from FunPayAPI.updater.runner import Runner
+from FunPayAPI.updater.events import NewOrderEvent
+from benchmarks.fixtures import offline_account, page, sales_row
+
+SIZES = (50, 500, 2000)
+REPEATS = 10
+
+
+def sales_page(rows: range) -> str:
+    return page(f'<div class="tc table-hover tc-selling">{"".join(sales_row(i) for i in rows)}</div>')
+
+
+def bench(rows: int, incremental: bool, backend: str) -> float:
+    routes = {"orders/trade": sales_page(range(1, rows + 1))}
+    account = offline_account(routes, sales_parser=backend, rate_limiter=RateLimiter(enabled=False))
+    runner = Runner(account, disable_message_requests=True, incremental_orders=incremental)
+    runner.parse_order_updates({"tag": "0", "data": {"buyer": 0, "seller": 0}})
+
+    # Каждый тик появляется 1 новый заказ, остальные не меняются.
+    total = 0
+    for tick in range(REPEATS):
+        routes["orders/trade"] = sales_page(range(-tick, rows + 1))
+        runner._Runner__first_request = False
+        start = time.perf_counter()
+        events = runner.parse_order_updates({"tag": str(tick), "data": {"buyer": 0, "seller": tick}})
+        total += time.perf_counter() - start
+        assert sum(isinstance(i, NewOrderEvent) for i in events) == 1
+    return total / REPEATS
+
+
+def main():
+    print(f"{'rows':>6} {'backend':>8} {'full, ms':>10} {'incr, ms':>10} {'speedup':>8}")
+    for backend in ("bs4", "lxml"):
+        for rows in SIZES:
+            full = bench(rows, False, backend)
+            incr = bench(rows, True, backend)
+            print(f"{rows:>6} {backend:>8} {full * 1000:>10.2f} {incr * 1000:>10.2f} {full / incr:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Определение типа системного сообщения (Message.get_message_type / ChatShortcut.get_last_message_type).
+
+Сравнивает MessageTypesClassifier (один проход по тексту + проверка найденных кандидатов) с прежней
+реализацией (до 16 регулярных выражений подряд, RegularExpressions() и словарь типов на каждый вызов)
+на корпусе ru / en / uk сообщений из tests/test_message_types.py (корректность проверяется там же, pytest).
+
+Запуск: python -m benchmarks.bench_message_types
+"""
+from __future__ import annotations
+
+import time
+
+from FunPayAPI.common.enums import MessageTypes as T
+from FunPayAPI.common.utils import get_message_type
+from tests.test_message_types import CORPUS, legacy_message_type
+
+REPEATS = 2000
+
+
+def bench(func, texts: list[str]) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for text in texts:
+            func(text)
+    return (time.perf_counter() - start) / (REPEATS * len(texts)) * 1e6
+
+
+def main():
+    print(f"Корпус: {len(CORPUS)} сообщений.")
+    system = [text for text, expected in CORPUS if expected != T.NON_SYSTEM]
+    non_system = [text for text, expected in CORPUS if expected == T.NON_SYSTEM]
+    print(f"{'':<14}{'прежняя, мкс':>14}{'новая, мкс':>12}")
+    for name, texts in (("системные", system), ("несистемные", non_system), ("все", [i for i, _ in CORPUS])):
+        legacy, new = bench(legacy_message_type, texts), bench(get_message_type, texts)
+        print(f"{name:<14}{legacy:>14.2f}{new:>12.2f}  (x{legacy / new:.1f})")
+
+
+if __name__ == "__main__":
+    main()
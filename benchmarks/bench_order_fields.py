@@ -0,0 +1,82 @@
+"""
+Извлечение данных новых заказов (bot.order_fields): сколько страниц заказов загружается и сколько времени
+уходит на добавление пачки заказов в очередь при разных правилах.
+
+Режимы: username только со страницы заказа (по умолчанию) и username из сообщения покупателя
+(ORDER_USERNAME_FROM_CHAT=1; кол-во звезд и товара в обоих режимах берутся из строки списка продаж).
+Для каждого режима проверяется, что в очередь попали те же username / кол-во звезд / кол-во товара,
+что и на страницах заказов. Заказы и сообщения отдает локальный FunPay (benchmarks.mock_funpay).
+
+Запуск: python -m benchmarks.bench_order_fields [--orders 50] [--latency 0.1]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import tempfile
+import time
+
+from benchmarks.fixtures import order_goods
+from benchmarks.mock_funpay import MockFunPay
+
+MODES = [("страница заказа", False), ("username из чата", True)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_order_fields",
+                                         description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--orders", type=int, default=50, help="заказов в каждом режиме")
+    arg_parser.add_argument("--latency", type=float, default=0.1, help="задержка ответа FunPay (в секундах)")
+    args = arg_parser.parse_args()
+
+    funpay = MockFunPay(orders_per_second=0, latency=args.latency).start()
+    os.chdir(tempfile.mkdtemp())  # bot.init_order_processing() создает orders.db в текущей папке
+    os.environ.update({"ORDERS_DB": "orders.db", "TELEGRAM_BOT_TOKEN": "", "TELEGRAM_USER_ID": ""})
+    bot = importlib.import_module("bot")
+    bot.init_order_processing()
+    bot.logger.disabled = True
+    bot.print = lambda *args, **kwargs: None
+
+    from FunPayAPI import Account
+    from FunPayAPI.common.ratelimit import RateLimiter
+    from order_fields import ExtractionRule, OrderFieldExtractor
+
+    print(f"{args.orders} заказов, задержка FunPay {args.latency * 1000:.0f} мс")
+    print(f"{'':<18}{'страниц заказов':>17}{'в очереди за, мс':>18}{'без страницы':>14}{'ошибок':>8}")
+    for name, from_chat in MODES:
+        account = Account("0" * 32, base_url=funpay.url, rate_limiter=RateLimiter(enabled=False)).get()
+        bot.order_fields = OrderFieldExtractor([ExtractionRule("Звёзды Telegram", username_from_chat=from_chat)])
+        ids = {funpay.new_order() for _ in range(args.orders)}
+        orders = [order for order in account.get_sales()[1] if order.id in ids]
+        assert len(orders) == args.orders
+        for order in orders:  # сообщения покупателей приходят в NewMessageEvent до загрузки заказа
+            for message in account.get_chat_history(order.chat_id):
+                if message.author_id != account.id:
+                    bot.order_fields.add_message(message)
+
+        pages = funpay.hits["orders/<ID>/"]
+        start = time.perf_counter()
+        for order in orders:
+            bot.enqueue_order(account, order)
+        elapsed = time.perf_counter() - start
+        pages = funpay.hits["orders/<ID>/"] - pages
+
+        expected = {}
+        for order in orders:
+            n = order.buyer_id - 2000000
+            _, stars, amount = order_goods(n)
+            expected[order.id] = (f"username{n}", stars, amount)
+        mismatched = 0
+        for _ in orders:
+            queued = bot.order_queue.get(timeout=5)
+            mismatched += (queued.username, queued.stars, queued.quantity) != expected[queued.order_id]
+            bot.order_queue.mark_sending(queued.order_id)
+            bot.order_queue.mark_delivered(queued.order_id)
+        print(f"{name:<18}{pages:>17}{elapsed * 1000:>18.0f}{bot.order_fields.counters['row_only']:>14}"
+              f"{mismatched:>8}")
+    funpay.stop()
+
+
+if __name__ == "__main__":
+    main()
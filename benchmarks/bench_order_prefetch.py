@@ -0,0 +1,86 @@
+"""
+Пачка новых заказов за один цикл Runner'а: последовательная загрузка заказов (get_order в цикле событий, как
+раньше) и параллельная загрузка в пуле bot.order_prefetch с разным ограничением ORDER_PREFETCH.
+
+Для каждого режима выводит, сколько цикл событий был занят обработкой NewOrderEvent, и через сколько после
+начала обработки первый и последний заказ пачки попали в очередь (первый заказ сразу начинает выполняться).
+Страницы заказов отдает локальный FunPay (benchmarks.mock_funpay) с задержкой ответа.
+
+Запуск: python -m benchmarks.bench_order_prefetch [--burst 10] [--latency 0.15] [--no-rate-limit]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_funpay import MockFunPay
+
+MODES = [("последовательно", None), ("ORDER_PREFETCH=2", 2), ("ORDER_PREFETCH=4", 4), ("ORDER_PREFETCH=8", 8)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_order_prefetch",
+                                         description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--burst", type=int, default=10, help="заказов в пачке")
+    arg_parser.add_argument("--latency", type=float, default=0.15, help="задержка ответа FunPay (в секундах)")
+    arg_parser.add_argument("--no-rate-limit", action="store_true", help="отключить RateLimiter аккаунта")
+    args = arg_parser.parse_args()
+
+    funpay = MockFunPay(orders_per_second=0, latency=args.latency, jitter=args.latency / 2).start()
+    os.chdir(tempfile.mkdtemp())  # bot.init_order_processing() создает orders.db в текущей папке
+    os.environ.update({"ORDERS_DB": "orders.db", "TELEGRAM_BOT_TOKEN": "", "TELEGRAM_USER_ID": ""})
+    bot = importlib.import_module("bot")
+    bot.init_order_processing()
+    bot.logger.disabled = True
+    bot.print = lambda *args, **kwargs: None
+
+    from FunPayAPI import Account
+    from FunPayAPI.common.ratelimit import RateLimiter
+    from FunPayAPI.updater.events import NewOrderEvent
+
+    print(f"{args.burst} заказов за цикл, задержка FunPay {args.latency * 1000:.0f} мс, "
+          f"RateLimiter {'выключен' if args.no_rate_limit else 'включен'}")
+    print(f"{'':<18}{'цикл занят, мс':>16}{'1-й в очереди, мс':>19}{'все в очереди, мс':>19}")
+    for name, cap in MODES:
+        # новый аккаунт в каждом режиме, чтобы ограничитель частоты начинал с полной корзины
+        account = Account("0" * 32, base_url=funpay.url,
+                          rate_limiter=RateLimiter(enabled=False) if args.no_rate_limit else None).get()
+        ids = {funpay.new_order() for _ in range(args.burst)}
+        events = [NewOrderEvent("tag", order) for order in account.get_sales()[1] if order.id in ids]
+        assert len(events) == args.burst
+
+        queued = []
+
+        def consume():  # как обработчик заказов bot.order_worker: забирает заказ, как только он в очереди
+            while len(queued) < args.burst:
+                order = bot.order_queue.get(timeout=30)
+                assert order is not None
+                queued.append(time.perf_counter() - start)
+                bot.order_queue.mark_sending(order.order_id)
+                bot.order_queue.mark_delivered(order.order_id)
+
+        consumer = threading.Thread(target=consume)
+        start = time.perf_counter()
+        consumer.start()
+        if cap is None:
+            for event in events:
+                bot.enqueue_order(account, event.order)
+        else:
+            bot.order_prefetch = ThreadPoolExecutor(max_workers=cap)
+            for event in events:
+                bot.handle_event(account, event)
+        blocked = time.perf_counter() - start
+        consumer.join()
+        if cap is not None:
+            bot.order_prefetch.shutdown()
+        print(f"{name:<18}{blocked * 1000:>16.0f}{queued[0] * 1000:>19.0f}{queued[-1] * 1000:>19.0f}")
+    funpay.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Пропускная способность пула обработчиков заказов (как в bot.py) в зависимости от кол-ва потоков.
+
+Сообщения покупателю (2 на заказ) отправляются настоящим Account через локальный FunPay
+(benchmarks.mock_funpay) с тем же RateLimiter, что и в bot.py (bot.create_rate_limiter), поэтому видно,
+где пул упирается в лимит отправки сообщений (FUNPAY_CHAT_SEND_RATE / 2 заказов в секунду).
+Telegram и Fragment заменены задержками, Fragment - под общим семафором.
+
+Запуск: python -m benchmarks.bench_order_workers [--orders 60] [--no-rate-limit]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.fixtures import ACCOUNT_ID
+from benchmarks.mock_funpay import MockFunPay
+from durable_queue import DurableOrderQueue
+from metrics import LatencyStats
+
+RECIPIENTS = 20
+TELEGRAM, FUNPAY, FRAGMENT = 0.03, 0.05, 0.2
+FRAGMENT_CONCURRENCY = 4
+
+
+def run(account, orders: int, workers: int) -> tuple[float, LatencyStats]:
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = DurableOrderQueue(os.path.join(tmp, "orders.db"))
+        for i in range(orders):
+            queue.put(f"users-{ACCOUNT_ID}-{2000000 + i % RECIPIENTS}", f"user{i % RECIPIENTS}", 50,
+                      f"ORDER{i:03d}", 1)
+        semaphore = threading.BoundedSemaphore(FRAGMENT_CONCURRENCY)
+        timings = LatencyStats()
+        delivered = {}
+        lock = threading.Lock()
+
+        def worker():
+            while (order := queue.get(timeout=0.05)) is not None:
+                with timings.measure("total"):
+                    time.sleep(TELEGRAM)
+                    account.send_message(order.chat_id, "Заказ принят")
+                    with timings.measure("fragment_wait"):
+                        semaphore.acquire()
+                    try:
+                        queue.mark_sending(order.order_id)
+                        time.sleep(FRAGMENT)
+                    finally:
+                        semaphore.release()
+                    queue.mark_delivered(order.order_id)
+                    with lock:
+                        delivered.setdefault(order.username, []).append(order.order_id)
+                    time.sleep(TELEGRAM)
+                    account.send_message(order.chat_id, "Звезды отправлены")
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        queue.close()
+        assert sum(map(len, delivered.values())) == orders
+        assert all(ids == sorted(ids) for ids in delivered.values()), "Нарушен порядок заказов получателя"
+        return orders / elapsed, timings
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_order_workers",
+                                         description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--orders", type=int, default=60, help="заказов для каждого кол-ва потоков")
+    arg_parser.add_argument("--no-rate-limit", action="store_true", help="отключить RateLimiter аккаунта")
+    args = arg_parser.parse_args()
+
+    os.environ.update({"TELEGRAM_BOT_TOKEN": "", "TELEGRAM_USER_ID": ""})
+    bot = importlib.import_module("bot")
+
+    from FunPayAPI import Account
+    from FunPayAPI.common.ratelimit import RateLimiter
+
+    print(f"Fragment concurrency: {FRAGMENT_CONCURRENCY}, FunPay: {FUNPAY * 1000:.0f} мс, RateLimiter: "
+          f"{'выключен' if args.no_rate_limit else f'как в bot.py (chat_send {bot.FUNPAY_CHAT_SEND_RATE:g}/с)'}")
+    print(f"{'workers':>8} {'orders/s':>9} {'p50 total, ms':>14} {'p95 fragment wait, ms':>22}")
+    with MockFunPay(orders_per_second=0, latency=FUNPAY) as funpay:
+        for workers in (1, 2, 4, 8, 16):
+            rate_limiter = RateLimiter(enabled=False) if args.no_rate_limit else bot.create_rate_limiter()
+            account = Account("0" * 32, base_url=funpay.url, rate_limiter=rate_limiter).get()
+            throughput, timings = run(account, args.orders, workers)
+            summary = timings.summary()
+            print(f"{workers:>8} {throughput:>9.2f} {summary['total']['p50'] * 1000:>14.0f} "
+                  f"{summary['fragment_wait']['p95'] * 1000:>22.0f}")
+
+
+if __name__ == "__main__":
+    main()
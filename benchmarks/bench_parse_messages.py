@@ -0,0 +1,89 @@
+"""
+Парсинг истории чатов (Account.__parse_messages): 10 чатов по 50 сообщений, как в get_chats_histories.
+
+Сравнивает текущую реализацию (одно дерево BeautifulSoup на сообщение) с прежней, которая строила
+дерево для каждого сообщения повторно во втором цикле, и проверяет, что результаты совпадают.
+
+Запуск: python -m benchmarks.bench_parse_messages
+"""
+from __future__ import annotations
+
+import time
+
+from bs4 import BeautifulSoup
+
+import FunPayAPI.account
+from FunPayAPI import types
+from benchmarks.fixtures import chat_history, offline_account
+
+CHATS = 10
+MESSAGES = 50
+REPEATS = 5
+
+FIELDS = ("id", "text", "author", "author_id", "chat_name", "badge", "is_employee", "is_support", "is_autoreply",
+          "image_link", "type", "initiator_username", "initiator_id", "i_am_seller", "i_am_buyer", "by_bot")
+
+
+def legacy_second_pass(account, messages: list[types.Message]):
+    """Второй цикл прежней реализации: заново строит дерево каждого сообщения."""
+    for i in messages:
+        parser = BeautifulSoup(i.html, "lxml")
+        default_label = parser.find("div", {"class": "media-user-name"})
+        default_label = default_label.find("span", {
+            "class": "chat-msg-author-label label label-default"}) if default_label else None
+        i.is_autoreply = bool(default_label and default_label.text in ("автовідповідь", "автоответ", "auto-reply"))
+        if i.type != types.MessageTypes.NON_SYSTEM:
+            users = parser.find_all('a', href=lambda href: href and '/users/' in href)
+            if users:
+                i.initiator_username = users[0].text
+                i.initiator_id = int(users[0]["href"].split("/")[-2])
+
+
+def count_parsers(func) -> int:
+    counter = [0]
+    original = FunPayAPI.account.BeautifulSoup
+
+    def counting(*args, **kwargs):
+        counter[0] += 1
+        return original(*args, **kwargs)
+
+    FunPayAPI.account.BeautifulSoup = counting
+    try:
+        func()
+    finally:
+        FunPayAPI.account.BeautifulSoup = original
+    return counter[0]
+
+
+def main():
+    account = offline_account()
+    parse = account._Account__parse_messages
+    chats = [chat_history(i, MESSAGES) for i in range(CHATS)]
+
+    def current():
+        return [parse(msgs, chat_id, buyer_id, buyer) for chat_id, buyer_id, buyer, msgs in chats]
+
+    def legacy():
+        result = current()
+        for messages in result:
+            legacy_second_pass(account, messages)
+        return result
+
+    new_result, old_result = current(), legacy()
+    for new, old in zip(new_result, old_result):
+        for a, b in zip(new, old):
+            assert all(getattr(a, f) == getattr(b, f) for f in FIELDS), a.id
+
+    total = CHATS * MESSAGES
+    print(f"messages per tick: {total}")
+    print(f"BeautifulSoup trees: legacy {count_parsers(legacy) + total}, current {count_parsers(current)}")
+    for name, func in (("legacy", legacy), ("current", current)):
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            func()
+        elapsed = (time.perf_counter() - start) / REPEATS
+        print(f"{name:>8}: {elapsed * 1000:8.1f} ms/tick, {total / elapsed:8.0f} messages/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Нагрузочный сценарий для RateLimiter: Runner, выдача заказов и фоновые запросы одновременно работают через один
+аккаунт, а "сервер" отвечает 429 при превышении лимита запросов в секунду.
+
+Запуск: python -m benchmarks.bench_ratelimit
+"""
+from __future__ import annotations
+
+import collections
+import statistics
+import threading
+import time
+
+from FunPayAPI.common.ratelimit import RateLimiter
+from benchmarks.fixtures import FixtureAdapter, offline_account, page
+
+SERVER_LIMIT = 6  # запросов в секунду
+DURATION = 6.0
+
+
+class ThrottlingAdapter(FixtureAdapter):
+    """Отвечает 429, если за последнюю секунду было больше SERVER_LIMIT запросов."""
+
+    def __init__(self, routes):
+        super().__init__(routes)
+        self.times = collections.deque()
+        self.lock = threading.Lock()
+        self.throttled = 0
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            now = time.monotonic()
+            while self.times and now - self.times[0] > 1:
+                self.times.popleft()
+            self.times.append(now)
+            throttled = len(self.times) > SERVER_LIMIT
+            self.throttled += throttled
+        response = super().send(request, **kwargs)
+        if throttled:
+            response.status_code = 429
+        return response
+
+
+def run(enabled: bool) -> dict[str, list[float]]:
+    routes = {"orders/ABCD1234/": page(""), "runner/": "{}", "users/1/": page("")}
+    account = offline_account(routes, rate_limiter=RateLimiter(enabled=enabled))
+    adapter = ThrottlingAdapter(routes)
+    account.session.mount("https://", adapter)
+    latencies = collections.defaultdict(list)
+    failures = collections.Counter()
+    stop = time.monotonic() + DURATION
+
+    def worker(name: str, method: str, path: str, pause: float):
+        while time.monotonic() < stop:
+            start = time.monotonic()
+            # повторяем запрос, пока не получим ответ без 429, как это делает бот
+            while account.method(method, path, {}, {}).status_code == 429:
+                failures[name] += 1
+                if time.monotonic() > stop:
+                    break
+                time.sleep(0.2)
+            else:
+                latencies[name].append(time.monotonic() - start)
+            time.sleep(pause)
+
+    threads = [threading.Thread(target=worker, args=("runner", "post", "runner/", 0.3)),
+               threading.Thread(target=worker, args=("orders", "get", "orders/ABCD1234/", 1.0))]
+    threads += [threading.Thread(target=worker, args=("background", "get", "users/1/", 0.0)) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {"latencies": latencies, "failures": failures, "throttled": adapter.throttled}
+
+
+def main():
+    print(f"{'limiter':>8} {'lane':>11} {'requests':>9} {'429s':>5} {'p50, ms':>8} {'p95, ms':>8}")
+    for enabled in (False, True):
+        result = run(enabled)
+        for lane, values in sorted(result["latencies"].items()):
+            if len(values) < 2:
+                print(f"{'on' if enabled else 'off':>8} {lane:>11} {len(values):>9} {result['failures'][lane]:>5}")
+                continue
+            q = statistics.quantiles(values, n=20)
+            print(f"{'on' if enabled else 'off':>8} {lane:>11} {len(values):>9} {result['failures'][lane]:>5} "
+                  f"{statistics.median(values) * 1000:>8.1f} {q[18] * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Стоимость одного цикла Runner'а при разных профилях опроса: полный (счетчики заказов и список чатов при
+каждом запросе, как раньше) и Runner.orders_fast_lane (только счетчики заказов и счетчик чатов, список чатов -
+по интервалу или после изменения счетчика).
+
+Для каждого профиля выводит процессорное время и объем ответов FunPay на цикл, кол-во объектов runner/ на цикл
+и задержку от появления заказа / сообщения на локальном FunPay (benchmarks.mock_funpay) до NewOrderEvent /
+NewMessageEvent.
+
+Запуск: python -m benchmarks.bench_runner_profiles [--duration 20] [--delay 0.5] [--orders 1] [--messages 1]
+    [--chats-interval 10]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from benchmarks.mock_funpay import MockFunPay
+
+
+def run(args, fast_lane: bool) -> dict:
+    """Запускает Runner в профиле на args.duration секунд. :return: метрики профиля."""
+    from FunPayAPI import Account
+    from FunPayAPI.common.enums import HTMLRetentionModes
+    from FunPayAPI.common.ratelimit import RateLimiter
+    from FunPayAPI.updater.events import NewMessageEvent, NewOrderEvent
+    from FunPayAPI.updater.runner import Runner
+    from metrics import LatencyStats
+
+    funpay = MockFunPay(args.orders, args.messages, latency=args.latency, seed=args.seed).start()
+    account = Account("0" * 32, base_url=funpay.url, sales_parser="lxml", html_retention=HTMLRetentionModes.NEVER,
+                      rate_limiter=RateLimiter(enabled=False)).get()
+    kwargs = {"incremental_orders": True, "history_workers": 1}
+    runner = Runner.orders_fast_lane(account, args.chats_interval, **kwargs) if fast_lane \
+        else Runner(account, **kwargs)
+
+    traffic = {"bytes": 0, "objects": 0}
+    method = account.method
+
+    def counting_method(request_method, api_method, headers, payload, *method_args, **method_kwargs):
+        response = method(request_method, api_method, headers, payload, *method_args, **method_kwargs)
+        if api_method == "runner/" and isinstance(payload, dict) and "objects" in payload:
+            traffic["objects"] += len(json.loads(payload["objects"]))
+        traffic["bytes"] += len(response.content)
+        return response
+
+    account.method = counting_method
+    ready, pending = runner.poll()  # первый запрос (Initial-события) не учитывается
+    initial_orders, initial_messages = set(funpay.created), set(funpay.written)
+    traffic.update(bytes=0, objects=0)
+    stats, cpu, ticks = LatencyStats(window=10 ** 6), 0.0, 0
+    deadline = time.time() + args.duration
+    while time.time() < deadline:
+        start = time.thread_time()
+        ready, pending = runner.poll(pending)
+        cpu += time.thread_time() - start
+        ticks += 1
+        now = time.time()
+        for event in ready:
+            if isinstance(event, NewOrderEvent) and event.order.id not in initial_orders:
+                stats.add("NewOrderEvent", now - funpay.created[event.order.id])
+            elif isinstance(event, NewMessageEvent) and event.message.id in funpay.written \
+                    and event.message.id not in initial_messages and event.message.author_id != account.id:
+                stats.add("NewMessageEvent", now - funpay.written[event.message.id])
+        time.sleep(args.delay)
+    funpay.stop()
+    return {"cpu": cpu / ticks, "bytes": traffic["bytes"] / ticks, "objects": traffic["objects"] / ticks,
+            "stats": stats.summary()}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_runner_profiles",
+                                         description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--duration", type=float, default=20.0, help="длительность каждого профиля (в секундах)")
+    arg_parser.add_argument("--delay", type=float, default=0.5, help="пауза между циклами Runner'а (в секундах)")
+    arg_parser.add_argument("--orders", type=float, default=1.0, help="новых заказов в секунду")
+    arg_parser.add_argument("--messages", type=float, default=1.0, help="новых сообщений в секунду")
+    arg_parser.add_argument("--latency", type=float, default=0.02, help="задержка ответа FunPay (в секундах)")
+    arg_parser.add_argument("--chats-interval", type=float, default=10.0,
+                            help="интервал запросов списка чатов в orders_fast_lane (в секундах)")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    print(f"{args.orders} заказов/с, {args.messages} сообщений/с, пауза Runner'а {args.delay} с, "
+          f"{args.duration:.0f} с на профиль")
+    print(f"{'':<20}{'CPU/цикл, мс':>13}{'КБ/цикл':>9}{'объектов':>10}"
+          f"{'заказ p50/p95, мс':>19}{'сообщение p50/p95, мс':>23}")
+    for name, fast_lane in (("полный", False), ("orders_fast_lane", True)):
+        result = run(args, fast_lane)
+        latency = []
+        for event in ("NewOrderEvent", "NewMessageEvent"):
+            s = result["stats"].get(event)
+            latency.append(f"{s['p50'] * 1000:.0f}/{s['p95'] * 1000:.0f}" if s else "-")
+        print(f"{name:<20}{result['cpu'] * 1000:>13.2f}{result['bytes'] / 1024:>9.1f}{result['objects']:>10.1f}"
+              f"{latency[0]:>19}{latency[1]:>23}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Состояние Runner'а при долгой работе: покупатели пишут в случайные чаты, список чатов (chat_bookmarks) содержит
+50 последних, как на FunPay.
+
+Сравнивает хранилища без ограничения размера с ограниченными (Runner(max_chats=...),
+Account(max_saved_chats=...)): размер хранилищ, кол-во вытеснений и память, а также проверяет, что в обоих случаях
+каждое новое сообщение приходит ровно одним NewMessageEvent (вытесненные чаты не присылают старые сообщения).
+
+Запуск: python -m benchmarks.bench_runner_state
+"""
+from __future__ import annotations
+
+import collections
+import json
+import random
+import time
+import tracemalloc
+
+from FunPayAPI.common.ratelimit import RateLimiter
+from FunPayAPI.updater.events import NewMessageEvent
+from FunPayAPI.updater.runner import Runner
+from benchmarks.fixtures import chat_bookmarks, chat_message, chat_node, contact_item, offline_account
+
+BUYERS = 2000
+TICKS = 300
+MESSAGES_PER_TICK = 3
+BOOKMARKS = 50
+LIMIT = 200
+
+
+def simulate(limit: int | None) -> tuple[list[tuple[int, int]], list[tuple[int, int]], dict, float, float]:
+    rnd = random.Random(0)
+    routes = {}
+    account = offline_account(routes, max_saved_chats=limit, rate_limiter=RateLimiter(enabled=False))
+    runner = Runner(account, max_chats=limit)
+    chats = collections.OrderedDict()  # {ID чата: (ID покупателя, последние сообщения)}
+    msg_id = 10 ** 6
+    sent, received = [], []
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        changed = set()
+        for _ in range(MESSAGES_PER_TICK if tick else 1):
+            # треть сообщений - от постоянных покупателей, остальные - от случайных
+            buyer = rnd.randrange(20) if rnd.random() < 0.3 else rnd.randrange(BUYERS)
+            chat_id, buyer_id = 10 ** 7 + buyer, 2 * 10 ** 6 + buyer
+            msg_id += 1
+            history = chats.pop(chat_id, (buyer_id, []))[1][-2:]
+            history.append(chat_message(msg_id, buyer_id, f"Buyer{buyer}", f"Сообщение {msg_id}"))
+            chats[chat_id] = (buyer_id, history)
+            changed.add(chat_id)
+            if tick:
+                sent.append((chat_id, msg_id))
+
+        recent = list(chats.items())[-BOOKMARKS:]
+        items = [contact_item(cid, f"Buyer{buyer_id}", history[-1]["id"], f"Сообщение {history[-1]['id']}")
+                 for cid, (buyer_id, history) in reversed(recent)]
+        routes["runner/"] = json.dumps({"objects": [chat_node(cid, chats[cid][0], chats[cid][1]) for cid in changed]})
+        for event in runner.parse_updates({"objects": [chat_bookmarks(items, tag=str(tick))]}):
+            if isinstance(event, NewMessageEvent):
+                received.append((event.message.chat_id, event.message.id))
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return sent, received, runner.get_state_stats(), elapsed, memory
+
+
+def main():
+    print(f"{BUYERS} покупателей, {TICKS} циклов по {MESSAGES_PER_TICK} сообщения")
+    for limit in (None, LIMIT):
+        sent, received, stats, elapsed, memory = simulate(limit)
+        assert sorted(received) == sorted(sent), "События новых сообщений не совпадают с отправленными сообщениями"
+        print(f"\nmax_chats={limit}: {len(received)} событий NewMessageEvent (без повторов и пропусков), "
+              f"{elapsed:.1f} с, {memory / 2 ** 20:.1f} МБ")
+        for name, i in stats.items():
+            print(f"  {name:<22}{i['size']:>6} записей, вытеснено {i.get('evictions', 0)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Сравнение бэкендов парсинга страницы продаж (https://funpay.com/orders/trade).
+
+Запуск: python -m benchmarks.bench_sales_parser
+"""
+from __future__ import annotations
+
+import time
+
+from FunPayAPI.common.ratelimit import RateLimiter
+from benchmarks.fixtures import offline_account, sales_page_html
+
+SIZES = (1, 50, 500)
+REPEATS = 20
+
+
+def _key(order):
+    return (order.id, order.description, order.price, order.currency, order.buyer_username, order.buyer_id,
+            order.status, order.date, order.subcategory_name,
+            order.subcategory.id if order.subcategory else None)
+
+
+def bench(backend: str, rows: int) -> tuple[float, list]:
+    account = offline_account({"orders/trade": sales_page_html(rows)}, sales_parser=backend,
+                              rate_limiter=RateLimiter(enabled=False))
+    result = account.get_sales()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        account.get_sales()
+    return (time.perf_counter() - start) / REPEATS, [_key(i) for i in result[1]]
+
+
+def main():
+    print(f"{'rows':>6} {'bs4, ms':>10} {'lxml, ms':>10} {'speedup':>8}")
+    for rows in SIZES:
+        bs4_time, bs4_orders = bench("bs4", rows)
+        lxml_time, lxml_orders = bench("lxml", rows)
+        assert bs4_orders == lxml_orders, "Бэкенды вернули разные заказы"
+        print(f"{rows:>6} {bs4_time * 1000:>10.2f} {lxml_time * 1000:>10.2f} {bs4_time / lxml_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
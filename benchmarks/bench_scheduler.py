@@ -0,0 +1,66 @@
+"""
+Моделирование суток опроса FunPay: фиксированная задержка против AdaptiveScheduler.
+Считает кол-во запросов и задержку обнаружения заказов (от появления заказа до запроса, который его увидел).
+
+Запуск: python -m benchmarks.bench_scheduler
+"""
+from __future__ import annotations
+
+import random
+import statistics
+
+from FunPayAPI.updater.events import NewOrderEvent
+from FunPayAPI.updater.scheduler import AdaptiveScheduler
+from FunPayAPI.common.enums import EventTypes
+
+DAY = 24 * 60 * 60
+
+
+def order_times(seed: int = 1) -> list[float]:
+    """Заказы приходят пачками днем и почти не приходят ночью."""
+    rnd = random.Random(seed)
+    result = []
+    t = 0.0
+    while t < DAY:
+        hour = t / 3600
+        rate = 1 / 120 if 10 <= hour < 23 else 1 / 1800  # заказов в секунду
+        t += rnd.expovariate(rate)
+        burst = rnd.choice((1, 1, 1, 2, 3, 5))
+        for _ in range(burst):
+            result.append(t)
+            t += rnd.uniform(2, 20)
+    return [i for i in result if i < DAY]
+
+
+def simulate(delay_func) -> tuple[int, list[float]]:
+    orders = order_times()
+    t, i, requests, latencies = 0.0, 0, 0, []
+    event = NewOrderEvent.__new__(NewOrderEvent)
+    event.type = EventTypes.NEW_ORDER
+    while t < DAY:
+        requests += 1
+        found = []
+        while i < len(orders) and orders[i] <= t:
+            latencies.append(t - orders[i])
+            found.append(event)
+            i += 1
+        t += delay_func(found)
+    return requests, latencies
+
+
+def main():
+    print(f"{'mode':>22} {'requests/day':>13} {'p50, s':>7} {'p95, s':>7}")
+    for name, func in (("fixed 3.0s", lambda events: 3.0), ("fixed 6.0s", lambda events: 6.0)):
+        requests, latencies = simulate(func)
+        q = statistics.quantiles(latencies, n=20)
+        print(f"{name:>22} {requests:>13} {statistics.median(latencies):>7.2f} {q[18]:>7.2f}")
+    for min_delay, max_delay in ((1.0, 6.0), (1.0, 10.0), (1.0, 30.0)):
+        scheduler = AdaptiveScheduler(min_delay, max_delay)
+        requests, latencies = simulate(scheduler.next_delay)
+        q = statistics.quantiles(latencies, n=20)
+        print(f"{f'adaptive {min_delay}-{max_delay}s':>22} {requests:>13} {statistics.median(latencies):>7.2f} "
+              f"{q[18]:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Память, занимаемая объектами FunPayAPI.types: 100 000 заказов (OrderShortcut) и 100 000 сообщений (Message),
+как в Runner.saved_orders / Account.__saved_chats долго работающего бота.
+
+Сравнивает классы с __slots__ с их копиями без __slots__ (атрибуты в __dict__, как было раньше).
+Строки (описание, HTML и т.д.) общие для всех объектов, поэтому разница - это накладные расходы самих объектов.
+
+Запуск: python -m benchmarks.bench_types_memory
+"""
+from __future__ import annotations
+
+import datetime
+import gc
+import tracemalloc
+
+from FunPayAPI import types
+from FunPayAPI.common.enums import Currency, OrderStatuses
+
+COUNT = 100_000
+
+
+def without_slots(cls: type) -> type:
+    """Создает копию класса (и его предков из FunPayAPI.types) без __slots__."""
+    bases = tuple(without_slots(i) if i.__module__ == types.__name__ else i for i in cls.__bases__)
+    namespace = {k: v for k, v in cls.__dict__.items() if k not in ("__slots__", "__dict__", "__weakref__")
+                 and k not in getattr(cls, "__slots__", ())}
+    return type(cls.__name__, bases, namespace)
+
+
+def make_order(cls: type, n: int):
+    return cls(f"#A{n:07d}", "Telegram, Звезды, 50 звёзд, 1 шт.", 75.0, Currency.RUB, "buyer", 12345,
+               "users-1-12345", OrderStatuses.PAID, DATE, "Звезды", None, ORDER_HTML)
+
+
+def make_message(cls: type, n: int):
+    return cls(n, "Здравствуйте! Мой ник @username", "users-1-12345", "buyer", 12345, "buyer", 12345,
+               MESSAGE_HTML, determine_msg_type=False)
+
+
+DATE = datetime.datetime(2026, 1, 1)
+ORDER_HTML = "<a class=\"tc-item\" href=\"https://funpay.com/orders/A0000000/\">...</a>"
+MESSAGE_HTML = "<div class=\"chat-msg-item\" id=\"message-1\">...</div>"
+
+
+def measure(factory, cls: type) -> tuple[int, list]:
+    gc.collect()
+    tracemalloc.start()
+    objects = [factory(cls, n) for n in range(COUNT)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, objects
+
+
+def main():
+    print(f"{COUNT} объектов{'':<9}{'без __slots__, МБ':>19}{'с __slots__, МБ':>17}")
+    for name, factory, cls in (("OrderShortcut", make_order, types.OrderShortcut),
+                               ("Message", make_message, types.Message)):
+        legacy, legacy_objects = measure(factory, without_slots(cls))
+        current, current_objects = measure(factory, cls)
+        assert not hasattr(current_objects[0], "__dict__")
+        assert all(getattr(legacy_objects[0], i) == getattr(current_objects[0], i)
+                   for i in vars(legacy_objects[0]))
+        print(f"{name:<24}{legacy / 2 ** 20:>19.1f}{current / 2 ** 20:>17.1f}  "
+              f"({legacy / COUNT:.0f} -> {current / COUNT:.0f} байт на объект)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Перезапуск бота: время от старта до первого "настоящего" события (NewMessageEvent / NewOrderEvent).
+
+Пока бот был остановлен, покупатель оплатил заказ и написал в чат.
+
+* Холодный старт: Account.get() парсит каталог игр, первый запрос Runner'а возвращает только Initial-события
+  по всем чатам и заказам (изменения за время простоя теряются), поэтому первое настоящее событие приходит
+  только на следующем цикле - когда появится новое сообщение (без учета паузы между циклами).
+* Теплый старт: состояние прошлого запуска (storage.save_state) восстанавливается до Account.get() и
+  в Runner, и первый же цикл возвращает события, произошедшие за время простоя.
+
+Запуск: python -m benchmarks.bench_warm_restart
+"""
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import tempfile
+import time
+import urllib.parse
+
+from FunPayAPI.common import storage
+from FunPayAPI.common.enums import HTMLRetentionModes
+from FunPayAPI.common.ratelimit import RateLimiter
+from FunPayAPI.updater.events import NewMessageEvent, NewOrderEvent
+from FunPayAPI.updater.runner import Runner
+from benchmarks.fixtures import (ACCOUNT_ID, chat_bookmarks, chat_message, chat_node, contact_item, homepage_html,
+                                 offline_account, order_id, sales_page_html, system_message)
+
+GAMES = 700
+CHATS = 50
+ORDERS = 100
+REPEATS = 10
+
+ACCOUNT_KWARGS = {"sales_parser": "lxml", "html_retention": HTMLRetentionModes.NEVER}
+RUNNER_KWARGS = {"incremental_orders": True}
+
+
+class FakeFunPay:
+    """
+    Эмулирует funpay.com: главную страницу, список продаж и https://funpay.com/runner/, который возвращает
+    объекты, тег которых изменился с прошлого запроса, и истории запрошенных чатов.
+    """
+
+    def __init__(self):
+        self.msg_id = 10 ** 6
+        self.chats = {}  # {ID чата: (ID покупателя, сообщения)}, последний - самый новый
+        for i in reversed(range(CHATS)):
+            self.write(i, f"Сообщение покупателя {i}")
+        self.chat_tag, self.order_tag, self.seller = "chats-0", "orders-0", 2
+        self.routes = {"": homepage_html(GAMES), "orders/trade": sales_page_html(ORDERS, start=1), "runner/": self}
+
+    def write(self, buyer: int, text: str | None = None):
+        chat_id, buyer_id = 10 ** 7 + buyer, 2 * 10 ** 6 + buyer
+        messages = self.chats.pop(chat_id, (buyer_id, []))[1]
+        self.msg_id += 1
+        messages.append(chat_message(self.msg_id, buyer_id, f"Buyer{buyer}", text) if text else
+                        system_message(self.msg_id, buyer_id, f"Buyer{buyer}", order_id(buyer)))
+        self.chats[chat_id] = (buyer_id, messages[-20:])
+        self.chat_tag = f"chats-{self.msg_id}"
+
+    def downtime(self):
+        """Пока бот остановлен, покупатель Buyer0 оплачивает заказ и пишет в чат."""
+        self.routes["orders/trade"] = sales_page_html(ORDERS + 1)
+        self.seller += 1
+        self.order_tag = f"orders-{self.seller}"
+        self.write(0)
+        self.write(0, "Здравствуйте! Мой ник @username")
+
+    def __call__(self, request) -> str:
+        objects = []
+        for obj in json.loads(urllib.parse.parse_qs(request.body)["objects"][0]):
+            if obj["type"] == "orders_counters" and obj["tag"] != self.order_tag:
+                objects.append({"type": "orders_counters", "id": ACCOUNT_ID, "tag": self.order_tag,
+                                "data": {"buyer": 0, "seller": self.seller}})
+            elif obj["type"] == "chat_bookmarks" and obj["tag"] != self.chat_tag:
+                items = [contact_item(cid, f"Buyer{buyer_id}", messages[-1]["id"], "...")
+                         for cid, (buyer_id, messages) in reversed(self.chats.items())]
+                objects.append(chat_bookmarks(items, tag=self.chat_tag))
+            elif obj["type"] == "chat_node":
+                buyer_id, messages = self.chats[obj["id"]]
+                objects.append(chat_node(obj["id"], buyer_id, messages))
+        return json.dumps({"objects": objects})
+
+
+def real_events(events: list) -> list:
+    return [i for i in events if isinstance(i, (NewMessageEvent, NewOrderEvent))]
+
+
+def previous_run(path: str) -> FakeFunPay:
+    """Прошлый запуск бота: один цикл Runner'а и сохранение состояния; затем простой."""
+    server = FakeFunPay()
+    account = offline_account(server.routes, rate_limiter=RateLimiter(enabled=False), **ACCOUNT_KWARGS)
+    runner = Runner(account, **RUNNER_KWARGS)
+    runner.poll()
+    storage.save_state(path, {"account": account.export_state(), "runner": runner.export_state()})
+    server.downtime()
+    return server
+
+
+def cold_start(server: FakeFunPay) -> tuple[float, int, list]:
+    start = time.perf_counter()
+    account = offline_account(server.routes, rate_limiter=RateLimiter(enabled=False), **ACCOUNT_KWARGS)
+    runner = Runner(account, **RUNNER_KWARGS)
+    polls, events = 0, []
+    while not events:
+        if polls:
+            server.write(1, "Новое сообщение после запуска")  # приходит во время паузы между циклами
+        polls += 1
+        events = real_events(runner.poll()[0])
+    return time.perf_counter() - start, sum(account.session.get_adapter("https://").hits.values()), events
+
+
+def warm_start(server: FakeFunPay, path: str) -> tuple[float, int, list]:
+    start = time.perf_counter()
+    state = storage.load_state(path, max_age=3600)
+    account = offline_account(server.routes, state=state.get("account"), rate_limiter=RateLimiter(enabled=False),
+                              **ACCOUNT_KWARGS)
+    runner = Runner(account, **RUNNER_KWARGS)
+    assert runner.import_state(state.get("runner"))
+    events = real_events(runner.poll()[0])
+    return time.perf_counter() - start, sum(account.session.get_adapter("https://").hits.values()), events
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "state.json")
+    results = {"холодный": [], "теплый": []}
+    for _ in range(REPEATS):
+        elapsed, hits, events = cold_start(previous_run(path))
+        assert [(type(i), i.message.text) for i in events] == [(NewMessageEvent, "Новое сообщение после запуска")]
+        results["холодный"].append((elapsed, hits, 0))
+
+        elapsed, hits, events = warm_start(previous_run(path), path)
+        assert [type(i) for i in events] == [NewOrderEvent, NewMessageEvent, NewMessageEvent], events
+        assert events[0].order.id == order_id(0)
+        results["теплый"].append((elapsed, hits, len(events)))
+
+    print(f"{GAMES} игр в каталоге, {CHATS} чатов, {ORDERS} заказов, размер состояния: {os.path.getsize(path)} байт")
+    print(f"{'старт':<10}{'до 1-го события, мс':>21}{'HTTP-запросов':>15}{'событий простоя':>17}")
+    for name, runs in results.items():
+        print(f"{name:<10}{statistics.median(i[0] for i in runs) * 1000:>21.1f}{runs[0][1]:>15}{runs[0][2]:>17}")
+    print("(холодный старт - без учета паузы между циклами Runner'а, события за время простоя теряются)")
+
+
+if __name__ == "__main__":
+    main()
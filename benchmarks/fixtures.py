@@ -0,0 +1,425 @@
+"""
+Обезличенные страницы FunPay для офлайн-бенчмарков и транспорт requests, который отдает их вместо funpay.com.
+"""
+from __future__ import annotations
+
+import collections
+import json
+import random
+
+from typing import Callable
+
+import requests
+import requests.adapters
+
+ACCOUNT_ID = 1000001
+ACCOUNT_USERNAME = "SellerName"
+CSRF_TOKEN = "csrf0000000000000000"
+
+_APP_DATA = json.dumps({"locale": "ru", "userId": ACCOUNT_ID, "csrf-token": CSRF_TOKEN})
+
+_HEADER = """<!DOCTYPE html>
+<html lang="ru">
+<head><meta charset="utf-8"><title>FunPay</title></head>
+<body data-app-data='{app_data}'>
+<div class="wrapper">
+<header>
+<nav class="navbar navbar-default navbar-fixed-top">
+<ul class="nav navbar-nav navbar-right logged">
+<li class="{sales_active}"><a href="https://funpay.com/orders/trade" class="menu-item-orders">Продажи <span class="badge badge-trade">2</span></a></li>
+<li><a href="https://funpay.com/orders/" class="menu-item-orders">Покупки</a></li>
+<li class="dropdown">
+<a href="https://funpay.com/users/{account_id}/" class="dropdown-toggle user-link">
+<div class="user-link-photo"><img src="/img/layout/avatar.png" alt=""></div>
+<div class="user-link-name">{username}</div>
+</a>
+<ul class="dropdown-menu">
+<li><a href="https://funpay.com/account/logout?token=000" class="menu-item-logout">Выход</a></li>
+</ul>
+</li>
+<li><span class="badge badge-balance">1 234 ₽</span></li>
+</ul>
+</nav>
+</header>
+<div class="content">
+"""
+
+_FOOTER = """
+</div>
+</div>
+</body>
+</html>
+"""
+
+_SALES_ROW = """<a href="https://funpay.com/orders/{order_id}/" class="tc-item{status_class}">
+<div class="tc-date" data-order="{order_id}">
+<div class="tc-date-time">{date}</div>
+<div class="tc-date-left">2 часа назад</div>
+</div>
+<div class="tc-order">#{order_id}</div>
+<div class="order-desc">
+<div>{description}</div>
+<div class="text-muted">Telegram, Звёзды</div>
+</div>
+<div class="tc-user">
+<div class="media media-user offline">
+<div class="media-left"><div class="avatar-photo pseudo-a" tabindex="0" data-href="https://funpay.com/users/{buyer_id}/" style="background-image: url(/img/layout/avatar.png);"></div></div>
+<div class="media-body">
+<div class="media-user-name"><span class="pseudo-a" tabindex="0" data-href="https://funpay.com/users/{buyer_id}/">{buyer}</span></div>
+<div class="media-user-status">был 2 часа назад</div>
+</div>
+</div>
+</div>
+<div class="tc-status text-{status_color}">{status_text}</div>
+<div class="tc-price text-nowrap tc-seller-sum">{price} <span class="unit">₽</span></div>
+</a>
+"""
+
+_STATUSES = [(" info", "primary", "Оплачен"), ("", "success", "Закрыт"), (" warning", "warning", "Возврат")]
+
+
+def order_id(n: int) -> str:
+    """Возвращает детерминированный ID заказа вида ABCD1234."""
+    alphabet = "ABCDEFGHJKLMNPQRSTUVWXYZ0123456789"
+    result = ""
+    n += 7_000_000
+    for _ in range(8):
+        n, r = divmod(n, len(alphabet))
+        result += alphabet[r]
+    return result
+
+
+def order_goods(n: int) -> tuple[int, int, int]:
+    """Возвращает (статус по умолчанию, кол-во звезд в лоте, кол-во товара) заказа n."""
+    rnd = random.Random(n)
+    status = 0 if n < 3 else rnd.choice((1, 1, 1, 2))
+    return status, rnd.choice((50, 100, 250, 500, 1000)), rnd.randint(1, 3)
+
+
+def sales_row(n: int, status: int | None = None) -> str:
+    """Возвращает виджет заказа со страницы https://funpay.com/orders/trade"""
+    default_status, stars, amount = order_goods(n)
+    status_class, status_color, status_text = _STATUSES[status if status is not None else default_status]
+    date = "сегодня, 12:{:02d}".format(n % 60) if n < 20 else "{} мая, 1{}:{:02d}".format(1 + n % 28, n % 10, n % 60)
+    return _SALES_ROW.format(order_id=order_id(n), status_class=status_class, date=date,
+                             description=f"{stars} звёзд, Telegram Username, {amount} шт.",
+                             buyer_id=2000000 + n, buyer=f"Buyer{n}", status_color=status_color,
+                             status_text=status_text, price=f"{stars * amount * 1.7:.2f}")
+
+
+def sales_page_html(rows: int, start: int = 0) -> str:
+    """
+    Возвращает страницу https://funpay.com/orders/trade с переданным кол-вом заказов (начиная с заказа start:
+    чем меньше номер заказа, тем он новее).
+    """
+    games = json.dumps([["lot-2418", "Звёзды"], ["lot-2419", "Premium"]], ensure_ascii=False)
+    body = f"""<div class="page-content">
+<form action="https://funpay.com/orders/trade" method="get" class="form-inline">
+<select name="game" class="form-control">
+<option value="">Все игры</option>
+<option value="2117" data-data='{games}'>Telegram</option>
+</select>
+</form>
+<div class="tc table-hover table-clickable tc-selling">
+<div class="tc-header">
+<div class="tc-date">Дата</div><div class="tc-order">Заказ</div><div class="order-desc">Описание</div>
+<div class="tc-user">Покупатель</div><div class="tc-status">Статус</div><div class="tc-price">Сумма</div>
+</div>
+{"".join(sales_row(i) for i in range(start, start + rows))}
+</div>
+<form method="post" class="dyn-table-form"><input type="hidden" name="continue" value="{order_id(start + rows)}"></form>
+</div>"""
+    return page(body)
+
+
+def page(body: str, sales_active: bool = False) -> str:
+    """Оборачивает содержимое в шапку и подвал страницы FunPay."""
+    return _HEADER.format(app_data=_APP_DATA, account_id=ACCOUNT_ID, username=ACCOUNT_USERNAME,
+                          sales_active="active" if sales_active else "") + body + _FOOTER
+
+
+def homepage_html(extra_games: int = 0) -> str:
+    """
+    Возвращает главную страницу FunPay с несколькими играми (и extra_games сгенерированными играми с 8 разделами,
+    чтобы приблизить размер каталога к настоящему - около 700 игр).
+    """
+    games = []
+    catalog = [(2117, "Telegram", [(2418, "Звёзды", "lots"), (2419, "Premium", "lots")]),
+               (41, "Dota 2", [(81, "Аккаунты", "lots"), (82, "Предметы", "lots")]),
+               (1, "World of Warcraft", [(2, "Золото", "chips"), (3, "Аккаунты", "lots")])]
+    catalog += [(10000 + n, f"Game {n}", [(20000 + n * 8 + k, f"Раздел {k}", "chips" if k == 0 else "lots")
+                                          for k in range(8)]) for n in range(extra_games)]
+    for gid, name, subs in catalog:
+        links = "".join(f'<li><a href="https://funpay.com/{t}/{sid}/">{sname}</a></li>' for sid, sname, t in subs)
+        games.append(f"""<div class="col-md-3 col-xs-6 promo-game-item">
+<div class="game-title" data-id="{gid}"><a href="https://funpay.com/lots/{subs[0][0]}/">{name}</a></div>
+<ul class="list-inline" data-id="{gid}">{links}</ul>
+</div>""")
+    body = f'<div class="promo-game-list">{"".join(games)}</div>'
+    return page(body)
+
+
+class FixtureAdapter(requests.adapters.BaseAdapter):
+    """
+    Транспорт requests, который вместо сетевых запросов отдает заранее подготовленные ответы.
+
+    :param routes: {путь (без https://funpay.com/ и параметров): тело ответа (str / bytes) или функция, которая
+        принимает запрос (requests.PreparedRequest) и возвращает тело ответа}.
+    """
+
+    def __init__(self, routes: dict[str, str | bytes | Callable]):
+        super().__init__()
+        self.routes = routes
+        self.hits: collections.Counter[str] = collections.Counter()
+        """Кол-во запросов по путям."""
+
+    def send(self, request, **kwargs):
+        path = request.url.split("://", 1)[1].split("/", 1)[1].split("?", 1)[0]
+        self.hits[path] += 1
+        body = self.routes.get(path)
+        body = body(request) if callable(body) else body
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = 200 if body is not None else 404
+        response._content = body.encode() if isinstance(body, str) else (body or b"")
+        response.headers["Content-Type"] = "text/html; charset=utf-8"
+        return response
+
+    def close(self):
+        pass
+
+
+def offline_account(routes: dict[str, str | bytes | Callable] | None = None, state: dict | None = None, **kwargs):
+    """
+    Создает инициализированный экземпляр :class:`FunPayAPI.account.Account`, который работает без сети.
+    Словарь routes не копируется, поэтому ответы можно подменять между запросами.
+    Если передано состояние (Account.export_state()), оно восстанавливается до Account.get().
+    """
+    from FunPayAPI import Account
+
+    routes = routes if routes is not None else {}
+    routes.setdefault("", homepage_html())
+    account = Account("0" * 32, **kwargs)
+    account.session.mount("https://", FixtureAdapter(routes))
+    if state:
+        account.import_state(state)
+    return account.get()
+
+
+_CHAT_MESSAGE = """<div class="chat-msg-item{head}" id="message-{msg_id}">
+<div class="chat-message">
+<div class="media chat-msg-head">
+<div class="media-left">{avatar}</div>
+<div class="media-body">
+<div class="media-user-name">{author}{label} <div class="chat-msg-date" title="12 мая, 12:34:56">12:34</div></div>
+</div>
+</div>
+<div class="chat-msg-body">{body}</div>
+</div>
+</div>"""
+
+
+def chat_message(msg_id: int, author_id: int, author: str, text: str, label: str = "") -> dict:
+    """Возвращает сообщение в формате ответа https://funpay.com/runner/ (chat_node)."""
+    body = f'<div class="chat-msg-text">{text}</div>'
+    avatar = f'<a href="https://funpay.com/users/{author_id}/" class="avatar-photo"><img src="/img/layout/avatar.png" alt=""></a>'
+    author = f'<a href="https://funpay.com/users/{author_id}/" class="chat-msg-author-link">{author}</a>'
+    return {"id": msg_id, "author": author_id,
+            "html": _CHAT_MESSAGE.format(head=" chat-msg-with-head", msg_id=msg_id, avatar=avatar, author=author,
+                                         label=label, body=body)}
+
+
+def system_message(msg_id: int, buyer_id: int, buyer: str, order: str) -> dict:
+    """Возвращает системное сообщение FunPay об оплате заказа."""
+    body = (f'<div class="alert alert-with-icon alert-info" role="alert"><i class="fas fa-info-circle alert-icon"></i>'
+            f'Покупатель <a href="https://funpay.com/users/{buyer_id}/">{buyer}</a> оплатил заказ '
+            f'<a href="https://funpay.com/orders/{order}/">#{order}</a>. Telegram, Звёзды, 100 звёзд.<br>'
+            f'<a href="https://funpay.com/users/{ACCOUNT_ID}/">{ACCOUNT_USERNAME}</a>, не забудьте потом нажать кнопку '
+            f'«Подтвердить выполнение заказа».</div>')
+    return {"id": msg_id, "author": 0,
+            "html": _CHAT_MESSAGE.format(head=" chat-msg-with-head", msg_id=msg_id,
+                                         avatar='<div class="avatar-photo" style="background-image: '
+                                                'url(/img/layout/funpay.png);"></div>', author="FunPay",
+                                         label=' <span class="chat-msg-author-label label label-success">'
+                                               'оповещение</span>', body=body)}
+
+
+def chat_history(chat_index: int, messages: int = 50) -> tuple[str, int, str, list[dict]]:
+    """
+    Возвращает (ID чата, ID собеседника, никнейм собеседника, сообщения) для истории чата с покупателем:
+    обычные сообщения сторон, автоответы, сообщения поддержки и системные сообщения об оплате.
+    """
+    buyer_id, buyer = 2000000 + chat_index, f"Buyer{chat_index}"
+    chat_id = f"users-{ACCOUNT_ID}-{buyer_id}"
+    result = []
+    for n in range(messages):
+        msg_id = 100000 + chat_index * 1000 + n
+        kind = n % 10
+        if kind == 0:
+            result.append(system_message(msg_id, buyer_id, buyer, order_id(chat_index * 100 + n)))
+        elif kind == 3:
+            result.append(chat_message(msg_id, ACCOUNT_ID, ACCOUNT_USERNAME, "Спасибо за покупку!",
+                                       ' <span class="chat-msg-author-label label label-default">автоответ</span>'))
+        elif kind == 7:
+            result.append(chat_message(msg_id, 1, "Support", "Здравствуйте! Чем можем помочь?",
+                                       ' <span class="chat-msg-author-label label label-success">поддержка</span>'))
+        elif n % 2:
+            result.append(chat_message(msg_id, ACCOUNT_ID, ACCOUNT_USERNAME, f"Ответ продавца {n}<br>вторая строка"))
+        else:
+            result.append(chat_message(msg_id, buyer_id, buyer, f"Сообщение покупателя {n}"))
+    return chat_id, buyer_id, buyer, result
+
+
+_CONTACT_ITEM = """<a href="https://funpay.com/chat/?node={chat_id}" class="contact-item{unread}" data-id="{chat_id}" data-node-msg="{node_msg_id}" data-user-msg="{user_msg_id}">
+<div class="contact-item-photo"><div class="avatar-photo" style="background-image: url(/img/layout/avatar.png);"></div></div>
+<div class="media-user-name">{buyer}</div>
+<div class="contact-item-message">{text}</div>
+<div class="contact-item-time">12:34</div>
+</a>"""
+
+
+def contact_item(chat_id: int, buyer: str, node_msg_id: int, text: str, unread: bool = True) -> str:
+    """Возвращает виджет чата из списка чатов (chat_bookmarks)."""
+    return _CONTACT_ITEM.format(chat_id=chat_id, unread=" unread" if unread else "", node_msg_id=node_msg_id,
+                                user_msg_id=node_msg_id if not unread else node_msg_id - 1, buyer=buyer, text=text)
+
+
+def chat_bookmarks(items: list[str], tag: str = "00000000") -> dict:
+    """Возвращает объект chat_bookmarks из ответа https://funpay.com/runner/"""
+    return {"type": "chat_bookmarks", "id": ACCOUNT_ID, "tag": tag,
+            "data": {"html": f'<div class="contact-list custom-scroll">{"".join(items)}</div>'}}
+
+
+def chat_node(chat_id: int, buyer_id: int, messages: list[dict]) -> dict:
+    """Возвращает объект chat_node (историю чата) из ответа https://funpay.com/runner/"""
+    return {"type": "chat_node", "id": chat_id, "tag": "00000000",
+            "data": {"node": {"id": chat_id, "name": f"users-{ACCOUNT_ID}-{buyer_id}", "silent": False},
+                     "messages": messages}}
+
+
+def order_page_html(n: int = 0) -> str:
+    """Возвращает страницу заказа https://funpay.com/orders/<ID>/ (заказ n со страницы продаж, с отзывом)."""
+    buyer_id, buyer = 2000000 + n, f"Buyer{n}"
+    _, stars, amount = order_goods(n)
+    params = "".join(f'<div class="param-item"><h5>{name}</h5><div>{value}</div></div>'
+                     for name, value in (("Игра", "Telegram"), ("Количество звёзд", f"{stars} звёзд"),
+                                         ("Способ получения", "По username")))
+    body = f"""<div class="page-content">
+<h1 class="page-header">Заказ #{order_id(n)}</h1>
+<div class="row">
+<div class="col-md-8">
+<div class="param-item"><h5>Статус</h5><span class="text-success">Закрыт</span></div>
+{params}
+<div class="param-item"><h5>Категория</h5><div><a href="https://funpay.com/lots/2418/">Звёзды</a></div></div>
+<div class="param-item"><h5>Краткое описание</h5><div>{stars} звёзд, Telegram Username, {amount} шт.</div></div>
+<div class="param-item"><h5>Подробное описание</h5><div>Звёзды приходят на аккаунт в течение 5 минут.
+Укажите username без ошибок.</div></div>
+<div class="param-item"><h5>Количество</h5><div class="text-bold">{amount} шт.</div></div>
+<div class="param-item"><h5>Сумма</h5><div><span>{stars * amount * 1.7:.2f}</span> <strong>₽</strong></div></div>
+<div class="param-item"><h5>Открыт</h5><div>12 мая, 12:34</div></div>
+<div class="param-item"><h5>Закрыт</h5><div>12 мая, 12:40</div></div>
+<hr>
+<div class="param-item"><h5>Telegram Username</h5><div class="text-bold">@username{n}</div></div>
+<div class="param-item"><h5>Оплаченный товар</h5><div><span class="secret-placeholder">code-{n}-1</span>
+<span class="secret-placeholder">code-{n}-2</span></div></div>
+<div class="order-review">
+<div class="review-item-rating"><div class="rating"><div class="rating5"></div></div></div>
+<div class="review-item-text">Всё быстро, спасибо!</div>
+<div class="review-item-answer review-compiled-reply"><div>Спасибо за отзыв!</div></div>
+</div>
+</div>
+<div class="col-md-4">
+<div class="chat chat-float">
+<div class="chat-header">
+<div class="media media-user"><div class="media-body">
+<div class="media-user-name"><a href="https://funpay.com/users/{buyer_id}/">{buyer}</a></div>
+</div></div>
+</div>
+</div>
+</div>
+</div>
+</div>"""
+    return page(body, sales_active=True)
+
+
+def chat_history_json(chat_index: int, messages: int = 50) -> str:
+    """Возвращает ответ https://funpay.com/chat/history с историей чата с покупателем (см. chat_history)."""
+    chat_id, _, _, history = chat_history(chat_index, messages)
+    return json.dumps({"chat": {"node": {"id": chat_index, "name": chat_id, "silent": False},
+                                "messages": history}})
+
+
+def runner_chat_nodes(chats: int = 10, messages: int = 50) -> str:
+    """Возвращает ответ https://funpay.com/runner/ с историями нескольких чатов (Account.get_chats_histories)."""
+    objects = []
+    for i in range(chats):
+        _, buyer_id, _, history = chat_history(i, messages)
+        objects.append(chat_node(i, buyer_id, history))
+    return json.dumps({"objects": objects})
+
+
+def lot_page_html(lot_id: int) -> str:
+    """Возвращает страницу чужого лота https://funpay.com/lots/offer?id=<ID>"""
+    params = "".join(f'<div class="param-item"><h5>{name}</h5><div>{value}</div></div>'
+                     for name, value in (("Количество звёзд", "100 звёзд"), ("Способ получения", "По username")))
+    body = f"""<div class="page-content">
+<a href="https://funpay.com/lots/2418/" class="js-back-link">Звёзды</a>
+<div class="row">
+<div class="col-md-7">
+{params}
+<div class="param-item"><h5>Краткое описание</h5><div>⭐ 100 звёзд Telegram, моментально, лот {lot_id}</div></div>
+<div class="param-item"><h5>Подробное описание</h5><div>Звёзды приходят на аккаунт в течение 5 минут.
+После оплаты напишите username в чат.</div></div>
+<div class="param-item"><h5>Картинки</h5><div><a class="attachments-thumb" href="https://sfunpay.com/s/offer/1.jpg"></a></div></div>
+</div>
+<div class="col-md-5">
+<div class="chat-header">
+<div class="media media-user"><div class="media-body">
+<div class="media-user-name"><a href="https://funpay.com/users/3000001/">OtherSeller</a></div>
+</div></div>
+</div>
+</div>
+</div>
+</div>"""
+    return page(body)
+
+
+def offer_edit_html(lot_id: int) -> str:
+    """Возвращает страницу редактирования лота https://funpay.com/lots/offerEdit?offer=<ID>"""
+    body = f"""<div class="page-content">
+<form action="https://funpay.com/lots/offerSave" method="post" class="form-offer-editor">
+<input type="hidden" name="csrf_token" value="{CSRF_TOKEN}">
+<input type="hidden" name="form_created_at" value="1700000000">
+<input type="hidden" name="offer_id" value="{lot_id}">
+<input type="hidden" name="node_id" value="2418">
+<input type="hidden" name="location" value="">
+<input type="hidden" name="deleted" value="">
+<div class="form-group lot-field"><label>Количество звёзд</label>
+<select name="fields[type]" class="form-control"><option value="">Выберите</option>
+<option value="50">50 звёзд</option><option value="100" selected>100 звёзд</option></select></div>
+<div class="form-group hidden lot-field"><select name="fields[method]" class="form-control">
+<option value="1" selected>По username</option></select></div>
+<div class="form-group"><label>Краткое описание</label>
+<input type="text" name="fields[summary][ru]" class="form-control" value="⭐ 100 звёзд Telegram, моментально">
+<input type="text" name="fields[summary][en]" class="form-control" value="⭐ 100 Telegram stars, instant"></div>
+<div class="form-group"><label>Подробное описание</label>
+<textarea name="fields[desc][ru]" class="form-control">Звёзды приходят в течение 5 минут.</textarea>
+<textarea name="fields[desc][en]" class="form-control">Stars arrive within 5 minutes.</textarea></div>
+<div class="form-group"><label>Сообщение покупателю после оплаты</label>
+<textarea name="fields[payment_msg][ru]" class="form-control">Напишите username в чат.</textarea></div>
+<div class="form-group"><label>Цена</label>
+<div class="has-feedback"><input type="text" name="price" class="form-control" value="170">
+<span class="form-control-feedback">₽</span></div></div>
+<div class="form-group"><label>Наличие</label><input type="text" name="amount" class="form-control" value="1000"></div>
+<div class="form-group"><div class="checkbox"><label>
+<input type="checkbox" name="active" checked> Активное</label></div>
+<div class="checkbox"><label><input type="checkbox" name="auto_delivery"> Автовыдача</label></div></div>
+<table class="table-buyers-prices">
+<tr><th>Банковская карта РФ</th><td>182.75 ₽</td></tr>
+<tr><th>СБП</th><td>178.50 ₽</td></tr>
+<tr><th>Visa / MasterCard</th><td>2.10 $</td></tr>
+</table>
+</form>
+</div>"""
+    return page(body)
@@ -0,0 +1,138 @@
+"""
+Локальный HTTP-сервер, который заменяет Fragment API (https://api.fragment-api.com/v1) для bot.py.
+
+Реализует /auth/authenticate/, /misc/wallet/ и /order/stars/ с форматами ошибок, которые разбирает
+bot.parse_fragment_error: неверный username, неверное кол-во звезд и "Not enough funds" при исчерпании баланса.
+Можно задать задержку ответов и долю каждой ошибки (выбираются случайно, с фиксированным seed).
+bot.py направляется на сервер через FRAGMENT_API_URL.
+
+Запуск: python -m benchmarks.mock_fragment [--port 8081] [--balance 100000] [--latency 0.3]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+
+from benchmarks.mock_funpay import create_server
+
+TOKEN = "mock-fragment-token"
+USERNAME_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9_]{3,31}$")
+MIN_STARS = 50
+
+
+class MockFragment:
+    """
+    Эмулятор Fragment API.
+
+    :param balance: баланс (в звездах), который уменьшается при каждой отправке (:obj:`None` - бесконечный).
+    :param latency: задержка каждого ответа (в секундах).
+    :param jitter: случайная добавка к задержке (от 0 до jitter секунд).
+    :param errors: доли случайных ошибок отправки звезд {"username" / "quantity" / "funds": доля}.
+    :param seed: seed генератора случайных чисел.
+    """
+
+    def __init__(self, balance: int | None = None, latency: float = 0.0, jitter: float = 0.0,
+                 errors: dict[str, float] | None = None, seed: int = 0, host: str = "127.0.0.1", port: int = 0):
+        self.balance = balance
+        self.latency = latency
+        self.jitter = jitter
+        self.errors = errors or {}
+        self.random = random.Random(seed)
+        self.sent: list[tuple[float, str, int]] = []
+        """Успешные отправки: [(время (time.time()), username, кол-во звезд)]."""
+        self.rejected: list[tuple[str, str]] = []
+        """Отклоненные отправки: [(username, вид ошибки)]."""
+        self.__lock = threading.Lock()
+        self.httpd = create_server(self, host, port)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> MockFragment:
+        threading.Thread(target=self.httpd.serve_forever, name="mock-fragment", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def handle(self, method: str, path: str, query: dict, body: str, headers) -> tuple[int, str]:
+        """:return: (статус код, тело ответа)."""
+        with self.__lock:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+        time.sleep(delay)
+        if path == "auth/authenticate/" and method == "POST":
+            return 200, json.dumps({"token": TOKEN})
+        if headers.get("Authorization") != f"JWT {TOKEN}":
+            return 401, json.dumps({"detail": "Invalid token."})
+        if path == "misc/wallet/":
+            return 200, json.dumps({"balance": self.balance if self.balance is not None else 10 ** 9})
+        if path == "order/stars/" and method == "POST":
+            return self.__send_stars(json.loads(body or "{}"))
+        return 404, json.dumps({"detail": "Not found."})
+
+    def __send_stars(self, data: dict) -> tuple[int, str]:
+        username, quantity = data.get("username") or "", int(data.get("quantity") or 0)
+        with self.__lock:
+            roll, error = self.random.random(), None
+            for kind, share in self.errors.items():
+                if roll < share:
+                    error = kind
+                    break
+                roll -= share
+            if error is None and not USERNAME_RE.match(username):
+                error = "username"
+            elif error is None and quantity < MIN_STARS:
+                error = "quantity"
+            elif error is None and self.balance is not None and self.balance < quantity:
+                error = "funds"
+
+            if error is None:
+                if self.balance is not None:
+                    self.balance -= quantity
+                self.sent.append((time.time(), username, quantity))
+                return 200, json.dumps({"success": True, "id": f"mock-{len(self.sent)}", "receiver": username,
+                                        "goods_quantity": quantity})
+            self.rejected.append((username, error))
+        if error == "username":
+            return 400, json.dumps({"username": ["Invalid username."]})
+        if error == "quantity":
+            return 400, json.dumps({"quantity": [f"Ensure this value is greater than or equal to {MIN_STARS}."]})
+        return 400, json.dumps({"errors": [{"error": "Not enough funds for wallet"}]})
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.mock_fragment",
+                                         description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--port", type=int, default=8081)
+    arg_parser.add_argument("--balance", type=int, default=None, help="баланс в звездах (по умолчанию - бесконечный)")
+    arg_parser.add_argument("--latency", type=float, default=0.3, help="задержка ответа (в секундах)")
+    arg_parser.add_argument("--jitter", type=float, default=0.2, help="случайная добавка к задержке (в секундах)")
+    arg_parser.add_argument("--username-errors", type=float, default=0.0, help="доля ошибок username")
+    arg_parser.add_argument("--quantity-errors", type=float, default=0.0, help="доля ошибок кол-ва звезд")
+    arg_parser.add_argument("--funds-errors", type=float, default=0.0, help="доля ошибок Not enough funds")
+    args = arg_parser.parse_args()
+    errors = {"username": args.username_errors, "quantity": args.quantity_errors, "funds": args.funds_errors}
+    with MockFragment(args.balance, args.latency, args.jitter, errors, port=args.port) as mock:
+        print(f"Сервер запущен: FRAGMENT_API_URL={mock.url}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""
+Локальный HTTP-сервер, который заменяет funpay.com для нагрузочного тестирования Runner'а и bot.py.
+
+Сервер отдает обезличенные страницы из benchmarks.fixtures и реализует runner/ (события, счетчик чатов,
+истории чатов, отправка сообщений), orders/trade, orders/<ID>/, chat/history, lots/offerEdit, lots/offerSave
+и orders/refund.
+Новые заказы и сообщения покупателей появляются с заданной частотой (интервалы между ними - экспоненциальные,
+с фиксированным seed, поэтому сценарий воспроизводим). Можно добавить задержку ответов и долю ответов 429.
+
+Без --serve запускает Account + Runner.listen против сервера на --duration секунд и выводит задержку от
+появления заказа на сервере до NewOrderEvent и до получения заказа (Account.get_order), как в bot.py.
+С --serve только запускает сервер: bot.py можно направить на него через FUNPAY_BASE_URL.
+
+Запуск:
+    python -m benchmarks.mock_funpay [--orders 5] [--messages 2] [--errors 0.05] [--latency 0.05] [--duration 30]
+    python -m benchmarks.mock_funpay --serve --port 8080
+"""
+from __future__ import annotations
+
+import argparse
+import collections
+import http.server
+import json
+import random
+import threading
+import time
+import urllib.parse
+
+from benchmarks.fixtures import (ACCOUNT_ID, ACCOUNT_USERNAME, chat_bookmarks, chat_message, chat_node, contact_item,
+                                 homepage_html, offer_edit_html, order_id, order_page_html, page, sales_row,
+                                 system_message)
+
+PAID, CLOSED, REFUNDED = 0, 1, 2
+"""Статусы заказов (индексы fixtures._STATUSES)."""
+
+
+class MockFunPay:
+    """
+    Эмулятор funpay.com.
+
+    :param orders_per_second: средняя частота новых заказов.
+    :param messages_per_second: средняя частота новых сообщений покупателей в существующих чатах.
+    :param error_rate: доля запросов, на которые сервер отвечает 429.
+    :param latency: задержка каждого ответа (в секундах).
+    :param jitter: случайная добавка к задержке (от 0 до jitter секунд).
+    :param history: кол-во закрытых заказов (и чатов с их покупателями) на момент запуска.
+    :param seed: seed генератора случайных чисел.
+    :param max_runner_objects: макс. кол-во объектов в запросе runner/: на остальные объекты сервер не отвечает
+        (:obj:`None` - без ограничения).
+    """
+
+    MAX_ROWS = 100
+    """Кол-во заказов на странице orders/trade."""
+    MAX_CHATS = 50
+    """Кол-во чатов в списке чатов."""
+
+    def __init__(self, orders_per_second: float = 1.0, messages_per_second: float = 0.0, error_rate: float = 0.0,
+                 latency: float = 0.0, jitter: float = 0.0, history: int = 50, seed: int = 0,
+                 host: str = "127.0.0.1", port: int = 0, max_runner_objects: int | None = None):
+        self.orders_per_second = orders_per_second
+        self.messages_per_second = messages_per_second
+        self.error_rate = error_rate
+        self.latency = latency
+        self.jitter = jitter
+        self.max_runner_objects = max_runner_objects
+        self.random = random.Random(seed)
+        self.hits: collections.Counter[str] = collections.Counter()
+        """Кол-во запросов по путям."""
+        self.errors = 0
+        """Кол-во ответов 429."""
+        self.created: dict[str, float] = {}
+        """{ID заказа: время (time.time()) появления на сервере}"""
+        self.refunded: set[str] = set()
+        self.written: dict[int, float] = {}
+        """{ID сообщения: время (time.time()) появления на сервере}"""
+        self.saved_lots: dict[int, dict] = {}
+        """{ID лота: поля последнего сохранения (lots/offerSave)}"""
+
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__orders: list[list[int]] = []  # [[номер заказа, статус]], первый - самый новый
+        self.__numbers: dict[str, int] = {}  # {ID заказа: номер заказа}
+        self.__chats: dict[int, list[dict]] = {}  # {номер покупателя: сообщения}, последний - самый новый
+        self.__msg_id = 10 ** 6
+        self.__order_tag = self.__chat_tag = 0
+        for n in range(history):
+            self.__add_order(n, CLOSED)
+            self.__write(n, f"Сообщение покупателя {n}")
+
+        self.httpd = create_server(self, host, port)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> MockFunPay:
+        threading.Thread(target=self.httpd.serve_forever, name="mock-funpay", daemon=True).start()
+        threading.Thread(target=self.__script, name="mock-funpay-script", daemon=True).start()
+        return self
+
+    def stop_script(self):
+        """Прекращает создание новых заказов и сообщений (сервер продолжает отвечать на запросы)."""
+        self.__stop.set()
+
+    def stop(self):
+        self.stop_script()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def new_order(self) -> str:
+        """Создает оплаченный заказ: покупатель оплачивает его и пишет username в чат. :return: ID заказа."""
+        with self.__lock:
+            n = len(self.__numbers)
+            self.__add_order(n, PAID)
+            self.__write(n, None)
+            self.__write(n, f"Здравствуйте! Мой ник @username{n}")
+            return order_id(n)
+
+    def new_message(self, n: int | None = None) -> int:
+        """
+        Добавляет сообщение покупателя n (None - в случайный из последних чатов).
+
+        :return: номер покупателя.
+        """
+        with self.__lock:
+            if n is None:
+                n = self.random.choice(list(self.__chats)[-self.MAX_CHATS:])
+            self.__write(n, f"Сообщение {self.__msg_id}")
+            return n
+
+    def __script(self):
+        """Создает заказы и сообщения с заданной частотой, пока сервер не остановлен."""
+        start = time.time()
+        next_order = start + self.random.expovariate(self.orders_per_second) if self.orders_per_second else None
+        next_message = start + self.random.expovariate(self.messages_per_second) \
+            if self.messages_per_second else None
+        while True:
+            now = time.time()
+            if next_order is not None and next_order <= now:
+                self.new_order()
+                next_order += self.random.expovariate(self.orders_per_second)
+            if next_message is not None and next_message <= now:
+                self.new_message()
+                next_message += self.random.expovariate(self.messages_per_second)
+            wait = min((i for i in (next_order, next_message) if i is not None), default=now + 1) - time.time()
+            if self.__stop.wait(max(wait, 0)):
+                return
+
+    def __add_order(self, n: int, status: int):
+        self.__orders.insert(0, [n, status])
+        del self.__orders[self.MAX_ROWS:]
+        self.__numbers[order_id(n)] = n
+        self.created[order_id(n)] = time.time()
+        self.__order_tag += 1
+
+    def __write(self, n: int, text: str | None, by_seller: bool = False) -> dict:
+        """Добавляет сообщение в чат с покупателем n (text=None - системное сообщение об оплате заказа n)."""
+        buyer_id, buyer = 2000000 + n, f"Buyer{n}"
+        self.__msg_id += 1
+        if by_seller:
+            message = chat_message(self.__msg_id, ACCOUNT_ID, ACCOUNT_USERNAME, text)
+        elif text is None:
+            message = system_message(self.__msg_id, buyer_id, buyer, order_id(n))
+        else:
+            message = chat_message(self.__msg_id, buyer_id, buyer, text)
+        self.written[self.__msg_id] = time.time()
+        messages = self.__chats.pop(n, [])
+        messages.append(message)
+        self.__chats[n] = messages[-20:]
+        self.__chat_tag += 1
+        return message
+
+    @staticmethod
+    def __buyer(node: int | str) -> int:
+        """:return: номер покупателя по ID чата (10000000 + n) или его названию (users-<ID>-<ID покупателя>)."""
+        if isinstance(node, str) and node.startswith("users-"):
+            return max(map(int, node.split("-")[1:])) - 2000000
+        return int(node) - 10 ** 7
+
+    def handle(self, method: str, path: str, query: dict, body: str, headers) -> tuple[int, str]:
+        """:return: (статус код, тело ответа)."""
+        form = {k: v[0] for k, v in urllib.parse.parse_qs(body, keep_blank_values=True).items()}
+        self.hits["orders/<ID>/" if path.startswith("orders/") and path.count("/") == 2 else path] += 1
+        if self.latency or self.jitter:
+            time.sleep(self.latency + self.random.uniform(0, self.jitter))
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return 429, "Too Many Requests"
+
+        with self.__lock:
+            if path == "":
+                return 200, homepage_html()
+            elif path == "orders/trade":
+                rows = "".join(sales_row(n, status) for n, status in self.__orders)
+                return 200, page(f'<div class="page-content"><div class="tc table-hover table-clickable tc-selling">'
+                                 f'{rows}</div></div>')
+            elif path.startswith("orders/") and path.count("/") == 2 and path[7:-1] in self.__numbers:
+                return 200, order_page_html(self.__numbers[path[7:-1]])
+            elif path == "chat/history":
+                n = self.__buyer(query["node"])
+                return 200, json.dumps({"chat": {"node": {"id": 10 ** 7 + n, "silent": False,
+                                                          "name": f"users-{ACCOUNT_ID}-{2000000 + n}"},
+                                                 "messages": self.__chats.get(n, [])}})
+            elif path == "runner/":
+                return 200, json.dumps(self.__runner(form))
+            elif path == "lots/offerEdit":
+                return 200, offer_edit_html(int(query["offer"]))
+            elif path == "lots/offerSave":
+                self.saved_lots[int(form["offer_id"])] = form
+                return 200, json.dumps({"done": True})
+            elif path == "orders/refund":
+                for order in self.__orders:
+                    if order_id(order[0]) == form["id"]:
+                        order[1] = REFUNDED
+                        self.refunded.add(form["id"])
+                        self.__order_tag += 1
+                        return 200, json.dumps({"error": False})
+                return 200, json.dumps({"error": True, "msg": "Заказ не найден."})
+        return 404, "Not Found"
+
+    def __runner(self, form: dict) -> dict:
+        result = {"objects": [], "response": False}
+        request = form.get("request") not in (None, "", "False", "false")
+        if request:
+            request = json.loads(form["request"])
+            n = self.__buyer(request["data"]["node"])
+            message = self.__write(n, request["data"]["content"], by_seller=True)
+            result["response"] = {"error": None}
+            result["objects"].append(chat_node(10 ** 7 + n, 2000000 + n, [message]))
+        for obj in json.loads(form.get("objects") or "[]")[:self.max_runner_objects]:
+            if obj["type"] == "orders_counters" and obj["tag"] != f"orders-{self.__order_tag}":
+                paid = sum(status == PAID for _, status in self.__orders)
+                result["objects"].append({"type": "orders_counters", "id": ACCOUNT_ID,
+                                          "tag": f"orders-{self.__order_tag}", "data": {"buyer": 0, "seller": paid}})
+            elif obj["type"] == "chat_bookmarks" and obj["tag"] != f"chats-{self.__chat_tag}":
+                items = [contact_item(10 ** 7 + n, f"Buyer{n}", messages[-1]["id"], "...")
+                         for n, messages in reversed(list(self.__chats.items())[-self.MAX_CHATS:])]
+                result["objects"].append(chat_bookmarks(items, tag=f"chats-{self.__chat_tag}"))
+            elif obj["type"] == "chat_counter" and obj["tag"] != f"counter-{self.__chat_tag}":
+                last_message = max((messages[-1]["id"] for messages in self.__chats.values()), default=0)
+                result["objects"].append({"type": "chat_counter", "id": ACCOUNT_ID, "tag": f"counter-{self.__chat_tag}",
+                                          "data": {"counter": len(self.__chats), "message": last_message}})
+            elif obj["type"] == "chat_node" and not request:
+                n = self.__buyer(obj["id"])
+                result["objects"].append(chat_node(obj["id"], 2000000 + n, self.__chats.get(n, [])))
+        return result
+
+
+class MockHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Обработчик запросов тестовых серверов: передает запрос в server.mock.handle(метод, путь без "/" в начале,
+    параметры запроса, тело запроса, заголовки) и отправляет возвращенные (статус код, тело ответа).
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.__respond()
+
+    def do_POST(self):
+        self.__respond()
+
+    def __respond(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+        url = urllib.parse.urlsplit(self.path)
+        query = {k: v[0] for k, v in urllib.parse.parse_qs(url.query).items()}
+        status, body = self.server.mock.handle(self.command, url.path.lstrip("/"), query, body, self.headers)
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json" if body.startswith("{") else "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(mock, host: str = "127.0.0.1", port: int = 0) -> http.server.ThreadingHTTPServer:
+    """Создает многопоточный HTTP-сервер, который передает запросы в mock.handle (см. MockHandler)."""
+    httpd = http.server.ThreadingHTTPServer((host, port), MockHandler)
+    httpd.daemon_threads = True
+    httpd.mock = mock
+    return httpd
+
+
+def run_load(mock: MockFunPay, duration: float, requests_delay: float, drain: float = 10.0,
+             rate_limit: bool = True) -> dict:
+    """
+    Запускает Runner.listen против mock на duration секунд и замеряет задержку заказов.
+
+    :return: {"stats": metrics.LatencyStats, "created": кол-во созданных заказов, "seen": кол-во полученных,
+        "failed": кол-во заказов, которые не удалось получить (Account.get_order)}.
+    """
+    from FunPayAPI import Account
+    from FunPayAPI.common import exceptions
+    from FunPayAPI.common.enums import HTMLRetentionModes
+    from FunPayAPI.common.ratelimit import RateLimiter
+    from FunPayAPI.updater.events import NewOrderEvent
+    from FunPayAPI.updater.runner import Runner
+    from metrics import LatencyStats
+
+    account = Account("0" * 32, base_url=mock.url, sales_parser="lxml", html_retention=HTMLRetentionModes.NEVER,
+                      rate_limiter=None if rate_limit else RateLimiter(enabled=False))
+    while not account.is_initiated:
+        try:
+            account.get()
+        except exceptions.RequestFailedError:  # 429
+            time.sleep(1)
+    runner = Runner(account, incremental_orders=True)
+    stats, seen, failed = LatencyStats(window=10 ** 6), set(), set()
+    initial = set(mock.created)
+
+    def listen():
+        for event in runner.listen(requests_delay=requests_delay):
+            if isinstance(event, NewOrderEvent) and event.order.id not in initial:
+                stats.add("NewOrderEvent", time.time() - mock.created[event.order.id])
+                seen.add(event.order.id)
+                try:
+                    account.get_order(event.order.id)
+                except exceptions.RequestFailedError:  # bot.py пропускает такой заказ
+                    failed.add(event.order.id)
+                    continue
+                stats.add("get_order", time.time() - mock.created[event.order.id])
+
+    threading.Thread(target=listen, name="runner", daemon=True).start()
+    time.sleep(duration)
+    mock.stop_script()
+    created = set(mock.created) - initial
+    deadline = time.time() + drain
+    while not created <= seen and time.time() < deadline:
+        time.sleep(0.1)
+    return {"stats": stats, "created": len(created), "seen": len(created & seen), "failed": len(failed)}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.mock_funpay", description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--orders", type=float, default=2.0, help="новых заказов в секунду")
+    arg_parser.add_argument("--messages", type=float, default=2.0, help="новых сообщений в секунду")
+    arg_parser.add_argument("--errors", type=float, default=0.0, help="доля ответов 429")
+    arg_parser.add_argument("--latency", type=float, default=0.02, help="задержка ответа (в секундах)")
+    arg_parser.add_argument("--jitter", type=float, default=0.02, help="случайная добавка к задержке (в секундах)")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--duration", type=float, default=20.0, help="длительность нагрузки (в секундах)")
+    arg_parser.add_argument("--delay", type=float, default=1.0, help="задержка между запросами Runner'а")
+    arg_parser.add_argument("--no-rate-limit", action="store_true", help="отключить RateLimiter аккаунта")
+    arg_parser.add_argument("--serve", action="store_true", help="только запустить сервер")
+    arg_parser.add_argument("--port", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    mock = MockFunPay(args.orders, args.messages, args.errors, args.latency, args.jitter, seed=args.seed,
+                      port=args.port)
+    with mock:
+        if args.serve:
+            print(f"Сервер запущен: FUNPAY_BASE_URL={mock.url}")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                return
+
+        result = run_load(mock, args.duration, args.delay, rate_limit=not args.no_rate_limit)
+    print(f"{args.orders} заказов/с, {args.messages} сообщений/с, 429: {args.errors:.0%}, задержка ответа "
+          f"{args.latency * 1000:.0f}+{args.jitter * 1000:.0f} мс, пауза Runner'а {args.delay} с")
+    hits = ", ".join(f"{path or '/'}: {count}" for path, count in mock.hits.most_common())
+    print(f"заказов: {result['created']}, получено: {result['seen']}, ошибок get_order: {result['failed']}")
+    print(f"запросов: {sum(mock.hits.values())} ({hits}), ответов 429: {mock.errors}")
+    print(f"{'от появления заказа до':<24}{'p50, мс':>9}{'p95, мс':>9}{'p99, мс':>9}{'max, мс':>9}")
+    for name, s in result["stats"].summary().items():
+        print(f"{name:<24}{s['p50'] * 1000:>9.0f}{s['p95'] * 1000:>9.0f}{s['p99'] * 1000:>9.0f}"
+              f"{s['max'] * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Набор офлайн-бенчмарков парсеров FunPayAPI на обезличенных страницах FunPay (benchmarks.fixtures).
+
+Для каждого замера выводит кол-во операций в секунду (лучший из ROUNDS раундов) и пиковую память,
+выделяемую за одну операцию (tracemalloc). Сеть не используется: ответы отдает FixtureAdapter.
+
+Запуск:
+    python -m benchmarks.suite                              # все замеры
+    python -m benchmarks.suite -k get_sales                 # замеры, в названии которых есть подстрока
+    python -m benchmarks.suite --save baseline.json         # сохранить результаты как эталон
+    python -m benchmarks.suite --compare baseline.json      # сравнить с эталоном
+
+При --compare код выхода равен 1, если кол-во операций в секунду упало или пиковая память выросла больше,
+чем на --tolerance (по умолчанию 25%), поэтому набор можно использовать как проверку перед слиянием.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from FunPayAPI.common.ratelimit import RateLimiter
+from FunPayAPI.updater.runner import Runner
+from benchmarks.fixtures import (ACCOUNT_ID, chat_bookmarks, chat_history, chat_history_json, contact_item,
+                                 homepage_html, lot_page_html, offer_edit_html, offline_account, order_page_html,
+                                 runner_chat_nodes, sales_page_html)
+
+ROUNDS = 3
+MIN_TIME = 0.3
+"""Мин. длительность одного раунда (в секундах)."""
+MIN_RUNS = 3
+"""Мин. кол-во операций в раунде."""
+
+CASES: dict[str, Callable[[], Callable[[], Any]]] = {}
+"""{название замера: функция, которая готовит данные и возвращает измеряемую операцию}"""
+
+
+def case(name: str):
+    def decorator(setup: Callable[[], Callable[[], Any]]):
+        CASES[name] = setup
+        return setup
+    return decorator
+
+
+def account(routes: dict | None = None, **kwargs):
+    return offline_account(routes, rate_limiter=RateLimiter(enabled=False), **kwargs)
+
+
+@case("__setup_categories (700 игр)")
+def setup_categories():
+    acc, html = account(), homepage_html(700)
+    return lambda: acc._Account__setup_categories(html)
+
+
+for _rows in (1, 50, 500):
+    for _backend in ("bs4", "lxml"):
+        @case(f"get_sales ({_rows} заказов, {_backend})")
+        def get_sales(rows=_rows, backend=_backend):
+            return account({"orders/trade": sales_page_html(rows)}, sales_parser=backend).get_sales
+
+
+@case("get_order")
+def get_order():
+    acc = account({"orders/ABCD1234/": order_page_html(0)})
+    return lambda: acc.get_order("ABCD1234", use_cache=False)
+
+
+@case("__parse_messages (50 сообщений)")
+def parse_messages():
+    acc = account()
+    chat_id, buyer_id, buyer, messages = chat_history(1, 50)
+    return lambda: acc._Account__parse_messages(messages, chat_id, buyer_id, buyer)
+
+
+@case("get_chat_history (50 сообщений)")
+def get_chat_history():
+    acc = account({"chat/history": chat_history_json(1, 50)})
+    return lambda: acc.get_chat_history(f"users-{ACCOUNT_ID}-2000001", interlocutor_username="Buyer1")
+
+
+@case("get_chats_histories (10 чатов x 50)")
+def get_chats_histories():
+    acc = account({"runner/": runner_chat_nodes(10, 50)})
+    chats = {i: f"Buyer{i}" for i in range(10)}
+    return lambda: acc.get_chats_histories(chats)
+
+
+@case("parse_chat_updates (50 чатов)")
+def parse_chat_updates():
+    runner = Runner(account(), disable_message_requests=True)
+    # два состояния списка чатов, в которых изменились все чаты: каждый вызов обрабатывает 50 изменений
+    updates = [chat_bookmarks([contact_item(10 ** 7 + i, f"Buyer{i}", 10 ** 6 + i * 10 + k, f"Сообщение {k}")
+                               for i in range(50)], tag=f"tag{k}") for k in range(2)]
+    runner.parse_chat_updates(updates[0])
+    calls = [0]
+
+    def run():
+        calls[0] += 1
+        return runner.parse_chat_updates(updates[calls[0] % 2])
+    return run
+
+
+@case("get_lot_page")
+def get_lot_page():
+    acc = account({"lots/offer": lot_page_html(5)})
+    return lambda: acc.get_lot_page(5)
+
+
+@case("get_lot_fields")
+def get_lot_fields():
+    acc = account({"lots/offerEdit": offer_edit_html(5)})
+    return lambda: acc.get_lot_fields(5)
+
+
+def measure(func: Callable[[], Any]) -> dict[str, float]:
+    """:return: {"ops": операций в секунду, "peak_kb": пиковая память за операцию (КБ)}."""
+    func()  # прогрев
+    best = 0.0
+    for _ in range(ROUNDS):
+        runs, start = 0, time.perf_counter()
+        while (elapsed := time.perf_counter() - start) < MIN_TIME or runs < MIN_RUNS:
+            func()
+            runs += 1
+        best = max(best, runs / elapsed)
+    gc.collect()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ops": best, "peak_kb": peak / 1024}
+
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]],
+            tolerance: float) -> list[str]:
+    """:return: список регрессий."""
+    regressions = []
+    for name, result in results.items():
+        if not (base := baseline.get(name)):
+            continue
+        if result["ops"] < base["ops"] * (1 - tolerance):
+            regressions.append(f"{name}: {base['ops']:.1f} -> {result['ops']:.1f} оп/с")
+        if result["peak_kb"] > base["peak_kb"] * (1 + tolerance):
+            regressions.append(f"{name}: {base['peak_kb']:.0f} -> {result['peak_kb']:.0f} КБ")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("-k", dest="filter", default="", help="запускать только замеры с подстрокой")
+    arg_parser.add_argument("--save", metavar="FILE", help="сохранить результаты в JSON-файл")
+    arg_parser.add_argument("--compare", metavar="FILE", help="сравнить с результатами из JSON-файла")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25, help="допустимое ухудшение (доля)")
+    args = arg_parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["cases"]
+
+    results = {}
+    print(f"{'замер':<40}{'оп/с':>12}{'пик, КБ':>10}" + (f"{'эталон, оп/с':>15}{'изм.':>8}" if baseline else ""))
+    for name, setup in CASES.items():
+        if args.filter not in name:
+            continue
+        results[name] = result = measure(setup())
+        line = f"{name:<40}{result['ops']:>12.1f}{result['peak_kb']:>10.0f}"
+        if base := baseline.get(name):
+            line += f"{base['ops']:>15.1f}{(result['ops'] / base['ops'] - 1) * 100:>+7.0f}%"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "cases": results}, f, ensure_ascii=False, indent=2)
+    if regressions := compare(results, baseline, args.tolerance):
+        print(f"\nРегрессии (допуск {args.tolerance:.0%}):")
+        print("\n".join(f"  {i}" for i in regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
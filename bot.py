@@ -2,15 +2,20 @@ import os
 import logging
 import time
 import json
-import re
-import requests
-import telebot
 from dotenv import load_dotenv
 from FunPayAPI import Account, types  # Добавляем types
+from FunPayAPI.common import storage
+from FunPayAPI.common.ratelimit import RateLimiter
+from FunPayAPI.common.enums import HTMLRetentionModes
 from FunPayAPI.updater.runner import Runner
-from FunPayAPI.updater.events import NewOrderEvent, NewMessageEvent
-from queue import Queue  # Импортируем очередь
-import threading  # Для потока обработки очереди
+from FunPayAPI.updater.scheduler import AdaptiveScheduler
+from FunPayAPI.updater.events import NewOrderEvent, NewMessageEvent, OrderStatusChangedEvent
+from durable_queue import DELIVERED, DurableOrderQueue
+from fragment_client import FragmentClient
+from metrics import LatencyStats
+from order_fields import ExtractionRule, OrderFieldExtractor
+import threading  # Для потоков обработки очереди
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
@@ -20,28 +25,84 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_USER_ID = os.getenv("TELEGRAM_USER_ID")
 LOT_ID_TO_DEACTIVATE = os.getenv("LOT_ID_TO_DEACTIVATE")
 
-bot = telebot.TeleBot(TELEGRAM_BOT_TOKEN)
+_bot = None  # Telegram бот создается при первом обращении (get_bot), чтобы импорт модуля не загружал telebot
+_bot_lock = threading.Lock()
 
 # Логгирование
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-COOLDOWN_SECONDS = 1
+# Кол-во параллельных обработчиков заказов. Двух хватает, чтобы упереться в лимит отправки сообщений
+# (FUNPAY_CHAT_SEND_RATE / 2 заказов в секунду); больше имеет смысл только вместе с FUNPAY_CHAT_SEND_RATE.
+ORDER_WORKERS = int(os.getenv("ORDER_WORKERS", "2"))
+FRAGMENT_CONCURRENCY = int(os.getenv("FRAGMENT_CONCURRENCY", "2"))  # Макс. одновременных запросов к Fragment
+ORDER_PREFETCH = int(os.getenv("ORDER_PREFETCH", "4"))  # Макс. одновременных загрузок новых заказов (get_order)
+# Брать username из сообщения покупателя (@username) вместо загрузки страницы заказа
+ORDER_USERNAME_FROM_CHAT = os.getenv("ORDER_USERNAME_FROM_CHAT", "0") == "1"
+POLL_MIN_DELAY = float(os.getenv("POLL_MIN_DELAY", "1.0"))
+POLL_MAX_DELAY = float(os.getenv("POLL_MAX_DELAY", "6.0"))
+# Если > 0: при каждом опросе запрашиваются только заказы и счетчик чатов, список чатов - раз в N секунд
+# или после новых сообщений (Runner.orders_fast_lane)
+RUNNER_CHATS_INTERVAL = float(os.getenv("RUNNER_CHATS_INTERVAL", "0"))
+# Лимиты запросов к FunPay (в секунду). После 429 ошибки / ошибки флуда RateLimiter снижает их сам.
+# Каждый выполненный заказ - 2 сообщения покупателю, поэтому заказы выполняются не быстрее
+# FUNPAY_CHAT_SEND_RATE / 2 в секунду, сколько бы ни было ORDER_WORKERS.
+FUNPAY_TOTAL_RATE = float(os.getenv("FUNPAY_TOTAL_RATE", "10"))
+FUNPAY_CHAT_SEND_RATE = float(os.getenv("FUNPAY_CHAT_SEND_RATE", "5"))
+STATE_LIMIT = int(os.getenv("STATE_LIMIT", "2000"))  # Сколько чатов / заказов FunPay хранить в памяти
 TOKEN_FILE = "auth_token.json"
-FRAGMENT_API_URL = "https://api.fragment-api.com/v1"
+ORDERS_DB = os.getenv("ORDERS_DB", "orders.db")
+STATE_FILE = os.getenv("STATE_FILE", "funpay_state.json")  # Состояние FunPay для быстрого перезапуска
+STATE_SAVE_INTERVAL = float(os.getenv("STATE_SAVE_INTERVAL", "30"))
+STATE_MAX_AGE = float(os.getenv("STATE_MAX_AGE", "3600"))  # Более старое состояние не загружается
+CATEGORIES_CACHE = os.getenv("CATEGORIES_CACHE", "funpay_categories.json")  # Кэш каталога игр FunPay
+FUNPAY_BASE_URL = os.getenv("FUNPAY_BASE_URL", "https://funpay.com")  # Адрес FunPay (или тестового сервера)
+FRAGMENT_API_URL = os.getenv("FRAGMENT_API_URL", "https://api.fragment-api.com/v1")
 
 # Fragment auth
-FRAGMENT_TOKEN = None
 FRAGMENT_API_KEY = os.getenv("FRAGMENT_API_KEY")
 FRAGMENT_PHONE = os.getenv("FRAGMENT_PHONE")
 FRAGMENT_MNEMONICS = os.getenv("FRAGMENT_MNEMONICS")
+fragment = None  # FragmentClient, создается в init_order_processing()
 
-# Очередь для обработки заказов (FIFO)
-order_queue = Queue()
+# Персистентная очередь для обработки заказов (FIFO), открывается в init_order_processing()
+order_queue = None
+
+# Адаптивный интервал опроса FunPay
+scheduler = AdaptiveScheduler(min_delay=POLL_MIN_DELAY, max_delay=POLL_MAX_DELAY)
+
+# Ограничение одновременных запросов к Fragment (общее для всех обработчиков)
+fragment_semaphore = threading.BoundedSemaphore(FRAGMENT_CONCURRENCY)
+
+# Время этапов обработки заказов
+stage_timings = LatencyStats()
+
+# Загрузка новых заказов (get_order) в фоне, чтобы цикл Runner'а не ждал страницы заказов
+order_prefetch = ThreadPoolExecutor(max_workers=ORDER_PREFETCH, thread_name_prefix="order-prefetch")
+_prefetching = set()  # ID заказов, которые загружаются
+_prefetch_refunded = set()  # ID заказов, возвращенных во время загрузки
+_prefetch_lock = threading.Lock()
+
+# Данные заказа (username, кол-во звезд) берутся из списка продаж / чата, страница заказа - только при нехватке
+order_fields = OrderFieldExtractor([ExtractionRule("Звёзды Telegram", username_from_chat=ORDER_USERNAME_FROM_CHAT)],
+                                   max_buyers=STATE_LIMIT)
 
 
 # --- Вспомогательные функции ---
 
+def create_rate_limiter():
+    """Создает ограничитель частоты запросов к FunPay с лимитами FUNPAY_TOTAL_RATE / FUNPAY_CHAT_SEND_RATE."""
+    return RateLimiter({"total": (FUNPAY_TOTAL_RATE, max(1, int(FUNPAY_TOTAL_RATE))),
+                        "chat_send": (FUNPAY_CHAT_SEND_RATE, max(1, int(FUNPAY_CHAT_SEND_RATE)))})
+
+
+def init_order_processing():
+    """Создает клиент Fragment и открывает очередь заказов (ORDERS_DB). Вызывается при запуске бота."""
+    global fragment, order_queue
+    fragment = FragmentClient(FRAGMENT_API_URL, FRAGMENT_API_KEY, FRAGMENT_PHONE, FRAGMENT_MNEMONICS, TOKEN_FILE)
+    order_queue = DurableOrderQueue(ORDERS_DB)
+
+
 def clean_username(username):
     """Очищает username от лишних символов @"""
     if username:
@@ -52,93 +113,52 @@ def clean_username(username):
 def send_telegram_notification(message):
     """Отправляет уведомление в Telegram"""
     try:
-        bot.send_message(TELEGRAM_USER_ID, message, parse_mode='HTML')
+        get_bot().send_message(TELEGRAM_USER_ID, message, parse_mode='HTML')
     except Exception as e:
         logger.error(f"❌ Ошибка отправки в Telegram: {e}")
 
 
 def get_fragment_balance():
     """Получает баланс Fragment"""
-    global FRAGMENT_TOKEN
-    url = f"{FRAGMENT_API_URL}/misc/wallet/"
-    headers = {
-        "Accept": "application/json",
-        "Authorization": f"JWT {FRAGMENT_TOKEN}"
-    }
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("balance", 0)
-        else:
-            logger.error(f"❌ Ошибка получения баланса: {response.text}")
-            return 0
+        success, result = fragment.get_balance()
+        if success:
+            return result
+        logger.error(f"❌ Ошибка получения баланса: {result}")
+        return 0
     except Exception as e:
         logger.error(f"❌ Исключение при получении баланса: {e}")
         return 0
 
 
-def load_fragment_token():
-    if os.path.exists(TOKEN_FILE):
-        with open(TOKEN_FILE, "r") as f:
-            return json.load(f).get("token")
-    return None
-
-
-def save_fragment_token(token):
-    with open(TOKEN_FILE, "w") as f:
-        json.dump({"token": token}, f)
-
-
 def authenticate_fragment():
-    global FRAGMENT_TOKEN
-    FRAGMENT_TOKEN = load_fragment_token()
-    if FRAGMENT_TOKEN:
-        logger.info("✅ Токен Fragment загружен из файла.")
-        return FRAGMENT_TOKEN
-
+    """Загружает сохраненный токен Fragment или авторизуется заново. Возвращает токен или None."""
     try:
-        mnemonics_list = FRAGMENT_MNEMONICS.strip().split()
-        payload = {
-            "api_key": FRAGMENT_API_KEY,
-            "phone_number": FRAGMENT_PHONE,
-            "mnemonics": mnemonics_list,
-            "version": "V4R2"
-        }
-        res = requests.post(f"{FRAGMENT_API_URL}/auth/authenticate/", json=payload)
-        if res.status_code == 200:
-            token = res.json().get("token")
-            save_fragment_token(token)
-            logger.info("✅ Успешная авторизация Fragment.")
-
-            # Отправляем уведомление о запуске
-            balance = get_fragment_balance()
-            send_telegram_notification(
-                f"🤖 <b>Бот запущен!</b>\n"
-                f"✅ Успешная авторизация Fragment\n"
-                f"💰 Текущий баланс: <b>{balance} TON</b>"
-            )
+        token, fresh = fragment.authenticate()
+        if not token:
+            return None
+        if not fresh:
+            logger.info("✅ Токен Fragment загружен из файла.")
             return token
-        logger.error(f"❌ Ошибка авторизации Fragment: {res.text}")
-        return None
+
+        logger.info("✅ Успешная авторизация Fragment.")
+        # Отправляем уведомление о запуске
+        balance = get_fragment_balance()
+        send_telegram_notification(
+            f"🤖 <b>Бот запущен!</b>\n"
+            f"✅ Успешная авторизация Fragment\n"
+            f"💰 Текущий баланс: <b>{balance} TON</b>"
+        )
+        return token
     except Exception as e:
         logger.error(f"❌ Исключение при авторизации Fragment: {e}")
         return None
 
 
-def direct_send_stars(token, username, quantity):
+def direct_send_stars(username, quantity):
     """Отправляет звезды через Fragment API"""
     try:
-        clean_user = clean_username(username)
-        data = {"username": clean_user, "quantity": quantity, "show_sender": "false"}
-        headers = {
-            "Authorization": f"JWT {token}",
-            "Content-Type": "application/json"
-        }
-        res = requests.post(f"{FRAGMENT_API_URL}/order/stars/", json=data, headers=headers)
-        if res.status_code == 200:
-            return True, res.text
-        return False, res.text
+        return fragment.send_stars(clean_username(username), quantity)
     except Exception as e:
         return False, str(e)
 
@@ -207,44 +227,68 @@ def process_order(account, chat_id, username, stars, order_id, quantity_multipli
     """
     Обрабатывает заказ, отправляет звезды через Fragment API.
     """
-    global FRAGMENT_TOKEN
     clean_user = clean_username(username)
     total_stars = stars * quantity_multiplier
 
     # Уведомление в Telegram о новом заказе
-    send_telegram_notification(
-        f"🛒 <b>НОВЫЙ ЗАКАЗ</b>\n"
-        f"📋 ID: <code>{order_id}</code>\n"
-        f"👤 Покупатель: @{clean_user}\n"
-        f"⭐ Звезд: <b>{total_stars} ⭐</b>\n"
-        f"💬 Чат: https://funpay.com/orders/{order_id}/\n"
-        f"⏳ Обрабатывается..."
-    )
+    with stage_timings.measure("telegram"):
+        send_telegram_notification(
+            f"🛒 <b>НОВЫЙ ЗАКАЗ</b>\n"
+            f"📋 ID: <code>{order_id}</code>\n"
+            f"👤 Покупатель: @{clean_user}\n"
+            f"⭐ Звезд: <b>{total_stars} ⭐</b>\n"
+            f"💬 Чат: https://funpay.com/orders/{order_id}/\n"
+            f"⏳ Обрабатывается..."
+        )
 
     # Отправляем подтверждение покупателю
-    account.send_message(chat_id, f"✅ Заказ принят в обработку!\n"
-                                  f"👤 Username: @{clean_user}\n"
-                                  f"⭐ Звезд: {total_stars} ⭐\n"
-                                  f"⏰ Обработка займет некоторое время...")
+    with stage_timings.measure("funpay_message"):
+        account.send_message(chat_id, f"✅ Заказ принят в обработку!\n"
+                                      f"👤 Username: @{clean_user}\n"
+                                      f"⭐ Звезд: {total_stars} ⭐\n"
+                                      f"⏰ Обработка займет некоторое время...")
 
     # Автоматически отправляем звезды
     logger.info(f"⌛ Автоматическая отправка {total_stars} ⭐ пользователю @{clean_user}...")
-    success, response = direct_send_stars(FRAGMENT_TOKEN, clean_user, total_stars)
+    with stage_timings.measure("fragment_wait"):
+        fragment_semaphore.acquire()
+    try:
+        # Заказ могли вернуть, пока он ждал в очереди (статус обновляет Runner)
+        shortcut = account.get_order_shortcut(order_id, make_request=False)
+        if shortcut is not None and shortcut.status == types.OrderStatuses.REFUNDED:
+            order_queue.mark_refunded(order_id)
+        if not order_queue.mark_sending(order_id):
+            state = order_queue.state(order_id)
+            logger.warning(f"⚠️ Заказ {order_id} уже в статусе {state}, звезды не отправляются.")
+            send_telegram_notification(
+                f"⚠️ <b>ЗВЕЗДЫ НЕ ОТПРАВЛЕНЫ</b>\n"
+                f"📋 ID заказа: <code>{order_id}</code>\n"
+                f"📦 Статус: {state}"
+            )
+            return
+        with stage_timings.measure("fragment"):
+            success, response = direct_send_stars(clean_user, total_stars)
+    finally:
+        fragment_semaphore.release()
 
     if success:
+        order_queue.mark_delivered(order_id)
         # Уведомление об успешной отправке
-        send_telegram_notification(
-            f"✅ <b>ЗВЕЗДЫ ОТПРАВЛЕНЫ</b>\n"
-            f"📋 ID заказа: <code>{order_id}</code>\n"
-            f"👤 Получатель: @{clean_user}\n"
-            f"⭐ Отправлено: <b>{total_stars} ⭐</b>\n"
-            f"🎉 Заказ выполнен успешно!"
-        )
-        account.send_message(chat_id, f"✅ Успешно отправлено {total_stars} ⭐ пользователю @{clean_user}!")
+        with stage_timings.measure("telegram"):
+            send_telegram_notification(
+                f"✅ <b>ЗВЕЗДЫ ОТПРАВЛЕНЫ</b>\n"
+                f"📋 ID заказа: <code>{order_id}</code>\n"
+                f"👤 Получатель: @{clean_user}\n"
+                f"⭐ Отправлено: <b>{total_stars} ⭐</b>\n"
+                f"🎉 Заказ выполнен успешно!"
+            )
+        with stage_timings.measure("funpay_message"):
+            account.send_message(chat_id, f"✅ Успешно отправлено {total_stars} ⭐ пользователю @{clean_user}!")
         logger.info(f"✅ @{clean_user} получил {total_stars} ⭐")
     else:
         # Ошибка отправки
         error_message, is_out_of_stars = parse_fragment_error(response)
+        order_queue.mark_failed(order_id, error_message)
 
         send_telegram_notification(
             f"❌ <b>ОШИБКА ОТПРАВКИ</b>\n"
@@ -268,55 +312,94 @@ def process_order(account, chat_id, username, stars, order_id, quantity_multipli
 # --- Логика очереди ---
 
 def order_worker(account):
-    """Поток для обработки заказов из очереди."""
+    """
+    Поток для обработки заказов из очереди. Таких потоков запускается ORDER_WORKERS;
+    заказы одного получателя очередь выдает строго по одному, поэтому порядок для получателя сохраняется.
+    """
     while True:
         # Ожидаем новый заказ
         order_data = order_queue.get()
-        if order_data is None:  # Сигнал для завершения потока
+        if order_data is None:  # Очередь закрыта
             break
 
-        chat_id, username, stars, order_id, quantity_multiplier = order_data
+        order_id = order_data.order_id
+        stage_timings.add("queue_wait", max(time.time() - order_data.created_at, 0))
 
         # Обработка заказа
         try:
-            process_order(account, chat_id, username, stars, order_id, quantity_multiplier)
+            with stage_timings.measure("total"):
+                process_order(account, order_data.chat_id, order_data.username, order_data.stars, order_id,
+                              order_data.quantity)
         except Exception as e:
             logger.error(f"❌ Критическая ошибка в обработчике очереди заказа {order_id}: {e}")
-
-        # Сообщаем, что задача выполнена
-        order_queue.task_done()
-        time.sleep(COOLDOWN_SECONDS)  # Небольшая задержка между заказами
+            if order_queue.mark_failed(order_id, str(e)[:500]):
+                send_telegram_notification(
+                    f"❌ <b>ЗАКАЗ НЕ ОБРАБОТАН</b>\n"
+                    f"📋 ID заказа: <code>{order_id}</code>\n"
+                    f"⚠️ Ошибка: {str(e)[:100]}"
+                )
+            else:
+                # Заказ уже выполнен (или уже помечен невыполненным) - ошибка произошла после отправки звезд,
+                # например при отправке сообщения в чат FunPay
+                state = order_queue.state(order_id)
+                send_telegram_notification(
+                    f"⚠️ <b>ОШИБКА ПОСЛЕ ОБРАБОТКИ ЗАКАЗА</b>\n"
+                    f"📋 ID заказа: <code>{order_id}</code>\n"
+                    f"📦 Статус: {'звезды отправлены' if state == DELIVERED else state}\n"
+                    f"⚠️ Ошибка: {str(e)[:100]}"
+                )
 
 
 # --- Telegram Bot ---
 
-@bot.message_handler(commands=['start', 'help'])
+def get_bot():
+    """Создает Telegram бота и регистрирует обработчики команд при первом вызове"""
+    global _bot
+    with _bot_lock:
+        if _bot is None:
+            import telebot
+            _bot = telebot.TeleBot(TELEGRAM_BOT_TOKEN)
+            _bot.register_message_handler(send_welcome, commands=['start', 'help'])
+            _bot.register_message_handler(send_balance, commands=['balance'])
+            _bot.register_message_handler(send_status, commands=['status'])
+    return _bot
+
+
 def send_welcome(message):
-    bot.reply_to(message, "🤖 Бот мониторинга FunPay\n\n"
+    get_bot().reply_to(message, "🤖 Бот мониторинга FunPay\n\n"
                           "Доступные команды:\n"
                           "/balance - текущий баланс Fragment\n"
                           "/status - статус бота")
 
 
-@bot.message_handler(commands=['balance'])
 def send_balance(message):
     if str(message.chat.id) != TELEGRAM_USER_ID: return  # Только для админа
     balance = get_fragment_balance()
-    bot.reply_to(message, f"💰 Текущий баланс: <b>{balance} TON</b>", parse_mode='HTML')
+    get_bot().reply_to(message, f"💰 Текущий баланс: <b>{balance} TON</b>", parse_mode='HTML')
 
 
-@bot.message_handler(commands=['status'])
 def send_status(message):
     if str(message.chat.id) != TELEGRAM_USER_ID: return  # Только для админа
     status_message = "✅ Бот работает в штатном режиме\n"
     status_message += f"🤖 Мониторинг заказов активен\n"
-    status_message += f"⏳ Заказов в очереди: {order_queue.qsize()}"
+    status_message += f"⏳ Заказов в очереди: {order_queue.qsize()} (в обработке: {order_queue.active()}, " \
+                      f"обработчиков: {ORDER_WORKERS})\n"
+    metrics = scheduler.metrics()
+    status_message += (f"🔄 Интервал опроса: {metrics['current_delay']:.1f} с "
+                       f"(мин. {metrics['min_delay']:.1f}, макс. {metrics['max_delay']:.1f}, "
+                       f"в среднем {metrics['avg_delay']:.1f}; 429 ошибок: {metrics['rate_limited_polls']})")
+    if timings := stage_timings.format():
+        status_message += f"\n⏱ Этапы обработки:\n{timings}"
+    if timings := fragment.latency.format():
+        status_message += f"\n🌐 Fragment API:\n{timings}"
+    if fields_stats := order_fields.format():
+        status_message += f"\n📄 Данные заказов: {fields_stats}"
     if LOT_ID_TO_DEACTIVATE:
         status_message += f"\n🔗 ID контролируемого лота: {LOT_ID_TO_DEACTIVATE}"
     else:
         status_message += "\n⚠️ LOT_ID_TO_DEACTIVATE не установлен в .env!"
 
-    bot.reply_to(message, status_message)
+    get_bot().reply_to(message, status_message)
 
 
 def start_telegram_bot():
@@ -324,7 +407,7 @@ def start_telegram_bot():
 
     def polling():
         try:
-            bot.infinity_polling()
+            get_bot().infinity_polling()
         except Exception as e:
             logger.error(f"❌ Ошибка Telegram бота: {e}")
 
@@ -333,6 +416,85 @@ def start_telegram_bot():
     logger.info("✅ Telegram бот запущен в фоновом режиме")
 
 
+def prefetch_order(account, order):
+    """Ставит заказ (OrderShortcut) в пул order_prefetch. Повторные события одного заказа игнорируются."""
+    with _prefetch_lock:
+        if order.id in _prefetching or order.id in order_queue:  # Заказ уже загружается / обработан / в очереди
+            return
+        _prefetching.add(order.id)
+    order_prefetch.submit(enqueue_order, account, order)
+
+
+def enqueue_order(account, order):
+    """Извлекает username и кол-во звезд заказа (OrderShortcut) и добавляет заказ в очередь."""
+    try:
+        with stage_timings.measure("order_fields"):
+            fields = order_fields.extract(account, order)
+
+        if fields:
+            with _prefetch_lock:
+                if order.id in _prefetch_refunded:
+                    logger.info(f"↩️ Заказ {order.id} возвращен до добавления в очередь.")
+                    return
+                # 1. Добавление заказа в очередь
+                added = order_queue.put(fields.chat_id, clean_username(fields.username), fields.stars, order.id,
+                                        fields.quantity)
+            if added:
+                print(f"\n🎯 Новый заказ добавлен в очередь: @{clean_username(fields.username)} - "
+                      f"{fields.total_stars} ⭐ (ID: {order.id})")
+                print("=" * 50)
+
+        else:
+            print(f"\n⚠️ Не удалось извлечь данные из заказа {order.id}. Игнорирую.")
+            print("=" * 50)
+
+    except Exception as e:
+        logger.error(f"❌ Ошибка при получении информации о заказе: {e}")
+    finally:
+        with _prefetch_lock:
+            _prefetching.discard(order.id)
+            _prefetch_refunded.discard(order.id)
+
+
+def handle_event(account, event):
+    try:
+        # Обработка нового заказа: заказы загружаются параллельно и попадают в очередь по мере загрузки
+        if isinstance(event, NewOrderEvent):
+            prefetch_order(account, event.order)
+
+        # Возврат заказа, который еще не обработан
+        elif isinstance(event, OrderStatusChangedEvent):
+            if event.order.status == types.OrderStatuses.REFUNDED:
+                with _prefetch_lock:
+                    if event.order.id in _prefetching:
+                        _prefetch_refunded.add(event.order.id)
+                if order_queue.mark_refunded(event.order.id):
+                    logger.info(f"↩️ Заказ {event.order.id} возвращен до отправки звезд, удален из очереди.")
+
+        # Обработка нового сообщения
+        elif isinstance(event, NewMessageEvent):
+            msg = event.message
+            if msg.author_id != account.id:
+                order_fields.add_message(msg)
+                send_telegram_notification(
+                    f"💬 <b>НОВОЕ СООБЩЕНИЕ</b>\n"
+                    f"👤 От: <code>{msg.author}</code>\n"
+                    f"💬 Чат: https://funpay.com/orders/{msg.chat_id}/\n"  # Ссылка на чат заказа
+                    f"📝 Текст: {msg.text[:100]}..."
+                )
+
+    except Exception as e:
+        logger.error(f"❌ Ошибка обработки события: {e}")
+
+
+def save_state(account, runner):
+    """Сохраняет состояние аккаунта и Runner'а, чтобы после перезапуска получать только новые события."""
+    try:
+        storage.save_state(STATE_FILE, {"account": account.export_state(), "runner": runner.export_state()})
+    except Exception as e:
+        logger.error(f"❌ Не удалось сохранить состояние FunPay: {e}")
+
+
 # --- Основной запуск ---
 
 def main():
@@ -341,14 +503,22 @@ def main():
         logger.error("❌ FUNPAY_AUTH_TOKEN не найден в .env")
         return
 
+    init_order_processing()
+
     if not LOT_ID_TO_DEACTIVATE:
         logger.warning("⚠️ LOT_ID_TO_DEACTIVATE не установлен в .env. Автоматическая деактивация лота невозможна.")
 
     # Запускаем Telegram бота
     start_telegram_bot()
 
-    # Авторизация FunPay
-    account = Account(golden_key=golden_key).get()
+    # Авторизация FunPay (с состоянием прошлого запуска, если оно есть)
+    state = storage.load_state(STATE_FILE, max_age=STATE_MAX_AGE)
+    account = Account(golden_key=golden_key, sales_parser="lxml",
+                      html_retention=HTMLRetentionModes.NEVER, max_saved_chats=STATE_LIMIT,
+                      categories_cache=CATEGORIES_CACHE, base_url=FUNPAY_BASE_URL,
+                      rate_limiter=create_rate_limiter())
+    account.import_state(state.get("account"))
+    account.get()
     if not account.username:
         logger.error("❌ Не удалось получить имя пользователя FunPay. Проверьте токен.")
         return
@@ -356,73 +526,51 @@ def main():
     logger.info(f"✅ Авторизован FunPay как {account.username}")
 
     # Авторизация Fragment
-    global FRAGMENT_TOKEN
-    FRAGMENT_TOKEN = authenticate_fragment()
-    if not FRAGMENT_TOKEN:
+    if not authenticate_fragment():
         logger.error("❌ Не удалось авторизоваться в Fragment. Бот FunPay не запускается.")
         return
 
-    # Запуск потока обработки очереди
-    worker = threading.Thread(target=order_worker, args=(account,), daemon=True)
-    worker.start()
-    logger.info("✅ Поток обработки заказов запущен.")
+    # Заказы, которые отправлялись в момент остановки бота, повторно не отправляются
+    for interrupted in order_queue.recover():
+        logger.error(f"❌ Заказ {interrupted.order_id} прерван во время отправки звезд. Требуется ручная проверка.")
+        send_telegram_notification(
+            f"⚠️ <b>ЗАКАЗ ТРЕБУЕТ ПРОВЕРКИ</b>\n"
+            f"📋 ID заказа: <code>{interrupted.order_id}</code>\n"
+            f"👤 Получатель: @{interrupted.username}\n"
+            f"⭐ Звезд: <b>{interrupted.total_stars}</b>\n"
+            f"Бот остановился во время отправки звезд. Проверьте, получены ли они, прежде чем отправлять повторно."
+        )
+    if pending := order_queue.qsize():
+        logger.info(f"📦 В очереди осталось {pending} заказ(ов) с прошлого запуска.")
 
-    logger.info("🤖 Бот запущен. Ожидание заказов на звезды...")
+    # Запуск потоков обработки очереди
+    for i in range(ORDER_WORKERS):
+        threading.Thread(target=order_worker, args=(account,), name=f"order-worker-{i}", daemon=True).start()
+    logger.info(f"✅ Потоки обработки заказов запущены: {ORDER_WORKERS}.")
 
-    runner = Runner(account)
+    logger.info("🤖 Бот запущен. Ожидание заказов на звезды...")
 
-    for event in runner.listen(requests_delay=3.0):
-        try:
-            # Обработка нового заказа
-            if isinstance(event, NewOrderEvent):
-                try:
-                    order = account.get_order(event.order.id)
-                    username = None
-                    stars = None
-                    quantity_multiplier = 1
-
-                    # Извлечение данных заказа
-                    if hasattr(order, 'buyer_params') and order.buyer_params:
-                        username = clean_username(order.buyer_params.get("Telegram Username"))
-
-                    if hasattr(order, 'lot_params') and order.lot_params:
-                        for param in order.lot_params:
-                            if param[0] == "Количество звёзд":
-                                stars_match = re.search(r"(\d+)", param[1])
-                                if stars_match:
-                                    stars = int(stars_match.group(1))
-                                break
-                        quantity_multiplier = order.amount
-
-                    if username and stars:
-                        total_stars = stars * quantity_multiplier
-                        print(f"\n🎯 Новый заказ добавлен в очередь: @{username} - {total_stars} ⭐ (ID: {order.id})")
-                        print("=" * 50)
-
-                        # 1. Добавление заказа в очередь
-                        order_queue.put((order.chat_id, username, stars, order.id, quantity_multiplier))
-
-                    else:
-                        print(f"\n⚠️ Не удалось извлечь данные из заказа {order.id}. Игнорирую.")
-                        print("=" * 50)
-
-                except Exception as e:
-                    logger.error(f"❌ Ошибка при получении информации о заказе: {e}")
-                    continue
-
-            # Обработка нового сообщения
-            elif isinstance(event, NewMessageEvent):
-                msg = event.message
-                if msg.author_id != account.id:
-                    send_telegram_notification(
-                        f"💬 <b>НОВОЕ СООБЩЕНИЕ</b>\n"
-                        f"👤 От: <code>{msg.author}</code>\n"
-                        f"💬 Чат: https://funpay.com/orders/{msg.chat_id}/\n"  # Ссылка на чат заказа
-                        f"📝 Текст: {msg.text[:100]}..."
-                    )
+    runner_options = {"incremental_orders": True, "max_chats": STATE_LIMIT, "max_orders": STATE_LIMIT}
+    if RUNNER_CHATS_INTERVAL > 0:
+        runner = Runner.orders_fast_lane(account, RUNNER_CHATS_INTERVAL, **runner_options)
+    else:
+        runner = Runner(account, **runner_options)
+    if runner.import_state(state.get("runner")):
+        logger.info("✅ Состояние FunPay восстановлено, ожидаются только новые события.")
+    last_save = time.time()
+
+    def save_state_periodically():
+        # Вызывается после каждого запроса Runner'а, в т.ч. если новых событий нет
+        nonlocal last_save
+        if time.time() - last_save >= STATE_SAVE_INTERVAL:
+            save_state(account, runner)
+            last_save = time.time()
 
-        except Exception as e:
-            logger.error(f"❌ Ошибка обработки события: {e}")
+    try:
+        for event in runner.listen(requests_delay=scheduler, after_poll=save_state_periodically):
+            handle_event(account, event)
+    finally:
+        save_state(account, runner)
 
 
 if __name__ == "__main__":
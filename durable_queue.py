@@ -0,0 +1,230 @@
+"""
+Персистентная очередь заказов на SQLite (WAL).
+
+Каждый заказ хранится одной строкой, статус которой меняется так:
+queued -> sending -> delivered / failed, а также queued -> refunded (если заказ вернули до отправки).
+
+Статус sending записывается непосредственно перед запросом к Fragment, поэтому после падения бота
+заказы в статусе queued можно безопасно выполнить повторно, а заказы в статусе sending - нельзя
+(неизвестно, дошли ли звезды): при запуске они помечаются как failed и требуют ручной проверки.
+"""
+import sqlite3
+import threading
+import time
+
+QUEUED = "queued"
+SENDING = "sending"
+DELIVERED = "delivered"
+FAILED = "failed"
+REFUNDED = "refunded"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id TEXT NOT NULL UNIQUE,
+    chat_id TEXT NOT NULL,
+    username TEXT NOT NULL,
+    stars INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_state ON orders (state, seq);
+"""
+
+
+class QueuedOrder:
+    """Заказ из очереди."""
+
+    def __init__(self, order_id, chat_id, username, stars, quantity, state, error=None, created_at=None):
+        self.order_id = order_id
+        self.chat_id = chat_id
+        self.username = username
+        self.stars = stars
+        self.quantity = quantity
+        self.state = state
+        self.error = error
+        self.created_at = created_at
+
+    @property
+    def total_stars(self):
+        return self.stars * self.quantity
+
+
+class DurableOrderQueue:
+    """
+    Очередь заказов, переживающая перезапуск бота.
+
+    Повторное добавление заказа с тем же ID игнорируется, поэтому одно и то же событие FunPay не приведет
+    к двойной отправке звезд. Выданные обработчику заказы помечаются в памяти и не выдаются повторно,
+    пока обработчик не переведет их в другой статус или не вернет в очередь.
+
+    Заказы одного получателя выдаются строго по очереди: пока обработчик не закончил с заказом получателя,
+    следующие его заказы не выдаются, поэтому несколько обработчиков могут работать параллельно.
+
+    Возврат заказа, уже выданного обработчику, запоминается: mark_sending такой заказ не пропустит.
+    """
+
+    def __init__(self, path="orders.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._cond = threading.Condition()
+        self._claimed = {}  # {ID заказа: получатель}
+        self._refunds = set()  # ID выданных обработчикам заказов, возвращенных до отправки
+        self._closed = False
+
+    def put(self, chat_id, username, stars, order_id, quantity=1):
+        """
+        Добавляет заказ в очередь.
+
+        :return: True, если заказ добавлен, False - если заказ с таким ID уже есть в базе.
+        """
+        now = time.time()
+        with self._cond:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO orders (order_id, chat_id, username, stars, quantity, state, created_at, "
+                "updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (order_id, str(chat_id), username, stars, quantity, QUEUED, now, now))
+            added = cursor.rowcount == 1
+            if added:
+                self._cond.notify_all()
+            return added
+
+    def get(self, timeout=None):
+        """
+        Выдает самый старый заказ в статусе queued, который еще не выдан другому обработчику и у получателя
+        которого нет заказов в обработке.
+
+        :param timeout: сколько ждать появления заказа (None - бесконечно).
+
+        :return: заказ или None, если время ожидания истекло или очередь закрыта.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._closed:
+                busy = set(self._claimed.values())
+                for row in self._conn.execute(
+                        "SELECT order_id, chat_id, username, stars, quantity, state, error, created_at FROM orders "
+                        "WHERE state = ? ORDER BY seq", (QUEUED,)):
+                    if row[0] not in self._claimed and row[2].lower() not in busy:
+                        self._claimed[row[0]] = row[2].lower()
+                        return QueuedOrder(*row)
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return None
+
+    def release(self, order_id):
+        """Возвращает выданный заказ в очередь (без изменения статуса, если заказ не был возвращен)."""
+        with self._cond:
+            self._claimed.pop(order_id, None)
+            if order_id in self._refunds:
+                self._set_state(order_id, REFUNDED, None, (QUEUED,))
+            self._cond.notify_all()
+
+    def mark_sending(self, order_id):
+        """
+        Помечает заказ как отправляемый. Вызывать непосредственно перед запросом к Fragment.
+
+        :return: True, если статус изменен. False - если заказ уже не в статусе queued (например, выполнен
+            другим обработчиком) или был возвращен после выдачи (тогда он помечается как refunded):
+            звезды отправлять нельзя.
+        """
+        with self._cond:
+            if order_id in self._refunds:
+                self._set_state(order_id, REFUNDED, None, (QUEUED,))
+                return False
+            return self._set_state(order_id, SENDING, None, (QUEUED,))
+
+    def mark_delivered(self, order_id):
+        """Помечает заказ как выполненный."""
+        return self._set_state(order_id, DELIVERED, None, (SENDING,))
+
+    def mark_failed(self, order_id, error=None):
+        """
+        Помечает заказ как невыполненный, если он еще не выполнен / не помечен невыполненным.
+
+        :return: True, если статус изменен.
+        """
+        return self._set_state(order_id, FAILED, error, (QUEUED, SENDING))
+
+    def mark_refunded(self, order_id):
+        """
+        Помечает заказ как возвращенный, если он еще не выдан обработчику. Возврат выданного обработчику заказа
+        запоминается и применяется в mark_sending / release.
+
+        :return: True, если статус изменен.
+        """
+        with self._cond:
+            if order_id in self._claimed:
+                self._refunds.add(order_id)
+                return False
+            return self._set_state(order_id, REFUNDED, None, (QUEUED,))
+
+    def _set_state(self, order_id, state, error, from_states):
+        with self._cond:
+            placeholders = ", ".join("?" * len(from_states))
+            cursor = self._conn.execute(
+                f"UPDATE orders SET state = ?, error = ?, updated_at = ? "
+                f"WHERE order_id = ? AND state IN ({placeholders})",
+                (state, error, time.time(), order_id, *from_states))
+            if state != SENDING:
+                self._refunds.discard(order_id)
+                if self._claimed.pop(order_id, None) is not None:
+                    self._cond.notify_all()
+            return cursor.rowcount == 1
+
+    def recover(self):
+        """
+        Восстанавливает очередь после перезапуска. Вызывать до запуска обработчиков.
+
+        Заказы в статусе queued остаются в очереди и будут выполнены. Заказы в статусе sending помечаются
+        как failed: звезды могли быть отправлены до падения, поэтому повторная отправка не выполняется.
+
+        :return: список заказов, помеченных как failed.
+        """
+        with self._cond:
+            rows = self._conn.execute(
+                "SELECT order_id, chat_id, username, stars, quantity, state, error, created_at FROM orders "
+                "WHERE state = ? ORDER BY seq", (SENDING,)).fetchall()
+            self._conn.execute("UPDATE orders SET state = ?, error = ?, updated_at = ? WHERE state = ?",
+                               (FAILED, "interrupted while sending", time.time(), SENDING))
+            return [QueuedOrder(*row[:5], FAILED, "interrupted while sending", row[7]) for row in rows]
+
+    def state(self, order_id):
+        """Статус заказа или None, если заказа нет в очереди."""
+        with self._cond:
+            row = self._conn.execute("SELECT state FROM orders WHERE order_id = ?", (order_id,)).fetchone()
+            return row[0] if row else None
+
+    def __contains__(self, order_id):
+        with self._cond:
+            return self._conn.execute("SELECT 1 FROM orders WHERE order_id = ?", (order_id,)).fetchone() is not None
+
+    def qsize(self):
+        """Кол-во заказов, ожидающих выполнения (queued)."""
+        with self._cond:
+            return self._conn.execute("SELECT COUNT(*) FROM orders WHERE state = ?", (QUEUED,)).fetchone()[0]
+
+    def active(self):
+        """Кол-во заказов, выданных обработчикам."""
+        with self._cond:
+            return len(self._claimed)
+
+    def counts(self):
+        """Кол-во заказов по статусам."""
+        with self._cond:
+            return dict(self._conn.execute("SELECT state, COUNT(*) FROM orders GROUP BY state").fetchall())
+
+    def close(self):
+        """Закрывает очередь: ожидающие get() возвращают None."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._conn.close()
@@ -0,0 +1,171 @@
+"""
+Клиент Fragment API (https://api.fragment-api.com) для bot.py.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+import requests
+import requests.adapters
+import urllib3.exceptions
+
+from metrics import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _is_connect_error(error):
+    """
+    Возвращает True, если запрос гарантированно не дошел до сервера (ошибка на этапе соединения).
+    Только такие ошибки можно повторять для неидемпотентных запросов.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        reason = getattr(error.args[0], "reason", error.args[0])
+        return isinstance(reason, (urllib3.exceptions.NewConnectionError, urllib3.exceptions.ConnectTimeoutError))
+    return False
+
+
+class FragmentClient:
+    """
+    Клиент Fragment API с пулом соединений, тайм-аутами, повторами и автоматической переавторизацией.
+
+    Идемпотентные запросы (баланс, авторизация) повторяются при сетевых ошибках и ответах 429/5xx.
+    Отправка звезд повторяется только если соединение не было установлено: при обрыве / тайм-ауте ответа
+    звезды могли быть отправлены, и повтор привел бы к двойной отправке.
+    При ответе 401 токен получается заново (и сохраняется в token_file), после чего запрос повторяется один раз.
+
+    Время ответа каждого эндпоинта (auth / wallet / stars) сохраняется в self.latency.
+    """
+
+    def __init__(self, api_url, api_key, phone, mnemonics, token_file="auth_token.json",
+                 connect_timeout=5, read_timeout=30, retries=3, backoff=0.5, max_backoff=8, pool_maxsize=10):
+        self.api_url = api_url.rstrip("/")
+        self.api_key = api_key
+        self.phone = phone
+        self.mnemonics = mnemonics
+        self.token_file = token_file
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.latency = LatencyStats()
+        self.token = None
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._auth_lock = threading.RLock()
+
+    # --- Токен ---
+
+    def load_token(self):
+        if os.path.exists(self.token_file):
+            with open(self.token_file, "r") as f:
+                return json.load(f).get("token")
+        return None
+
+    def save_token(self, token):
+        tmp = f"{self.token_file}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"token": token}, f)
+        os.replace(tmp, self.token_file)
+
+    def authenticate(self, force=False):
+        """
+        Возвращает токен: сохраненный в token_file или (если его нет / force=True) полученный заново.
+
+        :return: (токен или None, получен ли токен заново).
+        """
+        with self._auth_lock:
+            if not force:
+                self.token = self.token or self.load_token()
+                if self.token:
+                    return self.token, False
+            payload = {
+                "api_key": self.api_key,
+                "phone_number": self.phone,
+                "mnemonics": (self.mnemonics or "").strip().split(),
+                "version": "V4R2"
+            }
+            res = self._request("auth", "post", "/auth/authenticate/", idempotent=True, json=payload)
+            if res.status_code != 200:
+                logger.error(f"❌ Ошибка авторизации Fragment: {res.text}")
+                return None, False
+            self.token = res.json().get("token")
+            self.save_token(self.token)
+            return self.token, True
+
+    def _reauthenticate(self, used_token):
+        with self._auth_lock:
+            # Если другой поток уже обновил токен, повторно не авторизуемся.
+            if self.token and self.token != used_token:
+                return self.token
+            logger.warning("⚠️ Токен Fragment недействителен, повторная авторизация...")
+            return self.authenticate(force=True)[0]
+
+    # --- Методы API ---
+
+    def get_balance(self):
+        """:return: (успешно ли, баланс или текст ошибки)."""
+        res = self._authorized_request("wallet", "get", "/misc/wallet/", idempotent=True,
+                                       headers={"Accept": "application/json"})
+        if res.status_code == 200:
+            return True, res.json().get("balance", 0)
+        return False, res.text
+
+    def send_stars(self, username, quantity, show_sender=False):
+        """:return: (успешно ли, текст ответа)."""
+        data = {"username": username, "quantity": quantity, "show_sender": "true" if show_sender else "false"}
+        try:
+            res = self._authorized_request("stars", "post", "/order/stars/", idempotent=False, json=data)
+        except requests.RequestException as e:
+            return False, str(e)
+        return res.status_code == 200, res.text
+
+    # --- Транспорт ---
+
+    def _authorized_request(self, name, method, path, idempotent, headers=None, **kwargs):
+        token = self.token or self.authenticate()[0]
+        res = self._request(name, method, path, idempotent,
+                            headers={**(headers or {}), "Authorization": f"JWT {token}"}, **kwargs)
+        if res.status_code == 401:
+            # Запрос с недействительным токеном не выполнен, поэтому его можно повторить даже если он неидемпотентный.
+            token = self._reauthenticate(token)
+            if token:
+                res = self._request(name, method, path, idempotent,
+                                    headers={**(headers or {}), "Authorization": f"JWT {token}"}, **kwargs)
+        return res
+
+    def _request(self, name, method, path, idempotent, headers=None, **kwargs):
+        url = f"{self.api_url}{path}"
+        headers = {"Content-Type": "application/json", **(headers or {})}
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                res = self.session.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+            except requests.RequestException as e:
+                self.latency.add(f"{name} (error)", time.perf_counter() - start)
+                retryable = idempotent or _is_connect_error(e)
+                if not retryable or attempt >= self.retries:
+                    raise
+                logger.warning(f"⚠️ Fragment {name}: {e.__class__.__name__}, повтор {attempt + 1}/{self.retries}")
+            else:
+                self.latency.add(name, time.perf_counter() - start)
+                if not (idempotent and res.status_code in RETRY_STATUSES) or attempt >= self.retries:
+                    return res
+                logger.warning(f"⚠️ Fragment {name}: HTTP {res.status_code}, повтор {attempt + 1}/{self.retries}")
+            attempt += 1
+            # Экспоненциальная задержка с "полным" джиттером, чтобы обработчики не повторяли запросы синхронно.
+            time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,67 @@
+"""
+Простые потокобезопасные метрики задержек для bot.py.
+"""
+import collections
+import contextlib
+import threading
+import time
+
+
+class LatencyStats:
+    """
+    Хранит последние `window` замеров каждой метки (этапа обработки, эндпоинта и т.д.)
+    и считает по ним перцентили.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._samples = collections.defaultdict(lambda: collections.deque(maxlen=self.window))
+        self._counts = collections.Counter()
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        """Добавляет замер."""
+        with self._lock:
+            self._samples[name].append(seconds)
+            self._counts[name] += 1
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        """Замеряет время выполнения блока with."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def summary(self):
+        """
+        :return: {метка: {"count", "avg", "p50", "p95", "p99", "max"}} (время в секундах).
+        """
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items() if values}
+            counts = dict(self._counts)
+        result = {}
+        for name, values in samples.items():
+            result[name] = {
+                "count": counts[name],
+                "avg": sum(values) / len(values),
+                "p50": _percentile(values, 0.50),
+                "p95": _percentile(values, 0.95),
+                "p99": _percentile(values, 0.99),
+                "max": values[-1]
+            }
+        return result
+
+    def format(self, unit="мс"):
+        """Возвращает сводку в виде текста (по строке на метку)."""
+        lines = []
+        for name, s in self.summary().items():
+            lines.append(f"{name}: p50 {s['p50'] * 1000:.0f} / p95 {s['p95'] * 1000:.0f} / "
+                         f"max {s['max'] * 1000:.0f} {unit} ({s['count']})")
+        return "\n".join(lines)
+
+
+def _percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
@@ -0,0 +1,168 @@
+"""
+Извлечение данных заказа, нужных bot.py (username получателя, кол-во звезд, кол-во товара).
+
+Сначала данные ищутся в строке списка продаж (OrderShortcut из NewOrderEvent) и в последних сообщениях
+покупателя, и только если чего-то не хватает - загружается страница заказа (Account.get_order).
+"""
+import collections
+import re
+import threading
+
+from FunPayAPI.common import storage
+from FunPayAPI.common.enums import MessageTypes
+
+USERNAME_RE = re.compile(r"(?<![\w@])@([A-Za-z][A-Za-z0-9_]{3,31})\b")
+
+
+class OrderFields:
+    """Данные заказа для очереди bot.py."""
+
+    def __init__(self, order_id, chat_id, username, stars, quantity, fetched):
+        self.order_id = order_id
+        self.chat_id = chat_id
+        self.username = username
+        self.stars = stars
+        self.quantity = quantity
+        self.fetched = fetched  # Загружалась ли страница заказа
+
+    @property
+    def total_stars(self):
+        return self.stars * self.quantity
+
+
+class ExtractionRule:
+    """
+    Правило извлечения данных заказов одного лота / раздела.
+
+    :param name: название правила (для логов).
+    :param stars_param: название параметра лота с кол-вом звезд на странице заказа.
+    :param username_param: название поля покупателя с username на странице заказа.
+    :param description_re: регулярное выражение, группа 1 которого - кол-во звезд в описании заказа из списка
+        продаж (None - всегда брать со страницы). Если в описании несколько разных значений, используется страница.
+    :param username_from_chat: брать ли username из сообщений покупателя (@username)? Текст сообщений покупатель
+        пишет сам, а звезды уходят на этот username, поэтому по умолчанию он берется только со страницы заказа.
+    :param subcategory_id: ID раздела, к заказам которого применяется правило (None - к любым).
+    """
+
+    def __init__(self, name, stars_param="Количество звёзд", username_param="Telegram Username",
+                 description_re=r"(\d+)\s*(?:звёзд|звезд|stars)", username_from_chat=False, subcategory_id=None):
+        self.name = name
+        self.stars_param = stars_param
+        self.username_param = username_param
+        self.description_re = re.compile(description_re, re.IGNORECASE) if description_re else None
+        self.username_from_chat = username_from_chat
+        self.subcategory_id = subcategory_id
+
+    def matches(self, order):
+        """Применяется ли правило к заказу (OrderShortcut)?"""
+        return self.subcategory_id is None or (order.subcategory is not None and
+                                               order.subcategory.id == self.subcategory_id)
+
+    def stars_from_row(self, order):
+        """:return: кол-во звезд из описания заказа или None."""
+        if not self.description_re:
+            return None
+        found = {int(i) for i in self.description_re.findall(order.description or "")}
+        return found.pop() if len(found) == 1 else None
+
+    def username_from_messages(self, texts):
+        """:return: username, если в сообщениях покупателя упомянут ровно один, иначе None."""
+        if not self.username_from_chat:
+            return None
+        found = {i.lower(): i for text in texts for i in USERNAME_RE.findall(text or "")}
+        return next(iter(found.values())) if len(found) == 1 else None
+
+    def from_page(self, order):
+        """:return: (username, кол-во звезд) со страницы заказа (Order); отсутствующие значения - None."""
+        username = stars = None
+        if order.buyer_params:
+            username = (order.buyer_params.get(self.username_param) or "").lstrip("@").strip() or None
+        for name, value in order.lot_params or []:
+            if name == self.stars_param:
+                if match := re.search(r"(\d+)", value):
+                    stars = int(match.group(1))
+                break
+        return username, stars
+
+
+class OrderFieldExtractor:
+    """
+    Извлекает данные заказов по правилам и считает, сколько загрузок страниц заказов удалось избежать.
+
+    Сообщения чатов с покупателями передаются через add_message (из NewMessageEvent) и хранятся для последних
+    max_buyers покупателей. Username берется только из сообщений покупателя, написанных в его чате после
+    системного сообщения об оплате этого заказа, поэтому ник из прошлых заказов не используется.
+
+    :param rules: правила; используется первое подходящее заказу.
+    """
+
+    def __init__(self, rules, max_buyers=2000, messages_per_buyer=10):
+        self.rules = list(rules)
+        self.messages_per_buyer = messages_per_buyer
+        self.counters = collections.Counter()
+        # {ID покупателя: последние сообщения его чата [(тип, текст, ID автора)]}
+        self._messages = storage.BoundedDict(max_buyers)
+        self._lock = threading.Lock()
+
+    def add_message(self, message):
+        """Запоминает сообщение личного чата с покупателем (FunPayAPI.types.Message)."""
+        if not message.interlocutor_id or not message.text:
+            return
+        with self._lock:
+            chat = self._messages.get(message.interlocutor_id)
+            if chat is None:
+                chat = self._messages[message.interlocutor_id] = collections.deque(maxlen=self.messages_per_buyer)
+            chat.append((message.type, message.text, message.author_id))
+
+    def order_messages(self, order):
+        """
+        :return: тексты сообщений покупателя, написанных после системного сообщения об оплате заказа (OrderShortcut).
+            Если сообщения об оплате среди сохраненных нет - пустой список.
+        """
+        with self._lock:
+            chat = list(self._messages.get(order.buyer_id) or ())
+        paid_at = next((i for i in range(len(chat) - 1, -1, -1) if chat[i][0] == MessageTypes.ORDER_PURCHASED
+                        and f"#{order.id}" in chat[i][1]), None)
+        if paid_at is None:
+            return []
+        return [text for _, text, author_id in chat[paid_at + 1:] if author_id == order.buyer_id]
+
+    def extract(self, account, order):
+        """
+        Возвращает данные заказа (OrderShortcut). Страница заказа загружается, только если данных из строки
+        списка продаж и сообщений покупателя не хватает.
+
+        :return: OrderFields или None, если правило не найдено или username / кол-во звезд не удалось извлечь.
+        """
+        rule = next((i for i in self.rules if i.matches(order)), None)
+        if rule is None:
+            self._count("no_rule")
+            return None
+
+        stars = rule.stars_from_row(order)
+        username = rule.username_from_messages(self.order_messages(order))
+        if stars and username and order.amount:
+            self._count("row_only")
+            return OrderFields(order.id, order.chat_id, username, stars, order.amount, fetched=False)
+
+        page = account.get_order(order.id)
+        self._count("fetched")
+        username, stars = rule.from_page(page)
+        if not (username and stars):
+            self._count("failed")
+            return None
+        return OrderFields(page.id, page.chat_id, username, stars, page.amount, fetched=True)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def format(self):
+        """Возвращает статистику в виде текста."""
+        with self._lock:
+            c = dict(self.counters)
+        total = c.get("row_only", 0) + c.get("fetched", 0)
+        if not total:
+            return ""
+        return (f"без загрузки страницы: {c.get('row_only', 0)} из {total}, загружено страниц: {c.get('fetched', 0)}"
+                f", не извлечено: {c.get('failed', 0) + c.get('no_rule', 0)}")
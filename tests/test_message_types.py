@@ -0,0 +1,150 @@
+"""
+Определение типа системного сообщения: utils.MessageTypesClassifier (get_message_type) сравнивается с прежней
+реализацией на регулярных выражениях (legacy_message_type) на корпусе ru / en / uk сообщений.
+
+Корпус также используется в benchmarks.bench_message_types.
+"""
+from __future__ import annotations
+
+import pytest
+
+from FunPayAPI.common.enums import MessageTypes as T
+from FunPayAPI.common.utils import RegularExpressions, get_message_type
+
+# ru
+RU: list[tuple[str, T]] = [
+    ("Покупатель buyer1 оплатил заказ #ABCD1234. Telegram, Звезды, 50 звёзд. buyer1, не забудьте потом нажать "
+     "кнопку «Подтвердить выполнение заказа».", T.ORDER_PURCHASED),
+    ("Покупатель buyer1 оплатил заказ #ABCD1234. Валюта. buyer1, не забудьте потом нажать кнопку "
+     "«Подтвердить получение валюты».", T.ORDER_PURCHASED),
+    ("Покупатель buyer1 подтвердил успешное выполнение заказа #ABCD1234 и отправил деньги продавцу Seller.",
+     T.ORDER_CONFIRMED),
+    ("Администратор admin подтвердил успешное выполнение заказа #ABCD1234 и отправил деньги продавцу Seller.",
+     T.ORDER_CONFIRMED_BY_ADMIN),
+    ("Покупатель buyer1 написал отзыв к заказу #ABCD1234.", T.NEW_FEEDBACK),
+    ("Покупатель buyer1 изменил отзыв к заказу #ABCD1234.", T.FEEDBACK_CHANGED),
+    ("Покупатель buyer1 удалил отзыв к заказу #ABCD1234.", T.FEEDBACK_DELETED),
+    ("Продавец Seller ответил на отзыв к заказу #ABCD1234.", T.NEW_FEEDBACK_ANSWER),
+    ("Продавец Seller изменил ответ на отзыв к заказу #ABCD1234.", T.FEEDBACK_ANSWER_CHANGED),
+    ("Продавец Seller удалил ответ на отзыв к заказу #ABCD1234.", T.FEEDBACK_ANSWER_DELETED),
+    ("Заказ #ABCD1234 открыт повторно.", T.ORDER_REOPENED),
+    ("Продавец Seller вернул деньги покупателю buyer1 по заказу #ABCD1234.", T.REFUND),
+    ("Администратор admin вернул деньги покупателю buyer1 по заказу #ABCD1234.", T.REFUND_BY_ADMIN),
+    ("Часть средств по заказу #ABCD1234 возвращена покупателю.", T.PARTIAL_REFUND),
+    ("Вы можете перейти в Discord. Внимание: общение за пределами сервера FunPay считается нарушением правил.",
+     T.DISCORD),
+    ("Уважаемые продавцы, не доверяйте сообщениям в чате! Перед выполнением заказа всегда проверяйте наличие "
+     "оплаты в разделе «Мои продажи».", T.DEAR_VENDORS),
+    ("Здравствуйте! Мой ник @username, жду звёзды", T.NON_SYSTEM),
+    ("Спасибо, всё пришло!", T.NON_SYSTEM),
+    ("Заказ #ABCD1234 ещё не выполнен?", T.NON_SYSTEM),
+    ("Покупатель buyer1 оплатил заказ #ABCD1234.", T.NON_SYSTEM),  # нет второй части сообщения об оплате
+    ("Я оплатил заказ, когда будет?", T.NON_SYSTEM)
+]
+
+# en
+EN: list[tuple[str, T]] = [
+    ("The buyer buyer1 has paid for order #ABCD1234. Telegram, Stars, 50 stars. buyer1, do not forget to press "
+     "the «Confirm order fulfilment» button once you finish.", T.ORDER_PURCHASED),
+    ("The buyer buyer1 has confirmed that order #ABCD1234 has been fulfilled successfully and that the seller "
+     "Seller has been paid.", T.ORDER_CONFIRMED),
+    ("The administrator admin has confirmed that order #ABCD1234 has been fulfilled successfully and that the "
+     "seller Seller has been paid.", T.ORDER_CONFIRMED_BY_ADMIN),
+    ("The buyer buyer1 has given feedback to the order #ABCD1234.", T.NEW_FEEDBACK),
+    ("The buyer buyer1 has edited their feedback to the order #ABCD1234.", T.FEEDBACK_CHANGED),
+    ("The buyer buyer1 has deleted their feedback to the order #ABCD1234.", T.FEEDBACK_DELETED),
+    ("The seller Seller has replied to their feedback to the order #ABCD1234.", T.NEW_FEEDBACK_ANSWER),
+    ("The seller Seller has edited a reply to their feedback to the order #ABCD1234.", T.FEEDBACK_ANSWER_CHANGED),
+    ("The seller Seller has deleted a reply to their feedback to the order #ABCD1234.", T.FEEDBACK_ANSWER_DELETED),
+    ("Order #ABCD1234 has been reopened.", T.ORDER_REOPENED),
+    ("The seller Seller has refunded the buyer buyer1 on order #ABCD1234.", T.REFUND),
+    ("The administrator admin has refunded the buyer buyer1 on order #ABCD1234.", T.REFUND_BY_ADMIN),
+    ("A part of the funds pertaining to the order #ABCD1234 has been refunded.", T.PARTIAL_REFUND),
+    ("You can switch to Discord. However, note that friending someone is considered a violation rules.",
+     T.DISCORD),
+    ("Dear vendors, do not rely on chat messages! Before you process an order, you should always check whether "
+     "you've been paid in «My sales» section.", T.DEAR_VENDORS),
+    ("Hi, my username is @username", T.NON_SYSTEM),
+    ("Order has been reopened.", T.NON_SYSTEM),  # нет ID заказа
+]
+
+# uk: регулярные выражения FunPay описывают только ru / en, поэтому такие сообщения несистемные
+UK: list[tuple[str, T]] = [
+    ("Покупець buyer1 оплатив замовлення #ABCD1234. buyer1, не забудьте потім натиснути кнопку "
+     "«Підтвердити виконання замовлення».", T.NON_SYSTEM),
+    ("Покупець buyer1 підтвердив успішне виконання замовлення #ABCD1234 і відправив гроші продавцю Seller.",
+     T.NON_SYSTEM),
+    ("Покупець buyer1 написав відгук до замовлення #ABCD1234.", T.NON_SYSTEM),
+    ("Замовлення #ABCD1234 відкрито повторно.", T.NON_SYSTEM),
+    ("Дякую, все отримав!", T.NON_SYSTEM)
+]
+
+# несколько фраз в одном сообщении: важен порядок проверки
+MIXED: list[tuple[str, T]] = [
+    ("Продавец Seller вернул деньги покупателю buyer1 по заказу #ABCD1234. Покупатель buyer1 написал отзыв к "
+     "заказу #ABCD1234.", T.NEW_FEEDBACK),
+    ("Заказ #ABCD1234 открыт повторно. Часть средств по заказу #ABCD1234 возвращена покупателю.",
+     T.PARTIAL_REFUND),
+    ("Покупатель buyer1 оплатил заказ #ABCD1234. Вы можете перейти в Discord. Внимание: общение за пределами "
+     "сервера FunPay считается нарушением правил.", T.DISCORD),
+    ("", T.NON_SYSTEM)
+]
+
+CORPUS: list[tuple[str, T]] = RU + EN + UK + MIXED
+
+
+def legacy_message_type(text: str) -> T:
+    """Прежняя реализация Message.get_message_type."""
+    if not text:
+        return T.NON_SYSTEM
+
+    res = RegularExpressions()
+    if res.DISCORD.search(text):
+        return T.DISCORD
+    if res.DEAR_VENDORS.search(text):
+        return T.DEAR_VENDORS
+
+    if res.ORDER_PURCHASED.findall(text) and res.ORDER_PURCHASED2.findall(text):
+        return T.ORDER_PURCHASED
+
+    if res.ORDER_ID.search(text) is None:
+        return T.NON_SYSTEM
+
+    sys_msg_types = {
+        T.ORDER_CONFIRMED: res.ORDER_CONFIRMED,
+        T.NEW_FEEDBACK: res.NEW_FEEDBACK,
+        T.NEW_FEEDBACK_ANSWER: res.NEW_FEEDBACK_ANSWER,
+        T.FEEDBACK_CHANGED: res.FEEDBACK_CHANGED,
+        T.FEEDBACK_DELETED: res.FEEDBACK_DELETED,
+        T.REFUND: res.REFUND,
+        T.FEEDBACK_ANSWER_CHANGED: res.FEEDBACK_ANSWER_CHANGED,
+        T.FEEDBACK_ANSWER_DELETED: res.FEEDBACK_ANSWER_DELETED,
+        T.ORDER_CONFIRMED_BY_ADMIN: res.ORDER_CONFIRMED_BY_ADMIN,
+        T.PARTIAL_REFUND: res.PARTIAL_REFUND,
+        T.ORDER_REOPENED: res.ORDER_REOPENED,
+        T.REFUND_BY_ADMIN: res.REFUND_BY_ADMIN
+    }
+
+    for i in sys_msg_types:
+        if sys_msg_types[i].search(text):
+            return i
+    else:
+        return T.NON_SYSTEM
+
+
+@pytest.mark.parametrize("text, expected", CORPUS)
+def test_matches_legacy(text, expected):
+    assert legacy_message_type(text) == expected
+    assert get_message_type(text) == expected
+
+
+@pytest.mark.parametrize("corpus", [RU, EN], ids=["ru", "en"])
+def test_corpus_covers_every_type(corpus):
+    assert {expected for _, expected in corpus} == set(T)
+
+
+@pytest.mark.parametrize("text", [text for text, _ in UK])
+def test_uk_is_non_system(text):
+    # Регулярные выражения FunPay описывают только ru / en
+    assert get_message_type(text) == T.NON_SYSTEM
+    assert legacy_message_type(text) == T.NON_SYSTEM